@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='giriskaydi',
+            index=models.Index(fields=['user', '-giris_tarihi'], name='giris_kaydi_user_tarih_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='kullanicisulamayetkisi',
+            index=models.Index(condition=models.Q(('aktif', True)), fields=['kullanici_profili'], include=('sulama', 'yetki_seviyesi', 'bitis_tarihi'), name='aktif_sulama_yetkisi_idx'),
+        ),
+    ]
@@ -1,5 +1,9 @@
+import logging
+
 from django.core.exceptions import PermissionDenied
-from .models import KullaniciSulamaYetkisi
+from .yetki_kapsami import istek_yetkileri, yetki_seviyesi_yeterli
+
+logger = logging.getLogger(__name__)
 
 
 class SulamaBazliMixin:
@@ -8,29 +12,23 @@ class SulamaBazliMixin:
     ViewSet'lerde kullanıcının yetkili olduğu sulama sistemlerine göre filtreleme yapar
     """
     
+    def get_sulama_yetkileri(self):
+        """
+        Kullanıcının geçerli sulama yetkileri ({sulama_id: yetki_seviyesi})
+        
+        İstek başına bir kez okunur. Superuser için None döner.
+        """
+        return istek_yetkileri(self.request)
+    
     def get_queryset(self):
         """
         Kullanıcının yetkili olduğu sulama sistemlerine göre queryset'i filtreler
         """
         queryset = super().get_queryset()
         
-        # Eğer kullanıcı superuser ise tüm verileri görebilir
-        if self.request.user.is_superuser:
-            return queryset
-            
-        # Kullanıcının yetkili olduğu sulama sistemlerini al
-        try:
-            user_profile = self.request.user.profil
-            user_sulama_ids = KullaniciSulamaYetkisi.objects.filter(
-                kullanici_profili=user_profile,
-                aktif=True
-            ).values_list('sulama_id', flat=True)
-        except AttributeError:
-            # Kullanıcının profili yoksa boş queryset döndür
-            user_sulama_ids = []
-        
-        if not user_sulama_ids:
-            # Eğer hiç yetkisi yoksa boş queryset döndür
+        yetkiler = self.get_sulama_yetkileri()
+        # Superuser ise tüm verileri görebilir, hiç yetkisi yoksa boş queryset döndür
+        if yetkiler is not None and not yetkiler:
             return queryset.none()
             
         return queryset
@@ -46,44 +44,19 @@ class SulamaBazliMixin:
         Returns:
             Filtrelenmiş queryset
         """
+        yetkiler = self.get_sulama_yetkileri()
         # Eğer kullanıcı superuser ise tüm verileri görebilir
-        if self.request.user.is_superuser:
+        if yetkiler is None:
             return queryset
-            
-        # Kullanıcının yetkili olduğu sulama sistemlerini al
-        try:
-            user_profile = self.request.user.profil
-            user_sulama_ids = KullaniciSulamaYetkisi.objects.filter(
-                kullanici_profili=user_profile,
-                aktif=True
-            ).values_list('sulama_id', flat=True)
-            
-            print(f"Kullanıcı: {self.request.user.username}")
-            print(f"Kullanıcı profili: {user_profile}")
-            print(f"Yetkili sulama IDs: {list(user_sulama_ids)}")
-            
-        except AttributeError:
-            # Kullanıcının profili yoksa boş queryset döndür
-            print(f"Kullanıcının profili yok: {self.request.user.username}")
-            user_sulama_ids = []
         
-        if not user_sulama_ids:
+        if not yetkiler:
             # Eğer hiç yetkisi yoksa boş queryset döndür
-            print("Kullanıcının hiç sulama yetkisi yok")
+            logger.debug('Kullanıcının sulama yetkisi yok', extra={'kullanici': self.request.user.get_username()})
             return queryset.none()
         
-        # Sulama field'ına göre filtrele
-        if sulama_field == 'id':
-            # Sulama modeli kendisi için
-            filter_kwargs = {'id__in': user_sulama_ids}
-        else:
-            filter_kwargs = {f'{sulama_field}__in': user_sulama_ids}
-            
-        print(f"Filter kwargs: {filter_kwargs}")
-        filtered_queryset = queryset.filter(**filter_kwargs)
-        print(f"Filtrelenmiş queryset count: {filtered_queryset.count()}")
-        
-        return filtered_queryset
+        # Sulama field'ına göre filtrele ('id': Sulama modelinin kendisi için)
+        filter_kwargs = {f'{sulama_field}__in': list(yetkiler)}
+        return queryset.filter(**filter_kwargs)
     
     def check_sulama_permission(self, sulama_id, required_level='SADECE_OKUMA'):
         """
@@ -96,26 +69,16 @@ class SulamaBazliMixin:
         Returns:
             bool: Yetki var mı?
         """
-        if self.request.user.is_superuser:
+        yetkiler = self.get_sulama_yetkileri()
+        if yetkiler is None:
             return True
-            
-        try:
-            user_profile = self.request.user.profil
-            user_permission = KullaniciSulamaYetkisi.objects.get(
-                kullanici_profili=user_profile,
-                sulama_id=sulama_id,
-                aktif=True
-            )
-            
-            # Yetki seviyeleri hiyerarşik kontrolü
-            levels = ['SADECE_OKUMA', 'VERI_GIRISI', 'YONETICI', 'SUPER_YONETICI']
-            user_level_index = levels.index(user_permission.yetki_seviyesi)
-            required_level_index = levels.index(required_level)
-            
-            return user_level_index >= required_level_index
-            
-        except (KullaniciSulamaYetkisi.DoesNotExist, AttributeError):
+        
+        yetki_seviyesi = yetkiler.get(sulama_id)
+        if yetki_seviyesi is None:
             return False
+        
+        # Yetki seviyeleri hiyerarşik kontrolü
+        return yetki_seviyesi_yeterli(yetki_seviyesi, required_level)
     
     def perform_create(self, serializer):
         """
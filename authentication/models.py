@@ -115,6 +115,13 @@ class KullaniciSulamaYetkisi(models.Model):
         verbose_name_plural = "Kullanıcı Sulama Yetkileri"
         unique_together = ['kullanici_profili', 'sulama']
         ordering = ['kullanici_profili__user__username', 'sulama__isim']
+        indexes = [
+            # yetki_kapsami._veritabanindan_oku: sadece aktif yetkiler, index-only scan
+            models.Index(
+                fields=['kullanici_profili'], condition=models.Q(aktif=True),
+                include=['sulama', 'yetki_seviyesi', 'bitis_tarihi'], name='aktif_sulama_yetkisi_idx',
+            ),
+        ]
 
 
 class GirisKaydi(models.Model):
@@ -135,11 +142,12 @@ class GirisKaydi(models.Model):
         verbose_name = "Giriş Kaydı"
         verbose_name_plural = "Giriş Kayıtları"
         ordering = ['-giris_tarihi']
+        indexes = [models.Index(fields=['user', '-giris_tarihi'], name='giris_kaydi_user_tarih_idx')]
 
 
 
 # Signal'ler - Kullanıcı oluşturulduğunda otomatik profil oluştur
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 @receiver(post_save, sender=User)
@@ -153,3 +161,18 @@ def kullanici_profili_kaydet(sender, instance, **kwargs):
     """Kullanıcı güncellendiğinde profili de kaydet"""
     if hasattr(instance, 'profil'):
         instance.profil.save()
+
+
+@receiver(post_save, sender=KullaniciSulamaYetkisi)
+@receiver(post_delete, sender=KullaniciSulamaYetkisi)
+def sulama_yetkisi_onbellegini_temizle(sender, instance, **kwargs):
+    """Yetki eklendiğinde, değiştiğinde veya silindiğinde kullanıcının yetki önbelleğini temizle"""
+    from .yetki_kapsami import yetki_onbellegini_temizle
+    yetki_onbellegini_temizle(instance.kullanici_profili.user_id)
+
+
+@receiver(post_delete, sender=KullaniciProfili)
+def profil_yetki_onbellegini_temizle(sender, instance, **kwargs):
+    """Profil silindiğinde kullanıcının yetki önbelleğini temizle"""
+    from .yetki_kapsami import yetki_onbellegini_temizle
+    yetki_onbellegini_temizle(instance.user_id)
@@ -3,6 +3,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
 from django.shortcuts import get_object_or_404
 from sulama.models import Sulama
+from .yetki_kapsami import istek_yetkileri, yetki_seviyesi_yeterli
 
 
 class SulamaYetkisiPermission(permissions.BasePermission):
@@ -16,12 +17,8 @@ class SulamaYetkisiPermission(permissions.BasePermission):
         if request.user.is_superuser:
             return True
         
-        # Kullanıcı profili var mı kontrol et
-        if not hasattr(request.user, 'profil'):
-            return False
-        
-        # En az bir sulama sistemine erişimi var mı
-        return request.user.profil.sulama_sistemleri.exists()
+        # En az bir sulama sistemine geçerli (aktif, süresi dolmamış) erişimi var mı
+        return bool(istek_yetkileri(request))
     
     def has_object_permission(self, request, view, obj):
         if not request.user.is_authenticated:
@@ -32,13 +29,11 @@ class SulamaYetkisiPermission(permissions.BasePermission):
             return True
         
         # Obje sulama sistemi ile ilişkili mi kontrol et
-        return self._check_sulama_permission(request.user, obj, view.action)
+        return self._check_sulama_permission(request, obj, view.action)
     
-    def _check_sulama_permission(self, user, obj, action):
+    def _check_sulama_permission(self, request, obj, action):
         """Obje için sulama yetkisi kontrol et"""
         try:
-            profil = user.profil
-            
             # Obje tipine göre sulama sistemini bul
             sulama = self._get_sulama_from_object(obj)
             if not sulama:
@@ -47,8 +42,9 @@ class SulamaYetkisiPermission(permissions.BasePermission):
             # Yetki seviyesini belirle
             required_permission = self._get_required_permission(action)
             
-            # Yetki kontrolü
-            return profil.has_sulama_yetkisi(sulama, required_permission)
+            # Yetki kontrolü (istek başına bir kez okunan yetkiler üzerinden)
+            yetki_seviyesi = istek_yetkileri(request).get(sulama.id)
+            return yetki_seviyesi is not None and yetki_seviyesi_yeterli(yetki_seviyesi, required_permission)
         except:
             return False
     
@@ -1,3 +1,63 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from sulama.models import Bolge, Sulama
+from .models import KullaniciSulamaYetkisi
+
+
+class SulamaYetkiKapsamiTests(TestCase):
+    """Kullanıcının sulama yetkilerinin istek başına bir kez çözülmesi"""
+
+    url = '/sulama/sulamalar/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('kullanici', 'kullanici@example.com', 'sifre1234')
+        bolge = Bolge.objects.create(isim='Test Bölge')
+        cls.aktif, cls.suresi_dolmus, cls.pasif = [
+            Sulama.objects.create(bolge=bolge, isim=isim) for isim in ('Aktif', 'Süresi Dolmuş', 'Pasif')
+        ]
+        profil = cls.user.profil
+        cls.yetki = KullaniciSulamaYetkisi.objects.create(kullanici_profili=profil, sulama=cls.aktif)
+        KullaniciSulamaYetkisi.objects.create(
+            kullanici_profili=profil, sulama=cls.suresi_dolmus,
+            bitis_tarihi=timezone.now() - timedelta(days=1)
+        )
+        KullaniciSulamaYetkisi.objects.create(kullanici_profili=profil, sulama=cls.pasif, aktif=False)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _yetki_sorgusu_sayisi(self, sorgular):
+        return sum(
+            KullaniciSulamaYetkisi._meta.db_table in sorgu['sql'] for sorgu in sorgular.captured_queries
+        )
+
+    def test_sadece_gecerli_yetkiler_tek_sorguda_okunur(self):
+        with CaptureQueriesContext(connection) as sorgular:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([sulama['id'] for sulama in response.data], [self.aktif.id])
+        self.assertEqual(self._yetki_sorgusu_sayisi(sorgular), 1)
+
+    @override_settings(SULAMA_YETKI_ONBELLEK_SURESI=60)
+    def test_istekler_arasi_onbellek_yetki_degisince_temizlenir(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as sorgular:
+            self.client.get(self.url)
+        self.assertEqual(self._yetki_sorgusu_sayisi(sorgular), 0)
+
+        self.yetki.aktif = False
+        self.yetki.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,91 @@
+"""
+Kullanıcının sulama yetki kapsamı
+
+Kullanıcının aktif ve süresi dolmamış sulama yetkileri ({sulama_id: yetki_seviyesi})
+istek başına bir kez okunur ve request üzerinde saklanır. SULAMA_YETKI_ONBELLEK_SURESI
+sıfırdan büyükse sonuç Django cache'inde de bu süre kadar tutulur; yetki veya profil
+değiştiğinde (signal'ler models.py'de) kullanıcının önbellek kaydı silinir.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+YETKI_HIYERARSISI = ['SADECE_OKUMA', 'VERI_GIRISI', 'YONETICI', 'SUPER_YONETICI']
+
+_ISTEK_ALANI = '_sulama_yetkileri'
+
+
+def _onbellek_anahtari(user_id):
+    return f'sulama_yetkileri:{user_id}'
+
+
+def _veritabanindan_oku(user):
+    """Aktif yetkileri (sulama_id, yetki_seviyesi, bitis_tarihi) listesi olarak oku"""
+    from .models import KullaniciSulamaYetkisi
+
+    return list(
+        KullaniciSulamaYetkisi.objects.filter(
+            Q(bitis_tarihi__isnull=True) | Q(bitis_tarihi__gt=timezone.now()),
+            kullanici_profili__user_id=user.id,
+            aktif=True,
+        ).values_list('sulama_id', 'yetki_seviyesi', 'bitis_tarihi')
+    )
+
+
+def kullanici_yetkileri(user):
+    """
+    Kullanıcının geçerli sulama yetkileri ({sulama_id: yetki_seviyesi})
+
+    Önbellekten gelen kayıtlarda bitiş tarihi okuma anında tekrar kontrol edilir.
+    """
+    sure = getattr(settings, 'SULAMA_YETKI_ONBELLEK_SURESI', 0)
+    satirlar = cache.get(_onbellek_anahtari(user.id)) if sure else None
+    if satirlar is None:
+        satirlar = _veritabanindan_oku(user)
+        if sure:
+            cache.set(_onbellek_anahtari(user.id), satirlar, sure)
+
+    simdi = timezone.now()
+    return {
+        sulama_id: yetki_seviyesi
+        for sulama_id, yetki_seviyesi, bitis_tarihi in satirlar
+        if bitis_tarihi is None or bitis_tarihi > simdi
+    }
+
+
+def istek_yetkileri(request):
+    """
+    İstekteki kullanıcının yetkileri - aynı istek içinde tekrar sorgulanmaz
+
+    Superuser için None döner (tüm sulama sistemlerine erişebilir).
+    """
+    user = request.user
+    if user.is_superuser:
+        return None
+
+    # DRF Request'i sarmaladığı HttpRequest üzerinde sakla ki aynı istekteki tüm görünümler paylaşsın
+    hedef = getattr(request, '_request', request)
+    yetkiler = getattr(hedef, _ISTEK_ALANI, None)
+    if yetkiler is None:
+        yetkiler = kullanici_yetkileri(user) if user.is_authenticated else {}
+        setattr(hedef, _ISTEK_ALANI, yetkiler)
+        logger.debug(
+            'Sulama yetkileri yüklendi',
+            extra={'kullanici': user.get_username(), 'sulama_idleri': sorted(yetkiler)},
+        )
+    return yetkiler
+
+
+def yetki_seviyesi_yeterli(yetki_seviyesi, gereken_seviye):
+    """Yetki seviyesi gereken seviyeye eşit veya daha yüksek mi"""
+    return YETKI_HIYERARSISI.index(yetki_seviyesi) >= YETKI_HIYERARSISI.index(gereken_seviye)
+
+
+def yetki_onbellegini_temizle(user_id):
+    """Kullanıcının önbellekteki yetki kaydını sil"""
+    cache.delete(_onbellek_anahtari(user_id))
@@ -0,0 +1,22 @@
+"""
+Gunicorn ayarları (çalışma dizinindeki bu dosya gunicorn tarafından otomatik okunur)
+
+PROMETHEUS_MULTIPROC_DIR ayarlıysa worker'lar metriklerini bu dizine yazar;
+/metrics tüm worker'ların dosyalarını toplar (sulama_project/metrikler.py).
+"""
+import os
+import shutil
+
+
+def on_starting(server):
+    # Önceki çalıştırmanın sayaçları yeni süreçlerinkine eklenmesin
+    dizin = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if dizin:
+        shutil.rmtree(dizin, ignore_errors=True)
+        os.makedirs(dizin, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,168 @@
+"""
+Abak (hacim - yükseklik/kot) eğrisi önbelleği
+
+Her kanalın ve depolama tesisinin abak tablosu süreç başına bir kez okunur,
+sıralı NumPy dizilerinde tutulur ve ikili arama (searchsorted) ile sorgulanır.
+Tablo satırları arasına düşen değerler için doğrusal interpolasyon yapılabilir.
+
+KanalAbak / DepolamaTesisiAbak kaydedildiğinde veya silindiğinde (signal'ler
+models.py'de) kanalın/tesisin abak_surumu artırılır ve bu süreçteki kopya temizlenir.
+Her okumada istenen kanalların/tesislerin sürümleri tek sorguyla okunur; sürümü
+değişmiş eğriler (diğer gunicorn worker'larında değiştirilmiş olsalar da) yeniden
+yüklenir. ABAK_ONBELLEK_SURESI ayrıca üst yaşam süresidir.
+"""
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+
+class AbakEgrisi:
+    """Tek bir kanal veya depolama tesisine ait sıralı abak eğrisi"""
+
+    def __init__(self, degerler, hacimler, surum=None):
+        self.degerler = np.asarray(degerler, dtype=float)
+        self.hacimler = np.asarray(hacimler, dtype=float)
+        self.surum = surum
+        self.yuklenme_zamani = time.monotonic()
+
+    def __len__(self):
+        return len(self.degerler)
+
+    @property
+    def minimum(self):
+        return float(self.degerler[0]) if len(self) else None
+
+    @property
+    def maksimum(self):
+        return float(self.degerler[-1]) if len(self) else None
+
+    def kapsar(self, deger):
+        """Değer abak aralığında mı (interpolasyonla hesaplanabilir mi)"""
+        return bool(len(self)) and self.degerler[0] <= deger <= self.degerler[-1]
+
+    def hacimler_bul(self, degerler, interpolasyon=True):
+        """
+        Birden çok yükseklik/kot değeri için hacimleri tek seferde hesapla
+
+        Bulunamayan değerler (aralık dışı veya interpolasyon kapalıyken tam eşleşme yok)
+        NaN olarak döner.
+        """
+        degerler = np.asarray(degerler, dtype=float)
+        sonuc = np.full(degerler.shape, np.nan)
+        if not len(self):
+            return sonuc
+
+        indeksler = np.clip(np.searchsorted(self.degerler, degerler), 0, len(self) - 1)
+        # searchsorted sol komşuyu da kontrol etmek için bir önceki indeks
+        onceki = np.clip(indeksler - 1, 0, len(self) - 1)
+        tam_eslesme = np.isclose(self.degerler[indeksler], degerler, rtol=0, atol=1e-9)
+        onceki_eslesme = np.isclose(self.degerler[onceki], degerler, rtol=0, atol=1e-9)
+        sonuc[tam_eslesme] = self.hacimler[indeksler[tam_eslesme]]
+        sonuc[onceki_eslesme] = self.hacimler[onceki[onceki_eslesme]]
+
+        if interpolasyon:
+            aralikta = (degerler >= self.degerler[0]) & (degerler <= self.degerler[-1]) & np.isnan(sonuc)
+            sonuc[aralikta] = np.interp(degerler[aralikta], self.degerler, self.hacimler)
+        return sonuc
+
+    def hacim_bul(self, deger, interpolasyon=True):
+        """Tek bir değer için hacim; bulunamazsa None"""
+        if deger is None:
+            return None
+        hacim = self.hacimler_bul([deger], interpolasyon=interpolasyon)[0]
+        return None if np.isnan(hacim) else float(hacim)
+
+
+class AbakOnbellegi:
+    """Süreç içi abak eğrisi önbelleği (model başına bir örnek)"""
+
+    def __init__(self, model_adi, sahip_alani, deger_alani):
+        self.model_adi = model_adi
+        self.sahip_alani = sahip_alani
+        self.deger_alani = deger_alani
+        self._egriler = {}
+        self._kilit = threading.Lock()
+
+    def _model(self):
+        from django.apps import apps
+        return apps.get_model('sulama', self.model_adi)
+
+    def _gecerli(self, egri, surum):
+        sure = getattr(settings, 'ABAK_ONBELLEK_SURESI', 300)
+        return egri.surum == surum and (sure is None or time.monotonic() - egri.yuklenme_zamani < sure)
+
+    def egriler(self, sahip_idleri):
+        """
+        Verilen kanal/tesis id'lerinin eğrilerini döndür ({id: AbakEgrisi})
+
+        Kanal/tesis abak sürümleri tek sorguda okunur; önbellekte olmayan veya sürümü
+        değişmiş eğriler tek sorguda yüklenir. Sürümler satırlardan önce okunduğundan
+        eğri kaydedilen sürümden eski olamaz.
+        """
+        sahip_idleri = set(sahip_idleri)
+        if not sahip_idleri:
+            return {}
+        sahip_modeli = self._model()._meta.get_field(self.sahip_alani).related_model
+        surumler = dict(sahip_modeli.objects.filter(id__in=sahip_idleri).values_list('id', 'abak_surumu'))
+        sonuc = {}
+        with self._kilit:
+            for sahip_id in sahip_idleri:
+                egri = self._egriler.get(sahip_id)
+                if egri is not None and self._gecerli(egri, surumler.get(sahip_id)):
+                    sonuc[sahip_id] = egri
+        eksikler = sahip_idleri - set(sonuc)
+        if not eksikler:
+            return sonuc
+
+        satirlar = {sahip_id: ([], []) for sahip_id in eksikler}
+        for sahip_id, deger, hacim in self._model().objects.filter(
+            **{f'{self.sahip_alani}_id__in': eksikler}
+        ).order_by(f'{self.sahip_alani}_id', self.deger_alani).values_list(
+            f'{self.sahip_alani}_id', self.deger_alani, 'hacim'
+        ):
+            satirlar[sahip_id][0].append(deger)
+            satirlar[sahip_id][1].append(hacim)
+
+        yeni_egriler = {
+            sahip_id: AbakEgrisi(*satir, surum=surumler.get(sahip_id)) for sahip_id, satir in satirlar.items()
+        }
+        with self._kilit:
+            self._egriler.update(yeni_egriler)
+        sonuc.update(yeni_egriler)
+        return sonuc
+
+    def toplu_hacim_bul(self, sahip_idleri, degerler, interpolasyon=True):
+        """
+        Her (kanal/tesis, değer) çifti için hacim dizisi; bulunamayanlar NaN
+
+        Gerekli eğriler tek seferde yüklenir, her eğri için hesap vektörel yapılır.
+        """
+        sahip_idleri = np.asarray(sahip_idleri)
+        degerler = np.asarray(degerler, dtype=float)
+        sonuc = np.full(degerler.shape, np.nan)
+        for sahip_id, egri in self.egriler(sahip_idleri.tolist()).items():
+            maske = sahip_idleri == sahip_id
+            sonuc[maske] = egri.hacimler_bul(degerler[maske], interpolasyon=interpolasyon)
+        return sonuc
+
+    def egri(self, sahip_id):
+        """Tek bir kanal/tesis için eğri"""
+        return self.egriler([sahip_id])[sahip_id]
+
+    def hacim_bul(self, sahip_id, deger, interpolasyon=True):
+        """Kanal/tesis ve yükseklik/kot değeri için hacim; bulunamazsa None"""
+        return self.egri(sahip_id).hacim_bul(deger, interpolasyon=interpolasyon)
+
+    def temizle(self, sahip_id=None):
+        """Önbellekten bir eğriyi veya tümünü sil"""
+        with self._kilit:
+            if sahip_id is None:
+                self._egriler.clear()
+            else:
+                self._egriler.pop(sahip_id, None)
+
+
+kanal_abaklari = AbakOnbellegi('KanalAbak', 'kanal', 'yukseklik')
+depolama_abaklari = AbakOnbellegi('DepolamaTesisiAbak', 'depolama_tesisi', 'kot')
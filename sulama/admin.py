@@ -1,9 +1,9 @@
 from django.contrib import admin
 from .models import (
     Bolge, Sulama, DepolamaTesisi, DepolamaTesisiAbak, 
-    Kanal, KanalAbak, GunlukSebekeyeAlinanSuMiktari,
+    Kanal, KanalAbak, GunlukSebekeyeAlinanSuMiktari, AylikKanalSuOzeti,
     GunlukDepolamaTesisiSuMiktari, UrunKategorisi, Urun, 
-    YillikGenelSuTuketimi, YillikUrunDetay
+    YillikGenelSuTuketimi, YillikUrunDetay, ArkaPlanIsi
 )
 
 
@@ -108,6 +108,20 @@ class GunlukSebekeyeAlinanSuMiktariAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(AylikKanalSuOzeti)
+class AylikKanalSuOzetiAdmin(admin.ModelAdmin):
+    """Ölçümlerden türetilir - sadece görüntüleme"""
+    list_display = ['kanal', 'yil', 'ay', 'toplam_su', 'kayit_sayisi', 'acik_kalma_dakika', 'guncelleme_tarihi']
+    list_filter = ['yil', 'kanal__depolama_tesisi__sulama__bolge']
+    search_fields = ['kanal__isim']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(GunlukDepolamaTesisiSuMiktari)
 class GunlukDepolamaTesisiSuMiktariAdmin(admin.ModelAdmin):
     list_display = ['depolama_tesisi', 'tarih', 'kot', 'su_miktari']
@@ -191,7 +205,7 @@ class YillikGenelSuTuketimiAdmin(admin.ModelAdmin):
     )
     
     def get_urun_sayisi(self, obj):
-        return obj.urun_detaylari.count()
+        return obj.urun_sayisi
     get_urun_sayisi.short_description = 'Ürün Sayısı'
     
     def get_toplam_alan(self, obj):
@@ -249,3 +263,14 @@ class YillikUrunDetayAdmin(admin.ModelAdmin):
     def get_ur_toplami(self, obj):
         return f"{obj.get_ur_toplami():.2f}"
     get_ur_toplami.short_description = 'UR Toplamı'
+
+
+
+@admin.register(ArkaPlanIsi)
+class ArkaPlanIsiAdmin(admin.ModelAdmin):
+    list_display = ['id', 'tur', 'durum', 'ilerleme', 'kullanici', 'olusturma_tarihi', 'bitis_tarihi']
+    list_filter = ['tur', 'durum', 'olusturma_tarihi']
+    search_fields = ['tur', 'kullanici__username', 'hata']
+    readonly_fields = [
+        'olusturma_tarihi', 'baslama_tarihi', 'bitis_tarihi', 'guncelleme_tarihi', 'calisan'
+    ]
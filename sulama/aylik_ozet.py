@@ -0,0 +1,119 @@
+"""
+Aylık kanal su özeti (AylikKanalSuOzeti) bakımı
+
+Özet satırları artımlı (+/-) değil, etkilenen (kanal, yıl, ay) anahtarları için ham
+ölçümlerden tek bir gruplu sorguyla yeniden hesaplanır; böylece silme ve güncellemelerde
+en az/en çok değerleri de doğru kalır. Aynı kanalı yenileyen eşzamanlı transaction'lar
+kanal satırı kilitlenerek sıraya konur: sonra gelen yenileme, öncekinin işlediği ölçümleri
+de görür.
+"""
+import calendar
+import operator
+from datetime import date
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Max, Min, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from .models import AylikKanalSuOzeti, GunlukSebekeyeAlinanSuMiktari, Kanal
+
+OZET_ALANLARI = ['toplam_su', 'kayit_sayisi', 'en_az_su', 'en_cok_su', 'acik_kalma_dakika', 'guncelleme_tarihi']
+
+
+def ay_sonu(tarih):
+    return tarih.replace(day=calendar.monthrange(tarih.year, tarih.month)[1])
+
+
+def ay_araligi_q(baslangic, bitis):
+    """baslangic ve bitis tarihlerinin aylarını (dahil) kapsayan yil/ay filtresi"""
+    return (
+        (Q(yil__gt=baslangic.year) | Q(yil=baslangic.year, ay__gte=baslangic.month))
+        & (Q(yil__lt=bitis.year) | Q(yil=bitis.year, ay__lte=bitis.month))
+    )
+
+
+def tam_aylar_mi(baslangic, bitis):
+    """Tarih aralığı ayın ilk gününden başlayıp bir ayın son gününde mi bitiyor"""
+    return baslangic.day == 1 and bitis == ay_sonu(bitis) and baslangic <= bitis
+
+
+def _hesapla(olcumler):
+    """Ölçüm queryset'ini (kanal, yıl, ay) bazında topla"""
+    satirlar = olcumler.order_by().annotate(
+        yil=ExtractYear('tarih'), ay=ExtractMonth('tarih')
+    ).values('kanal_id', 'yil', 'ay').annotate(
+        toplam=Sum('su_miktari'),
+        sayi=Count('id'),
+        en_az=Min('su_miktari'),
+        en_cok=Max('su_miktari'),
+        acik_kalma=Sum(ExpressionWrapper(F('bitis_saati') - F('baslangic_saati'), output_field=DurationField())),
+    )
+    return [
+        AylikKanalSuOzeti(
+            kanal_id=satir['kanal_id'], yil=satir['yil'], ay=satir['ay'],
+            toplam_su=satir['toplam'] or 0, kayit_sayisi=satir['sayi'],
+            en_az_su=satir['en_az'], en_cok_su=satir['en_cok'],
+            acik_kalma_dakika=satir['acik_kalma'].total_seconds() / 60 if satir['acik_kalma'] else 0,
+        )
+        for satir in satirlar
+    ]
+
+
+def _kanallari_kilitle(kanal_idleri):
+    list(Kanal.objects.select_for_update().filter(pk__in=kanal_idleri).order_by('pk').values_list('pk', flat=True))
+
+
+def aylik_ozetleri_yenile(anahtarlar):
+    """
+    Verilen (kanal_id, yil, ay) özetlerini ham ölçümlerden yeniden hesapla
+
+    Çağıranın transaction'ı içinde çalışır. Ölçümü kalmayan ayların özet satırı silinir.
+    """
+    anahtarlar = {(kanal_id, yil, ay) for kanal_id, yil, ay in anahtarlar if kanal_id is not None}
+    if not anahtarlar:
+        return
+
+    kanal_idleri = sorted({kanal_id for kanal_id, _, _ in anahtarlar})
+    aylar = sorted({(yil, ay) for _, yil, ay in anahtarlar})
+    with transaction.atomic():
+        _kanallari_kilitle(kanal_idleri)
+        ozetler = [
+            ozet for ozet in _hesapla(GunlukSebekeyeAlinanSuMiktari.objects.filter(
+                kanal_id__in=kanal_idleri,
+                tarih__gte=date(*aylar[0], 1),
+                tarih__lte=ay_sonu(date(*aylar[-1], 1)),
+            ))
+            if (ozet.kanal_id, ozet.yil, ozet.ay) in anahtarlar
+        ]
+        if ozetler:
+            AylikKanalSuOzeti.objects.bulk_create(
+                ozetler, update_conflicts=True, unique_fields=['kanal', 'yil', 'ay'], update_fields=OZET_ALANLARI,
+            )
+        bos_aylar = anahtarlar - {(ozet.kanal_id, ozet.yil, ozet.ay) for ozet in ozetler}
+        if bos_aylar:
+            AylikKanalSuOzeti.objects.filter(reduce(operator.or_, (
+                Q(kanal_id=kanal_id, yil=yil, ay=ay) for kanal_id, yil, ay in bos_aylar
+            ))).delete()
+
+
+def aylik_ozetleri_yeniden_olustur(baslangic, bitis, kanal_idleri=None):
+    """
+    baslangic-bitis tarihlerinin aylarındaki tüm özetleri sil ve baştan hesapla
+
+    Yazılan özet satırı sayısını döndürür.
+    """
+    baslangic, bitis = baslangic.replace(day=1), ay_sonu(bitis)
+    olcumler = GunlukSebekeyeAlinanSuMiktari.objects.filter(tarih__gte=baslangic, tarih__lte=bitis)
+    mevcut = AylikKanalSuOzeti.objects.filter(ay_araligi_q(baslangic, bitis))
+    kanallar = Kanal.objects.all()
+    if kanal_idleri is not None:
+        olcumler = olcumler.filter(kanal_id__in=kanal_idleri)
+        mevcut = mevcut.filter(kanal_id__in=kanal_idleri)
+        kanallar = kanallar.filter(pk__in=kanal_idleri)
+
+    with transaction.atomic():
+        _kanallari_kilitle(kanallar.values('pk'))
+        mevcut.delete()
+        ozetler = AylikKanalSuOzeti.objects.bulk_create(_hesapla(olcumler), batch_size=1000)
+    return len(ozetler)
@@ -0,0 +1,172 @@
+"""
+Günlük ölçüm tablolarının tarih yılına göre bölümlenmesi (PostgreSQL, isteğe bağlı)
+
+Bölümlü tabloda her yıl ayrı bir tablodur (<tablo>_<yıl>) ve indeksleri de yıl bazındadır;
+sorgular tarih filtresiyle yalnızca ilgili yılların bölümlerine iner (partition pruning),
+eski sezonların indeksleri sıcak çalışma kümesine girmez. Aralık dışı tarihler
+<tablo>_diger varsayılan bölümüne düşer. PostgreSQL'de bölümlü tablonun birincil anahtarı
+ve tekil kısıtları bölüm anahtarını içermek zorunda olduğundan birincil anahtar
+(id, tarih) olur; Django tarafında pk hâlâ id'dir ve ORM sorguları değişmez.
+
+Dönüşüm tabloyu yeni adla yeniden oluşturup veriyi kopyalar; tek transaction'da çalışır ve
+süresince tabloya yazma/okuma kilitlenir (bakım penceresinde çalıştırın).
+"""
+from django.db import transaction
+from django.utils import timezone
+
+VARSAYILAN_BOLUM = 'diger'
+
+
+def _ad(connection, ad):
+    return connection.ops.quote_name(ad)
+
+
+def bolumlu_mu(connection, tablo):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [tablo])
+        satir = cursor.fetchone()
+    return satir is not None and satir[0] == 'p'
+
+
+def yil_bolumleri(connection, tablo):
+    """Tablonun yıl bölümleri, küçükten büyüğe"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s)", [tablo]
+        )
+        ekler = [ad[len(tablo) + 1:] for (ad,) in cursor.fetchall()]
+    return sorted(int(ek) for ek in ekler if ek.isdigit())
+
+
+def _tanimlari_oku(cursor, tablo):
+    """Birincil anahtar adı, diğer kısıtların (ad, tanım) listesi ve kısıt dışı indeks tanımları"""
+    cursor.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass ORDER BY contype, conname", [tablo]
+    )
+    pk_adi, kisitlar = f'{tablo}_pkey', []
+    for ad, tur, tanim in cursor.fetchall():
+        if tur == 'p':
+            pk_adi = ad
+        else:
+            kisitlar.append((ad, tanim))
+    cursor.execute(
+        "SELECT pg_get_indexdef(x.indexrelid) FROM pg_index x WHERE x.indrelid = %s::regclass "
+        "AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid AND c.conrelid = x.indrelid) "
+        "ORDER BY x.indexrelid", [tablo]
+    )
+    # Bölümlü tablodaki indeks tanımı "ON ONLY" ile döner; yeniden oluştururken tüm bölümlere uygulanmalı
+    indeksler = [tanim.replace(' ON ONLY ', ' ON ', 1) for (tanim,) in cursor.fetchall()]
+    return pk_adi, kisitlar, indeksler
+
+
+def _yil_araligi(yil):
+    return f"FROM ('{yil:04d}-01-01') TO ('{yil + 1:04d}-01-01')"
+
+
+def _yeniden_olustur(connection, tablo, yillar):
+    """
+    Tabloyu aynı kolonlar, kısıtlar ve indekslerle yeniden oluştur ve veriyi taşı
+
+    yillar None ise düz tablo, değilse bu yılların bölümleriyle tarih'e göre bölümlü tablo.
+    """
+    q = lambda ad: _ad(connection, ad)
+    eski = f'{tablo}_eski'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conrelid::regclass::text FROM pg_constraint WHERE confrelid = %s::regclass AND contype = 'f'", [tablo]
+        )
+        referanslar = [ad for (ad,) in cursor.fetchall()]
+        if referanslar:
+            raise ValueError(f"{tablo} tablosuna yabancı anahtarla bağlı tablolar var: {', '.join(referanslar)}")
+
+        # Bekleyen ertelenmiş yabancı anahtar kontrolleri ALTER TABLE'ı engeller
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        pk_adi, kisitlar, indeksler = _tanimlari_oku(cursor, tablo)
+
+        cursor.execute(f'ALTER TABLE {q(tablo)} RENAME TO {q(eski)}')
+        bolumleme = ' PARTITION BY RANGE (tarih)' if yillar is not None else ''
+        cursor.execute(f'CREATE TABLE {q(tablo)} (LIKE {q(eski)} INCLUDING STORAGE INCLUDING COMMENTS){bolumleme}')
+        if yillar is not None:
+            cursor.execute(f'CREATE TABLE {q(f"{tablo}_{VARSAYILAN_BOLUM}")} PARTITION OF {q(tablo)} DEFAULT')
+            for yil in yillar:
+                cursor.execute(f'CREATE TABLE {q(f"{tablo}_{yil}")} PARTITION OF {q(tablo)} FOR VALUES {_yil_araligi(yil)}')
+
+        # Veri indeksler yokken kopyalanır; eski tablo kendi dizisi ve bölümleriyle birlikte silinir
+        cursor.execute(f'INSERT INTO {q(tablo)} SELECT * FROM {q(eski)}')
+        cursor.execute(f'DROP TABLE {q(eski)}')
+
+        if yillar is None:
+            cursor.execute(f'ALTER TABLE {q(tablo)} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+        else:
+            # PostgreSQL 17 öncesinde bölümlü tabloda identity kolon olamaz
+            dizi = f'{tablo}_id_seq'
+            cursor.execute(f'CREATE SEQUENCE {q(dizi)} AS bigint OWNED BY {q(tablo)}.id')
+            cursor.execute(f'ALTER TABLE {q(tablo)} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)', [dizi])
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {q(tablo)}", [tablo]
+        )
+
+        pk_kolonlari = 'id, tarih' if yillar is not None else 'id'
+        cursor.execute(f'ALTER TABLE {q(tablo)} ADD CONSTRAINT {q(pk_adi)} PRIMARY KEY ({pk_kolonlari})')
+        for ad, tanim in kisitlar:
+            cursor.execute(f'ALTER TABLE {q(tablo)} ADD CONSTRAINT {q(ad)} {tanim}')
+        for tanim in indeksler:
+            cursor.execute(tanim)
+        # Yeni tablonun istatistiği yok; VACUUM transaction içinde çalışmadığından sonradan ayrıca önerilir
+        cursor.execute(f'ANALYZE {q(tablo)}')
+        cursor.execute('SET CONSTRAINTS ALL DEFERRED')
+
+
+def tabloyu_bolumle(connection, tablo, ileri_yil_sayisi=1):
+    """
+    Düz tabloyu tarih yılına göre bölümlü tabloya dönüştür
+
+    İlk ölçümün yılından bu yıl + ileri_yil_sayisi'na kadar her yıl için bölüm açılır.
+    Tablo zaten bölümlüyse False döner.
+    """
+    if bolumlu_mu(connection, tablo):
+        return False
+    with transaction.atomic(using=connection.alias):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT MIN(tarih), MAX(tarih) FROM {_ad(connection, tablo)}')
+            ilk, son = cursor.fetchone()
+        bu_yil = timezone.localdate().year
+        ilk_yil = min(ilk.year, bu_yil) if ilk else bu_yil
+        son_yil = max(son.year if son else bu_yil, bu_yil + ileri_yil_sayisi)
+        _yeniden_olustur(connection, tablo, list(range(ilk_yil, son_yil + 1)))
+    return True
+
+
+def bolumlemeyi_kaldir(connection, tablo):
+    """Bölümlü tabloyu tekrar düz tabloya dönüştür; tablo bölümlü değilse False döner"""
+    if not bolumlu_mu(connection, tablo):
+        return False
+    with transaction.atomic(using=connection.alias):
+        _yeniden_olustur(connection, tablo, None)
+    return True
+
+
+def yil_bolumu_olustur(connection, tablo, yil):
+    """
+    Bölümlü tabloya yıl bölümü ekle; bölüm zaten varsa False döner
+
+    Varsayılan bölüme düşmüş o yıla ait satırlar yeni bölüme taşınır.
+    """
+    if yil in yil_bolumleri(connection, tablo):
+        return False
+    q = lambda ad: _ad(connection, ad)
+    bolum, varsayilan = f'{tablo}_{yil}', f'{tablo}_{VARSAYILAN_BOLUM}'
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {q(bolum)} (LIKE {q(tablo)} INCLUDING DEFAULTS INCLUDING STORAGE)')
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [varsayilan])
+        if cursor.fetchone()[0]:
+            cursor.execute(
+                f'WITH tasinan AS (DELETE FROM {q(varsayilan)} WHERE tarih >= %s AND tarih < %s RETURNING *) '
+                f'INSERT INTO {q(bolum)} SELECT * FROM tasinan',
+                [f'{yil:04d}-01-01', f'{yil + 1:04d}-01-01']
+            )
+        # Üst tablonun indeks ve kısıtları bağlanırken bölümde oluşturulur
+        cursor.execute(f'ALTER TABLE {q(tablo)} ATTACH PARTITION {q(bolum)} FOR VALUES {_yil_araligi(yil)}')
+    return True
@@ -0,0 +1,261 @@
+"""
+Dashboard aylık su kullanımı hesabı ve sürümlü yanıt önbelleği
+
+Yanıt (kullanıcının yetki kapsamı, sulama, yıl, güncel ay) anahtarıyla Django cache'inde,
+hesaplandığı andaki veri sürümüyle birlikte saklanır. Veri sürümü kapsamdaki sulamaların
+SulamaVeriSurumu satırlarından okunur; ölçüm, plan veya ürün kaydedilip silindikçe
+artırılır (signal'ler models.py'de, toplu yüklemeler iceri_aktarma.py'de). Sürüm
+veritabanında tutulduğu için cache süreç içi (LocMem) olsa da tüm gunicorn işçileri
+değişikliği aynı anda görür.
+
+Sürümü eskimiş kayıt DASHBOARD_BAYAT_SURESI saniyeden yeni ise hemen döndürülür ve
+arka planda yenilenir (stale-while-revalidate); daha eskiyse istek içinde hesaplanır.
+DASHBOARD_BAYAT_SURESI=0 ile bayat yanıt ve arka plan yenilemesi kapanır (testler, ölçümler).
+İsabet/ıska sayaçları onbellek_istatistikleri() ile okunur.
+"""
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F, Sum, Window
+from django.db.models.functions import Extract, RowNumber
+
+from .models import AylikKanalSuOzeti, GunlukDepolamaTesisiSuMiktari, SulamaVeriSurumu, YillikGenelSuTuketimi
+
+logger = logging.getLogger(__name__)
+
+SAYACLAR = ('hit', 'stale', 'miss')
+
+
+def aylik_su_kullanimi_hesapla(yil, sulama_id=None, sulama_idleri=None):
+    """
+    Aylık şebeke, depolama ve planlanan tüketim karşılaştırması
+
+    Args:
+        sulama_id: Tek bir sulama ile sınırla
+        sulama_idleri: Kullanıcının yetkili olduğu sulamalar (None: tümü)
+    """
+    # Base queryset'leri hazırla
+    # Şebeke suyu ham ölçümler yerine aylık kanal özetlerinden okunur
+    sebeke_qs = AylikKanalSuOzeti.objects.filter(yil=yil)
+    depolama_qs = GunlukDepolamaTesisiSuMiktari.objects.filter(tarih__year=yil)
+    tuketim_qs = YillikGenelSuTuketimi.objects.filter(yil=yil)
+
+    # Sulama filtreleme
+    if sulama_id is not None:
+        sebeke_qs = sebeke_qs.filter(kanal__depolama_tesisi__sulama_id=sulama_id)
+        depolama_qs = depolama_qs.filter(depolama_tesisi__sulama_id=sulama_id)
+        tuketim_qs = tuketim_qs.filter(sulama_id=sulama_id)
+
+    # Yetki kapsamı
+    if sulama_idleri is not None:
+        sebeke_qs = sebeke_qs.filter(kanal__depolama_tesisi__sulama_id__in=sulama_idleri)
+        depolama_qs = depolama_qs.filter(depolama_tesisi__sulama_id__in=sulama_idleri)
+        tuketim_qs = tuketim_qs.filter(sulama_id__in=sulama_idleri)
+
+    # Aylar için boş veri yapısı
+    aylik_veri = {}
+    aylar = [
+        ('01', 'Ocak'), ('02', 'Şubat'), ('03', 'Mart'), ('04', 'Nisan'),
+        ('05', 'Mayıs'), ('06', 'Haziran'), ('07', 'Temmuz'), ('08', 'Ağustos'),
+        ('09', 'Eylül'), ('10', 'Ekim'), ('11', 'Kasım'), ('12', 'Aralık')
+    ]
+
+    for ay_no, ay_isim in aylar:
+        aylik_veri[ay_no] = {
+            'ay': ay_isim,
+            'ay_no': int(ay_no),
+            'sebeke_su': 0,  # Şebekeye alınan toplam su (m³)
+            'depolama_su': 0,  # Depolamadaki ortalama su (m³)
+            'tuketim_su': 0,  # Genel tüketim (m³)
+            'sebeke_kayit_sayisi': 0,
+            'depolama_kayit_sayisi': 0,
+            'tuketim_kayit_sayisi': 0
+        }
+
+    # 1. Şebekeye Alınan Su (Aylık toplam)
+    sebeke_veriler = sebeke_qs.order_by().values('ay').annotate(
+        toplam_su=Sum('toplam_su'),
+        kayit_sayisi=Sum('kayit_sayisi')
+    )
+
+    for veri in sebeke_veriler:
+        ay = f"{veri['ay']:02d}"  # 01, 02, 03 formatında
+        if ay in aylik_veri:
+            aylik_veri[ay]['sebeke_su'] = float(veri['toplam_su'] or 0)
+            aylik_veri[ay]['sebeke_kayit_sayisi'] = veri['kayit_sayisi']
+
+    # 2. Depolama Tesisindeki Su (Her ay için son tarihteki toplam)
+    # Her tesisin her aydaki son kaydı tek sorguda (ROW_NUMBER penceresi) alınır
+    son_depolama_kayitlari = depolama_qs.annotate(
+        ay=Extract('tarih', 'month'),
+        sira=Window(
+            expression=RowNumber(),
+            partition_by=[F('depolama_tesisi'), Extract('tarih', 'month')],
+            order_by=F('tarih').desc(),
+        ),
+    ).filter(sira=1).order_by().values_list('ay', 'su_miktari')
+
+    for ay, su_miktari in son_depolama_kayitlari:
+        ay_no = f"{ay:02d}"
+        if ay_no in aylik_veri:
+            aylik_veri[ay_no]['depolama_su'] += float(su_miktari or 0)
+            aylik_veri[ay_no]['depolama_kayit_sayisi'] += 1
+
+    # 3. Genel Su Tüketimi (kayıtlarda saklanan aylık net su ihtiyacı)
+    net_su_aylik_listesi = list(tuketim_qs.order_by().values_list('net_su_aylik', flat=True))
+    tuketim_kayit_sayisi = len(net_su_aylik_listesi)
+    aylik_tuketimler = [0.0] * 12
+    for net_su_aylik in net_su_aylik_listesi:
+        for ay_idx, net_su in enumerate(net_su_aylik[:12]):
+            # hm³ -> m³
+            aylik_tuketimler[ay_idx] += (net_su or 0) * 1000000
+
+    for ay_idx, (ay_no, _) in enumerate(aylar):
+        aylik_veri[ay_no]['tuketim_su'] = float(aylik_tuketimler[ay_idx])
+        aylik_veri[ay_no]['tuketim_kayit_sayisi'] = tuketim_kayit_sayisi
+
+    # Toplam yıllık tüketimi hesapla
+    toplam_yillik_tuketim = sum(aylik_veri[ay_no]['tuketim_su'] for ay_no, _ in aylar)
+
+    # Sıralı liste haline getir
+    aylik_liste = [aylik_veri[ay_no] for ay_no, _ in aylar]
+
+    # Güncel depo durumu vs Gelecek ihtiyaç analizi
+    guncel_ay = datetime.now().month
+    guncel_depo_miktari = 0
+    gelecek_ihtiyac = 0
+
+    # Güncel ayın depo miktarı (tüm depoların toplamı)
+    if guncel_ay <= 12:
+        guncel_ay_str = f"{guncel_ay:02d}"
+        guncel_depo_miktari = aylik_veri[guncel_ay_str]['depolama_su']
+
+    # Güncel aydan sonraki ayların planlanan tüketimi
+    for ay_idx in range(guncel_ay, 12):  # Güncel aydan sonraki aylar
+        ay_no = f"{ay_idx + 1:02d}"
+        if ay_no in aylik_veri:
+            gelecek_ihtiyac += aylik_veri[ay_no]['tuketim_su']
+
+    # Yeterlilik durumu
+    yeterlilik_durumu = "Yeterli" if guncel_depo_miktari >= gelecek_ihtiyac else "Yetersiz"
+    yeterlilik_orani = (guncel_depo_miktari / gelecek_ihtiyac * 100) if gelecek_ihtiyac > 0 else 100
+
+    # Toplam istatistikler
+    toplam_istatistikler = {
+        'toplam_sebeke_su': sum(veri['sebeke_su'] for veri in aylik_liste),
+        'toplam_depolama_su': sum(veri['depolama_su'] for veri in aylik_liste),
+        'toplam_tuketim_su': toplam_yillik_tuketim,
+        'toplam_sebeke_kayit': sum(veri['sebeke_kayit_sayisi'] for veri in aylik_liste),
+        'toplam_depolama_kayit': sum(veri['depolama_kayit_sayisi'] for veri in aylik_liste),
+        'toplam_tuketim_kayit': tuketim_kayit_sayisi,
+        'yil': yil,
+        'sulama_id': sulama_id,
+        # Yeni eklenen analizler
+        'guncel_depo_miktari': guncel_depo_miktari,
+        'gelecek_ihtiyac': gelecek_ihtiyac,
+        'yeterlilik_durumu': yeterlilik_durumu,
+        'yeterlilik_orani': round(yeterlilik_orani, 1),
+        'guncel_ay': guncel_ay
+    }
+
+    return {
+        'aylik_veriler': aylik_liste,
+        'istatistikler': toplam_istatistikler,
+        'success': True
+    }
+
+
+def _sayac_artir(ad):
+    anahtar = f'dashboard_onbellek:{ad}'
+    cache.add(anahtar, 0, None)
+    try:
+        cache.incr(anahtar)
+    except ValueError:
+        # Sayaç add ile incr arasında silinmiş (ör. cache.clear)
+        cache.set(anahtar, 1, None)
+
+
+def onbellek_istatistikleri():
+    """İsabet (hit), bayat (stale) ve ıska (miss) sayaçları"""
+    degerler = cache.get_many([f'dashboard_onbellek:{ad}' for ad in SAYACLAR])
+    sayaclar = {ad: degerler.get(f'dashboard_onbellek:{ad}', 0) for ad in SAYACLAR}
+    toplam = sum(sayaclar.values())
+    sayaclar['isabet_orani'] = round((sayaclar['hit'] + sayaclar['stale']) / toplam, 3) if toplam else None
+    return sayaclar
+
+
+def _veri_surumu(sulama_id, sulama_idleri):
+    """Kapsamdaki sulamaların sürümlerinden tek bir sürüm anahtarı üret"""
+    if sulama_id is not None:
+        sulama_idleri = [sulama_id] if sulama_idleri is None or sulama_id in sulama_idleri else []
+    return SulamaVeriSurumu.kapsam_surumu(sulama_idleri)[0]
+
+
+def _onbellek_anahtari(yil, sulama_id, sulama_idleri):
+    kapsam = 'tum' if sulama_idleri is None else hashlib.sha1(
+        ','.join(str(sulama) for sulama in sorted(sulama_idleri)).encode()
+    ).hexdigest()[:16]
+    # Güncel ay yanıtta kullanıldığı için anahtara dahil edilir
+    return f"dashboard:aylik:{kapsam}:{sulama_id or 'tum'}:{yil}:{datetime.now():%Y%m}"
+
+
+def _arka_planda_calistir(fonksiyon):
+    """
+    Yenilemeyi istekten bağımsız bir thread'de çalıştır
+
+    Thread kendi veritabanı bağlantısını açar; açık transaction'ın yazdıklarını göremez ve
+    kilitlerine takılabilir. Bu yüzden transaction içindeyken commit'ten sonra başlatılır,
+    geri alınırsa hiç başlatılmaz (transaction dışında hemen başlar).
+    """
+    def calistir():
+        try:
+            fonksiyon()
+        except Exception:
+            logger.exception('Dashboard önbelleği yenilenemedi')
+        finally:
+            connection.close()
+
+    transaction.on_commit(lambda: threading.Thread(target=calistir, daemon=True).start())
+
+
+def aylik_su_kullanimi(yil, sulama_id=None, sulama_idleri=None):
+    """
+    Önbellekli aylık su kullanımı
+
+    Returns:
+        (veri, durum) - durum: 'HIT', 'STALE' veya 'MISS'
+    """
+    anahtar = _onbellek_anahtari(yil, sulama_id, sulama_idleri)
+    surum = _veri_surumu(sulama_id, sulama_idleri)
+    kayit = cache.get(anahtar)
+
+    def hesapla_ve_sakla(surum):
+        veri = aylik_su_kullanimi_hesapla(yil, sulama_id, sulama_idleri)
+        cache.set(anahtar, (surum, time.time(), veri), settings.DASHBOARD_ONBELLEK_SURESI)
+        return veri
+
+    if kayit is not None:
+        kayit_surumu, olusturma, veri = kayit
+        if kayit_surumu == surum:
+            _sayac_artir('hit')
+            return veri, 'HIT'
+        if time.time() - olusturma <= settings.DASHBOARD_BAYAT_SURESI:
+            # Aynı anahtarı aynı anda tek bir thread yeniler
+            if cache.add(f'{anahtar}:yenileniyor', 1, 30):
+                def yenile():
+                    try:
+                        hesapla_ve_sakla(_veri_surumu(sulama_id, sulama_idleri))
+                    finally:
+                        cache.delete(f'{anahtar}:yenileniyor')
+                _arka_planda_calistir(yenile)
+            _sayac_artir('stale')
+            return veri, 'STALE'
+
+    _sayac_artir('miss')
+    return hesapla_ve_sakla(surum), 'MISS'
@@ -0,0 +1,58 @@
+"""
+Günlük ölçümlerin akış (streaming) halinde dışarı aktarımı
+
+Satırlar values_list().iterator(chunk_size) ile parça parça okunur (PostgreSQL'de
+server-side cursor) ve CSV veya NDJSON olarak StreamingHttpResponse ile yazılır.
+Sorgu sonucu hiçbir zaman bellekte tamamen tutulmaz.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+AKIS_PARCA_BOYUTU = 2000
+
+BICIMLER = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+
+class _SatirTamponu:
+    """csv.writer'ın yazdığı satırı saklamadan geri döndüren sahte dosya"""
+
+    def write(self, deger):
+        return deger
+
+
+def _csv_satirlari(basliklar, satirlar):
+    yazici = csv.writer(_SatirTamponu())
+    # Excel'in UTF-8 olarak açması için BOM
+    yield '\ufeff' + yazici.writerow(basliklar)
+    for satir in satirlar:
+        yield yazici.writerow(satir)
+
+
+def _ndjson_satirlari(basliklar, satirlar):
+    for satir in satirlar:
+        yield json.dumps(dict(zip(basliklar, satir)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def akis_yaniti(queryset, alanlar, bicim, dosya_adi, chunk_size=AKIS_PARCA_BOYUTU):
+    """
+    Queryset'i CSV veya NDJSON olarak akış halinde döndür
+
+    Args:
+        queryset: Filtrelenmiş ve sıralanmış queryset
+        alanlar: {sütun adı: values_list alan yolu} sözlüğü
+        bicim: 'csv' veya 'ndjson'
+        dosya_adi: Uzantısız indirme dosyası adı
+    """
+    basliklar = list(alanlar)
+    satirlar = queryset.values_list(*alanlar.values()).iterator(chunk_size=chunk_size)
+    uretici = _csv_satirlari if bicim == 'csv' else _ndjson_satirlari
+
+    response = StreamingHttpResponse(uretici(basliklar, satirlar), content_type=BICIMLER[bicim])
+    response['Content-Disposition'] = f'attachment; filename="{dosya_adi}.{bicim}"'
+    return response
@@ -0,0 +1,231 @@
+"""
+Ürün bazlı su ihtiyacı hesaplama motoru
+
+Formüller (frontend sulama hesaplama ekranı ile aynı):
+    Net su ihtiyacı (hm³)     = Alan (ha) × Aylık UR ÷ 100000
+    Çiftlik su ihtiyacı (hm³) = Net su ihtiyacı × 100 ÷ Çiftlik randı (%)
+    Brüt su ihtiyacı (hm³)    = Çiftlik su ihtiyacı × 100 ÷ İletim randı (%)
+
+Kök dizindeki hesaplama_duzeltme.py bu formülü kullanmaz: UR'yi alan payıyla
+(alan ÷ toplam alan × 100) ağırlıklandırıp 1000'e böler, sonuç toplam alandan
+bağımsızdır ve ancak toplam alan 100 ha iken buradaki değere eşittir (200 ha, UR=100:
+burada 0.2 hm³, orada 0.1 hm³). O dosya hiçbir yerden çağrılmaz; saklanan özetler,
+Excel çıktısı ve frontend buradaki formülle uyumludur.
+
+Tüm kayıtların aylık ihtiyaçları tek bir matris çarpımıyla hesaplanır:
+(kayıt × satır) alan dağıtım matrisi @ (satır × 12) katsayı matrisi.
+"""
+import numpy as np
+from django.db.models import Count, Sum
+
+
+AYLAR = (
+    'ocak', 'subat', 'mart', 'nisan', 'mayis', 'haziran',
+    'temmuz', 'agustos', 'eylul', 'ekim', 'kasim', 'aralik'
+)
+NET_SU_BOLENI = 100000
+
+
+def _sayi(deger, varsayilan=0.0):
+    """Boş veya hatalı değerleri varsayılana çevirerek float döndür"""
+    try:
+        return float(deger)
+    except (TypeError, ValueError):
+        return varsayilan
+
+
+def _randi_uygula(matris, randiler):
+    """Her kayıt satırını kendi randısına böl (randı 0 ise ihtiyaç 0 kabul edilir)"""
+    carpan = np.divide(100.0, randiler, out=np.zeros_like(randiler), where=randiler > 0)
+    return matris * carpan[:, np.newaxis]
+
+
+class SuIhtiyaciMotoru:
+    """
+    Yıllık tüketim kayıtlarının aylık net, çiftlik ve brüt su ihtiyacı matrisleri
+
+    net, ciftlik ve brut özellikleri (kayıt sayısı × 12) boyutunda, hm³ cinsindendir.
+    Satırların sırası kayit_idleri listesindeki sıra ile aynıdır.
+    """
+
+    def __init__(self, kayit_idleri, ciftlik_randileri, iletim_randileri,
+                 satir_kayit_idleri, alanlar, ekim_oranlari, katsayilar):
+        self.kayit_idleri = list(kayit_idleri)
+        self._indeks = {kayit_id: i for i, kayit_id in enumerate(self.kayit_idleri)}
+
+        self.ciftlik_randileri = np.asarray(ciftlik_randileri, dtype=float)
+        self.iletim_randileri = np.asarray(iletim_randileri, dtype=float)
+        self.alanlar = np.nan_to_num(np.asarray(alanlar, dtype=float))
+        self.ekim_oranlari = np.nan_to_num(np.asarray(ekim_oranlari, dtype=float))
+        # Boş (NULL) katsayılar 0 kabul edilir
+        self.katsayilar = np.nan_to_num(np.asarray(katsayilar, dtype=float).reshape(-1, len(AYLAR)))
+
+        # Kayıt × satır dağıtım matrisi: her satırın alanı ait olduğu kaydın satırına yazılır
+        satir_sayisi = len(self.alanlar)
+        satir_indeksleri = [self._indeks[kayit_id] for kayit_id in satir_kayit_idleri]
+        self.dagitim = np.zeros((len(self.kayit_idleri), satir_sayisi))
+        self.dagitim[satir_indeksleri, np.arange(satir_sayisi)] = self.alanlar
+
+        self.net = self.dagitim @ self.katsayilar / NET_SU_BOLENI
+        self.ciftlik = _randi_uygula(self.net, self.ciftlik_randileri)
+        self.brut = _randi_uygula(self.ciftlik, self.iletim_randileri)
+
+    @classmethod
+    def from_queryset(cls, yillik_tuketim_qs):
+        """
+        YillikGenelSuTuketimi queryset'i için motoru oluştur
+
+        Ana kayıtlar ve ürün detayları (katsayılarla birlikte) iki sorguda okunur.
+        """
+        from .models import YillikUrunDetay
+
+        kayitlar = list(
+            yillik_tuketim_qs.order_by().values_list('id', 'ciftlik_randi', 'iletim_randi')
+        )
+        kayit_idleri = [kayit[0] for kayit in kayitlar]
+
+        satirlar = []
+        if kayit_idleri:
+            satirlar = list(
+                YillikUrunDetay.objects.filter(yillik_tuketim_id__in=kayit_idleri).order_by().values_list(
+                    'yillik_tuketim_id', 'alan', 'ekim_orani', *(f'urun__{ay}' for ay in AYLAR)
+                )
+            )
+        satir_matrisi = np.array([satir[1:] for satir in satirlar], dtype=float).reshape(-1, 2 + len(AYLAR))
+
+        return cls(
+            kayit_idleri,
+            [kayit[1] for kayit in kayitlar],
+            [kayit[2] for kayit in kayitlar],
+            [satir[0] for satir in satirlar],
+            satir_matrisi[:, 0],
+            satir_matrisi[:, 1],
+            satir_matrisi[:, 2:],
+        )
+
+    @classmethod
+    def from_instances(cls, yillik_tuketimler):
+        """
+        Model örneklerinden motoru oluştur
+
+        urun_detaylari__urun prefetch edilmişse ek sorgu yapılmaz.
+        """
+        yillik_tuketimler = list(yillik_tuketimler)
+        satir_kayit_idleri, alanlar, ekim_oranlari, katsayilar = [], [], [], []
+        for yillik_tuketim in yillik_tuketimler:
+            for detay in yillik_tuketim.urun_detaylari.all():
+                satir_kayit_idleri.append(yillik_tuketim.id)
+                alanlar.append(detay.alan)
+                ekim_oranlari.append(detay.ekim_orani)
+                katsayilar.append([getattr(detay.urun, ay) for ay in AYLAR])
+
+        return cls(
+            [yillik_tuketim.id for yillik_tuketim in yillik_tuketimler],
+            [yillik_tuketim.ciftlik_randi for yillik_tuketim in yillik_tuketimler],
+            [yillik_tuketim.iletim_randi for yillik_tuketim in yillik_tuketimler],
+            satir_kayit_idleri, alanlar, ekim_oranlari, katsayilar,
+        )
+
+    @classmethod
+    def from_tablo(cls, tablo, ciftlik_randi, iletim_randi):
+        """
+        Frontend tablo satırlarından (ekim_alani, ekim_orani, ur_values) tek kayıtlık motor oluştur
+        """
+        satirlar = [satir for satir in tablo if _sayi(satir.get('ekim_alani')) > 0]
+        katsayilar = []
+        for satir in satirlar:
+            ur_degerleri = list(satir.get('ur_values') or [])[:len(AYLAR)]
+            ur_degerleri += [0] * (len(AYLAR) - len(ur_degerleri))
+            katsayilar.append([_sayi(deger) for deger in ur_degerleri])
+
+        return cls(
+            [None],
+            [_sayi(ciftlik_randi, 80)],
+            [_sayi(iletim_randi, 85)],
+            [None] * len(satirlar),
+            [_sayi(satir.get('ekim_alani')) for satir in satirlar],
+            [_sayi(satir.get('ekim_orani')) for satir in satirlar],
+            katsayilar,
+        )
+
+    @property
+    def ur_carpanlari(self):
+        """Satır bazında UR × Ekim oranı değerleri (satır sayısı × 12)"""
+        return self.katsayilar * self.ekim_oranlari[:, np.newaxis] / 100
+
+    def aylik_toplam(self, matris='net'):
+        """Tüm kayıtların aylık toplamı (12 elemanlı dizi, hm³)"""
+        return getattr(self, matris).sum(axis=0)
+
+    def sonuc(self, kayit_id=None):
+        """
+        Tek bir kaydın sonuçlarını frontend'deki results yapısında döndür
+
+        kayit_id verilmezse ilk kayıt kullanılır.
+        """
+        if not self.kayit_idleri:
+            bos = [0.0] * len(AYLAR)
+            net = ciftlik = brut = np.array(bos)
+        else:
+            indeks = self._indeks[kayit_id] if kayit_id is not None else 0
+            net, ciftlik, brut = self.net[indeks], self.ciftlik[indeks], self.brut[indeks]
+
+        return {
+            'net_su_aylik': net.tolist(),
+            'ciftlik_su_aylik': ciftlik.tolist(),
+            'brut_su_aylik': brut.tolist(),
+            'net_su_toplam': float(net.sum()),
+            'ciftlik_su_toplam': float(ciftlik.sum()),
+            'brut_su_toplam': float(brut.sum()),
+        }
+
+
+def yillik_ozetleri_guncelle(yillik_tuketim_qs, batch_size=500):
+    """
+    YillikGenelSuTuketimi kayıtlarının saklanan özet değerlerini yeniden hesapla
+
+    Toplam alan/tüketim, ürün sayısı ve aylık net/çiftlik/brüt su ihtiyaçları
+    yazılır. bulk_update kullanıldığı için post_save signal'i tetiklenmez.
+    Güncellenen kayıt sayısını döndürür.
+    """
+    from .models import SulamaVeriSurumu, YillikGenelSuTuketimi, YillikUrunDetay
+
+    motor = SuIhtiyaciMotoru.from_queryset(yillik_tuketim_qs)
+    if not motor.kayit_idleri:
+        return 0
+
+    toplamlar = {
+        satir['yillik_tuketim_id']: satir
+        for satir in YillikUrunDetay.objects.filter(
+            yillik_tuketim_id__in=motor.kayit_idleri
+        ).order_by().values('yillik_tuketim_id').annotate(
+            toplam_alan=Sum('alan'),
+            toplam_su_tuketimi=Sum('su_tuketimi'),
+            urun_sayisi=Count('id'),
+        )
+    }
+
+    kayitlar = []
+    for kayit_id in motor.kayit_idleri:
+        toplam = toplamlar.get(kayit_id, {})
+        kayit = YillikGenelSuTuketimi(
+            id=kayit_id,
+            toplam_alan=toplam.get('toplam_alan') or 0,
+            toplam_su_tuketimi=toplam.get('toplam_su_tuketimi') or 0,
+            urun_sayisi=toplam.get('urun_sayisi') or 0,
+        )
+        sonuc = motor.sonuc(kayit_id)
+        for alan in ('net_su_aylik', 'ciftlik_su_aylik', 'brut_su_aylik',
+                     'net_su_toplam', 'ciftlik_su_toplam', 'brut_su_toplam'):
+            setattr(kayit, alan, sonuc[alan])
+        kayitlar.append(kayit)
+
+    YillikGenelSuTuketimi.objects.bulk_update(
+        kayitlar, YillikGenelSuTuketimi.OZET_ALANLARI, batch_size=batch_size
+    )
+    # bulk_update signal tetiklemez - dashboard önbelleği için veri sürümünü artır
+    SulamaVeriSurumu.artir(
+        YillikGenelSuTuketimi.objects.filter(id__in=motor.kayit_idleri)
+        .order_by().values_list('sulama_id', flat=True).distinct()
+    )
+    return len(kayitlar)
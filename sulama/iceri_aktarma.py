@@ -0,0 +1,372 @@
+"""
+Günlük ölçümlerin toplu içeri aktarımı
+
+JSON listesi, CSV veya XLSX dosyasından gelen satırlar doğrulanır, su miktarları
+önbellekteki abak eğrilerinden hesaplanır ve benzersiz anahtar üzerinden
+bulk_create(update_conflicts=True) ile eklenir/güncellenir. Hatalı satırlar
+tüm işlemi iptal etmez, satır numarasıyla birlikte raporlanır.
+
+yillik_tuketim_detaylarini_kaydet() yıllık planlama tablosunu mevcut kayıtla
+farklarını uygulayarak kaydeder.
+"""
+import csv
+import io
+from datetime import date, datetime
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from openpyxl import load_workbook
+
+from .abak import kanal_abaklari, depolama_abaklari
+from .aylik_ozet import aylik_ozetleri_yenile
+from .models import (
+    Kanal, DepolamaTesisi, GunlukSebekeyeAlinanSuMiktari, GunlukDepolamaTesisiSuMiktari,
+    YillikGenelSuTuketimi, YillikUrunDetay, SulamaVeriSurumu, ozet_guncellemelerini_birlestir
+)
+
+
+def dosya_satirlarini_oku(dosya):
+    """
+    Yüklenen CSV veya XLSX dosyasını satır sözlükleri listesine çevir
+
+    İlk satır başlık satırı olarak kullanılır (kanal, tarih, yukseklik, ...).
+    """
+    dosya_adi = (getattr(dosya, 'name', '') or '').lower()
+    if dosya_adi.endswith('.xlsx'):
+        wb = load_workbook(dosya, read_only=True, data_only=True)
+        try:
+            satirlar = wb.active.iter_rows(values_only=True)
+            basliklar = [str(baslik).strip() if baslik is not None else '' for baslik in next(satirlar, [])]
+            return [
+                dict(zip(basliklar, satir)) for satir in satirlar
+                if any(hucre not in (None, '') for hucre in satir)
+            ]
+        finally:
+            wb.close()
+
+    if dosya_adi.endswith('.csv'):
+        icerik = dosya.read().decode('utf-8-sig')
+        ornek = icerik[:2048]
+        try:
+            ayrac = csv.Sniffer().sniff(ornek, delimiters=',;\t').delimiter
+        except csv.Error:
+            ayrac = ','
+        return [
+            {(anahtar or '').strip(): deger for anahtar, deger in satir.items()}
+            for satir in csv.DictReader(io.StringIO(icerik), delimiter=ayrac)
+        ]
+
+    raise ValueError('Sadece .csv ve .xlsx dosyaları desteklenir')
+
+
+def _bos_mu(deger):
+    return deger is None or (isinstance(deger, str) and not deger.strip())
+
+
+def _tam_sayi(deger):
+    if _bos_mu(deger):
+        raise ValueError('boş')
+    return int(float(deger))
+
+
+def _ondalik(deger):
+    if _bos_mu(deger):
+        raise ValueError('boş')
+    if isinstance(deger, str):
+        deger = deger.strip().replace(',', '.')
+    return float(deger)
+
+
+def _tarih(deger):
+    if isinstance(deger, datetime):
+        return deger.date()
+    if isinstance(deger, date):
+        return deger
+    sonuc = parse_date(str(deger).strip()) if not _bos_mu(deger) else None
+    if sonuc is None:
+        raise ValueError('geçersiz tarih')
+    return sonuc
+
+
+def _tarih_saat(deger):
+    if not isinstance(deger, datetime):
+        deger = parse_datetime(str(deger).strip()) if not _bos_mu(deger) else None
+    if deger is None:
+        raise ValueError('geçersiz tarih/saat')
+    if timezone.is_naive(deger):
+        deger = timezone.make_aware(deger)
+    return deger
+
+
+def _hata_ekle(hatalar, satir_no, alan, mesaj):
+    hatalar.setdefault(satir_no, {})[alan] = mesaj
+
+
+def _hata_listesi(hatalar):
+    return [{'satir': satir_no, 'hatalar': hatalar[satir_no]} for satir_no in sorted(hatalar)]
+
+
+def _satirlari_ayristir(satirlar, donusturuculer, hatalar):
+    """
+    Ham satırları alan dönüştürücüleriyle tipli sözlüklere çevir
+
+    Opsiyonel su_miktari alanı verilmişse o da okunur. Hatalı satırlar hatalar
+    sözlüğüne yazılır ve sonuçta yer almaz. [(satir_no, kayit), ...] döndürür.
+    """
+    ayristirilmis = []
+    for satir_no, satir in enumerate(satirlar, start=1):
+        kayit = {}
+        for alan, donusturucu in donusturuculer:
+            try:
+                kayit[alan] = donusturucu(satir.get(alan))
+            except (TypeError, ValueError):
+                _hata_ekle(hatalar, satir_no, alan, 'Geçersiz veya eksik değer')
+        if not _bos_mu(satir.get('su_miktari')):
+            try:
+                kayit['su_miktari'] = _ondalik(satir['su_miktari'])
+            except (TypeError, ValueError):
+                _hata_ekle(hatalar, satir_no, 'su_miktari', 'Geçersiz değer')
+        if satir_no not in hatalar:
+            ayristirilmis.append((satir_no, kayit))
+    return ayristirilmis
+
+
+def _toplu_upsert(model, nesneler, unique_fields, update_fields, batch_size, ilerleme=None, sulama_id_bul=None,
+                  parca_sonrasi=None):
+    """
+    Nesneleri batch_size'lık parçalar halinde, her parça kendi transaction'ında upsert et
+
+    ilerleme verilmişse her parçadan sonra (islenen, toplam) ile çağrılır. bulk_create
+    signal tetiklemediği için parçadaki sulamaların veri sürümü aynı transaction'da artırılır;
+    türetilmiş tablolar parca_sonrasi(parca) ile yine aynı transaction'da güncellenir.
+    """
+    for i in range(0, len(nesneler), batch_size):
+        parca = nesneler[i:i + batch_size]
+        with transaction.atomic():
+            model.objects.bulk_create(
+                parca,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=update_fields,
+            )
+            if sulama_id_bul is not None:
+                SulamaVeriSurumu.artir({sulama_id_bul(nesne) for nesne in parca})
+            if parca_sonrasi is not None:
+                parca_sonrasi(parca)
+        if ilerleme is not None:
+            ilerleme(min(i + batch_size, len(nesneler)), len(nesneler))
+
+
+def sebeke_su_miktarlarini_yukle(satirlar, yetkili_mi, interpolasyon=True, batch_size=1000, ilerleme=None):
+    """
+    GunlukSebekeyeAlinanSuMiktari satırlarını (kanal, tarih, baslangic_saati) anahtarıyla upsert et
+
+    Args:
+        satirlar: kanal, tarih, baslangic_saati, bitis_saati, yukseklik ve opsiyonel su_miktari içeren sözlükler;
+            su_miktari verilmezse abaktan hesaplanır, verilirse olduğu gibi yazılır. Yükseklik her durumda
+            kanal abağının aralığında olmalıdır (tekil kayıttaki serializer doğrulamasıyla aynı)
+        yetkili_mi: sulama_id alıp veri girişi yetkisi olup olmadığını döndüren fonksiyon
+        interpolasyon: Abak satırları arasındaki yükseklikler için interpolasyon yapılsın mı
+        batch_size: Tek transaction'da (INSERT ... ON CONFLICT) yazılacak satır sayısı
+        ilerleme: Her parçadan sonra (islenen, toplam) ile çağrılacak fonksiyon
+
+    Returns:
+        {'kaydedilen': int, 'hatali': int, 'hatalar': [{'satir': int, 'hatalar': {alan: mesaj}}]}
+    """
+    hatalar = {}
+    ayristirilmis = []
+    for satir_no, kayit in _satirlari_ayristir(satirlar, (
+        ('kanal', _tam_sayi), ('tarih', _tarih), ('baslangic_saati', _tarih_saat),
+        ('bitis_saati', _tarih_saat), ('yukseklik', _ondalik),
+    ), hatalar):
+        if kayit['baslangic_saati'] >= kayit['bitis_saati']:
+            _hata_ekle(hatalar, satir_no, 'bitis_saati', 'Başlangıç saati bitiş saatinden önce olmalıdır.')
+        else:
+            ayristirilmis.append((satir_no, kayit))
+
+    # Kanalların sulama sistemleri ve abak eğrileri toplu olarak yüklenir
+    kanal_sulamalari = dict(
+        Kanal.objects.filter(id__in={kayit['kanal'] for _, kayit in ayristirilmis})
+        .values_list('id', 'depolama_tesisi__sulama_id')
+    )
+    yetkiler = {sulama_id: yetkili_mi(sulama_id) for sulama_id in set(kanal_sulamalari.values())}
+    egriler = kanal_abaklari.egriler(
+        [kanal_id for kanal_id, sulama_id in kanal_sulamalari.items() if yetkiler[sulama_id]]
+    )
+
+    nesneler = {}
+    for satir_no, kayit in ayristirilmis:
+        kanal_id = kayit['kanal']
+        if kanal_id not in kanal_sulamalari:
+            _hata_ekle(hatalar, satir_no, 'kanal', 'Kanal bulunamadı')
+            continue
+        if not yetkiler[kanal_sulamalari[kanal_id]]:
+            _hata_ekle(hatalar, satir_no, 'kanal', 'Bu kanala veri girişi yetkiniz yok')
+            continue
+        hacim = egriler[kanal_id].hacim_bul(kayit['yukseklik'], interpolasyon=interpolasyon)
+        if hacim is None:
+            _hata_ekle(
+                hatalar, satir_no, 'yukseklik',
+                f"Bu kanal için {kayit['yukseklik']} m yükseklik değeri abakta bulunamadı."
+            )
+            continue
+        su_miktari = kayit.get('su_miktari', hacim)
+        if su_miktari < 0:
+            _hata_ekle(hatalar, satir_no, 'su_miktari', 'Su miktarı negatif olamaz')
+            continue
+
+        # Aynı anahtar birden çok kez gelirse son satır geçerlidir
+        anahtar = (kanal_id, kayit['tarih'], kayit['baslangic_saati'])
+        nesneler[anahtar] = GunlukSebekeyeAlinanSuMiktari(
+            kanal_id=kanal_id,
+            tarih=kayit['tarih'],
+            baslangic_saati=kayit['baslangic_saati'],
+            bitis_saati=kayit['bitis_saati'],
+            yukseklik=kayit['yukseklik'],
+            su_miktari=su_miktari,
+        )
+
+    _toplu_upsert(
+        GunlukSebekeyeAlinanSuMiktari, list(nesneler.values()),
+        ['kanal', 'tarih', 'baslangic_saati'], ['bitis_saati', 'yukseklik', 'su_miktari'],
+        batch_size, ilerleme, sulama_id_bul=lambda nesne: kanal_sulamalari[nesne.kanal_id],
+        parca_sonrasi=lambda parca: aylik_ozetleri_yenile(
+            (nesne.kanal_id, nesne.tarih.year, nesne.tarih.month) for nesne in parca
+        ),
+    )
+
+    return {
+        'kaydedilen': len(nesneler),
+        'hatali': len(hatalar),
+        'hatalar': _hata_listesi(hatalar),
+    }
+
+
+def depolama_su_miktarlarini_yukle(satirlar, yetkili_mi, interpolasyon=True, batch_size=1000, ilerleme=None):
+    """
+    GunlukDepolamaTesisiSuMiktari satırlarını (depolama_tesisi, tarih) anahtarıyla upsert et
+
+    Satırlar depolama_tesisi, tarih, kot ve opsiyonel su_miktari içerir; su_miktari
+    verilmezse tesisin abak eğrisinden hesaplanır, verilirse tekil kayıttaki gibi abak dışı
+    kot da kabul edilir. Diğer parametreler ve dönüş
+    değeri sebeke_su_miktarlarini_yukle ile aynıdır.
+    """
+    hatalar = {}
+    ayristirilmis = _satirlari_ayristir(satirlar, (
+        ('depolama_tesisi', _tam_sayi), ('tarih', _tarih), ('kot', _ondalik),
+    ), hatalar)
+
+    tesis_sulamalari = dict(
+        DepolamaTesisi.objects.filter(id__in={kayit['depolama_tesisi'] for _, kayit in ayristirilmis})
+        .values_list('id', 'sulama_id')
+    )
+    yetkiler = {sulama_id: yetkili_mi(sulama_id) for sulama_id in set(tesis_sulamalari.values())}
+    egriler = depolama_abaklari.egriler(
+        [tesis_id for tesis_id, sulama_id in tesis_sulamalari.items() if yetkiler[sulama_id]]
+    )
+
+    nesneler = {}
+    for satir_no, kayit in ayristirilmis:
+        tesis_id = kayit['depolama_tesisi']
+        if tesis_id not in tesis_sulamalari:
+            _hata_ekle(hatalar, satir_no, 'depolama_tesisi', 'Depolama tesisi bulunamadı')
+            continue
+        if not yetkiler[tesis_sulamalari[tesis_id]]:
+            _hata_ekle(hatalar, satir_no, 'depolama_tesisi', 'Bu depolama tesisine veri girişi yetkiniz yok')
+            continue
+        hacim = egriler[tesis_id].hacim_bul(kayit['kot'], interpolasyon=interpolasyon)
+        if hacim is None and 'su_miktari' not in kayit:
+            _hata_ekle(
+                hatalar, satir_no, 'kot',
+                f"Bu depolama tesisi için {kayit['kot']} m kot değeri abakta bulunamadı."
+            )
+            continue
+        su_miktari = kayit.get('su_miktari', hacim)
+        if su_miktari < 0:
+            _hata_ekle(hatalar, satir_no, 'su_miktari', 'Su miktarı negatif olamaz')
+            continue
+
+        nesneler[(tesis_id, kayit['tarih'])] = GunlukDepolamaTesisiSuMiktari(
+            depolama_tesisi_id=tesis_id,
+            tarih=kayit['tarih'],
+            kot=kayit['kot'],
+            su_miktari=su_miktari,
+        )
+
+    _toplu_upsert(
+        GunlukDepolamaTesisiSuMiktari, list(nesneler.values()),
+        ['depolama_tesisi', 'tarih'], ['kot', 'su_miktari'],
+        batch_size, ilerleme, sulama_id_bul=lambda nesne: tesis_sulamalari[nesne.depolama_tesisi_id],
+    )
+
+    return {
+        'kaydedilen': len(nesneler),
+        'hatali': len(hatalar),
+        'hatalar': _hata_listesi(hatalar),
+    }
+
+
+def yillik_tuketim_detaylarini_kaydet(sulama, yil, ciftlik_randi, iletim_randi, gelen_satirlar):
+    """
+    (sulama, yil) planını gelen ürün satırlarıyla eşitle
+
+    Args:
+        gelen_satirlar: {urun_id: {'alan', 'ekim_orani', 'su_tuketimi'}} sözlüğü
+
+    Mevcut kayıtla farklar uygulanır (yeni satırlar eklenir, değişenler güncellenir,
+    tabloda olmayanlar silinir); özetler blok sonunda tek seferde hesaplanır.
+    """
+    with transaction.atomic(), ozet_guncellemelerini_birlestir():
+        # (sulama, yil) tekil olduğundan eşzamanlı ilk kayıtlarda biri oluşturur, diğeri
+        # IntegrityError sonrası onu okur; detaylar ana kayıt kilitlenerek sırayla eşitlenir
+        yillik_tuketim, olusturuldu = YillikGenelSuTuketimi.objects.get_or_create(
+            sulama=sulama,
+            yil=yil,
+            defaults={'ciftlik_randi': ciftlik_randi, 'iletim_randi': iletim_randi},
+        )
+        if not olusturuldu:
+            yillik_tuketim = YillikGenelSuTuketimi.objects.select_for_update().get(pk=yillik_tuketim.pk)
+            if (yillik_tuketim.ciftlik_randi, yillik_tuketim.iletim_randi) != (ciftlik_randi, iletim_randi):
+                yillik_tuketim.ciftlik_randi = ciftlik_randi
+                yillik_tuketim.iletim_randi = iletim_randi
+                yillik_tuketim.save(update_fields=['ciftlik_randi', 'iletim_randi'])
+
+        mevcut_detaylar = {
+            detay.urun_id: detay
+            for detay in YillikUrunDetay.objects.filter(yillik_tuketim=yillik_tuketim)
+        }
+        eklenecekler, guncellenecekler = [], []
+        for urun_id, degerler in gelen_satirlar.items():
+            detay = mevcut_detaylar.pop(urun_id, None)
+            if detay is None:
+                eklenecekler.append(
+                    YillikUrunDetay(yillik_tuketim=yillik_tuketim, urun_id=urun_id, **degerler)
+                )
+            elif any(getattr(detay, alan) != deger for alan, deger in degerler.items()):
+                for alan, deger in degerler.items():
+                    setattr(detay, alan, deger)
+                guncellenecekler.append(detay)
+
+        # Tabloda artık olmayan ürünler
+        if mevcut_detaylar:
+            YillikUrunDetay.objects.filter(
+                id__in=[detay.id for detay in mevcut_detaylar.values()]
+            ).delete()
+        if guncellenecekler:
+            YillikUrunDetay.objects.bulk_update(
+                guncellenecekler, ['alan', 'ekim_orani', 'su_tuketimi']
+            )
+        if eklenecekler:
+            YillikUrunDetay.objects.bulk_create(eklenecekler)
+
+    return {
+        'message': f'{len(gelen_satirlar)} adet ürün detayı başarıyla kaydedildi',
+        'ana_kayit_id': yillik_tuketim.id,
+        'urun_detay_sayisi': len(gelen_satirlar),
+        'eklenen': len(eklenecekler),
+        'guncellenen': len(guncellenecekler),
+        'silinen': len(mevcut_detaylar),
+        'yil': yil,
+        'sulama': sulama.isim
+    }
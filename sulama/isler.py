@@ -0,0 +1,232 @@
+"""
+Veritabanı tabanlı arka plan işleri
+
+Excel üretimi, toplu yükleme ve özetlerin yeniden hesaplanması gibi uzun süren işlemler
+istek içinde çalıştırılmak yerine ArkaPlanIsi tablosuna kuyruğa yazılır ve
+`manage.py isleri_calistir` tarafından sınırlı sayıda alt süreçte yürütülür. Harici
+bir broker gerekmez: iş alma koşullu bir UPDATE (durum='BEKLIYOR' ise 'CALISIYOR' yap)
+ile yapıldığından aynı iş iki çalışana verilmez; PostgreSQL ve SQLite'ta aynı şekilde
+çalışır. İş türleri is_turu() ile kaydedilir.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from authentication.yetki_kapsami import kullanici_yetkileri, yetki_seviyesi_yeterli
+from .excel import yillik_planlama_excel
+from .hesaplama import yillik_ozetleri_guncelle
+from .iceri_aktarma import (
+    dosya_satirlarini_oku, sebeke_su_miktarlarini_yukle, depolama_su_miktarlarini_yukle,
+    yillik_tuketim_detaylarini_kaydet
+)
+from .models import ArkaPlanIsi, Sulama, YillikGenelSuTuketimi
+
+logger = logging.getLogger(__name__)
+
+IS_TURLERI = {}
+
+
+def is_turu(ad):
+    """İş türü kaydı: fonksiyon (is_, **parametreler) alır, JSON'a çevrilebilir sonuç döndürür"""
+    def kaydet(fonksiyon):
+        IS_TURLERI[ad] = fonksiyon
+        return fonksiyon
+    return kaydet
+
+
+def is_olustur(tur, kullanici=None, girdi_dosyasi=None, **parametreler):
+    """
+    İşi kuyruğa ekle
+
+    ARKA_PLAN_ISLERI_SENKRON açıksa (çalışan süreç olmayan geliştirme ortamı)
+    iş hemen bu süreçte yürütülür.
+    """
+    if tur not in IS_TURLERI:
+        raise ValueError(f'Bilinmeyen iş türü: {tur}')
+
+    is_ = ArkaPlanIsi(
+        tur=tur,
+        kullanici=kullanici if getattr(kullanici, 'is_authenticated', False) else None,
+        parametreler=parametreler,
+    )
+    if girdi_dosyasi is not None:
+        is_.girdi_dosyasi.save(girdi_dosyasi.name, girdi_dosyasi, save=False)
+    is_.save()
+
+    if getattr(settings, 'ARKA_PLAN_ISLERI_SENKRON', False):
+        if ArkaPlanIsi.objects.filter(pk=is_.pk, durum='BEKLIYOR').update(
+            durum='CALISIYOR', calisan='senkron', baslama_tarihi=timezone.now()
+        ):
+            isi_yurut(is_.pk)
+        is_.refresh_from_db()
+    return is_
+
+
+def siradaki_isi_al(calisan=''):
+    """
+    Kuyruktaki en eski işi bu çalışan adına al
+
+    Başka bir çalışan aynı işi önce aldıysa UPDATE 0 satır döndürür ve sıradaki
+    adaya geçilir. Alınacak iş yoksa None döner.
+    """
+    adaylar = list(
+        ArkaPlanIsi.objects.filter(durum='BEKLIYOR')
+        .order_by('olusturma_tarihi', 'id').values_list('id', flat=True)[:10]
+    )
+    for is_id in adaylar:
+        simdi = timezone.now()
+        alindi = ArkaPlanIsi.objects.filter(pk=is_id, durum='BEKLIYOR').update(
+            durum='CALISIYOR', calisan=calisan, baslama_tarihi=simdi, guncelleme_tarihi=simdi
+        )
+        if alindi:
+            return ArkaPlanIsi.objects.get(pk=is_id)
+    return None
+
+
+def isi_hatali_isaretle(is_id, hata):
+    simdi = timezone.now()
+    ArkaPlanIsi.objects.filter(pk=is_id, durum='CALISIYOR').update(
+        durum='HATALI', hata=hata, bitis_tarihi=simdi, guncelleme_tarihi=simdi
+    )
+
+
+def isi_kuyruga_geri_al(is_id):
+    """Alınmış ama hiç başlatılamamış işi (ör. havuz bozulduğunda) yeniden BEKLIYOR yap"""
+    return ArkaPlanIsi.objects.filter(pk=is_id, durum='CALISIYOR').update(
+        durum='BEKLIYOR', calisan='', baslama_tarihi=None, guncelleme_tarihi=timezone.now()
+    )
+
+
+def isi_yurut(is_id):
+    """Alınmış (CALISIYOR) işi çalıştır, sonucu veya hatayı kaydet; son durumu döndür"""
+    is_ = ArkaPlanIsi.objects.select_related('kullanici').get(pk=is_id)
+    try:
+        isleyici = IS_TURLERI[is_.tur]
+        sonuc = isleyici(is_, **is_.parametreler)
+    except Exception as e:
+        logger.exception('Arka plan işi hatalı bitti', extra={'is_id': is_id, 'tur': is_.tur})
+        isi_hatali_isaretle(is_id, str(e) or e.__class__.__name__)
+        return 'HATALI'
+
+    # İş bu arada yarım kalmış sayılıp hatalı işaretlendiyse sonuç üzerine yazılmaz
+    simdi = timezone.now()
+    tamamlandi = ArkaPlanIsi.objects.filter(pk=is_id, durum='CALISIYOR').update(
+        durum='TAMAMLANDI', sonuc=sonuc, sonuc_dosyasi=is_.sonuc_dosyasi.name or '', ilerleme=100,
+        bitis_tarihi=simdi, guncelleme_tarihi=simdi,
+    )
+    if not tamamlandi:
+        logger.warning('Arka plan işi bitti ancak artık çalışıyor durumunda değil', extra={'is_id': is_id})
+        if is_.sonuc_dosyasi:
+            is_.sonuc_dosyasi.delete(save=False)
+        return ArkaPlanIsi.objects.filter(pk=is_id).values_list('durum', flat=True).first()
+    return 'TAMAMLANDI'
+
+
+def alt_surecte_yurut(is_id):
+    """Çalışan havuzundaki alt süreç giriş noktası"""
+    try:
+        return isi_yurut(is_id)
+    finally:
+        connections.close_all()
+
+
+def calisan_nabzi(calisan):
+    """
+    Bu çalışanın süren işlerinin güncelleme tarihini tazele
+
+    isleri_calistir bunu düzenli çağırır; ilerleme bildirmeyen uzun işler de canlı görünür.
+    """
+    return ArkaPlanIsi.objects.filter(durum='CALISIYOR', calisan=calisan).update(guncelleme_tarihi=timezone.now())
+
+
+def yarim_kalan_isleri_isaretle(calisan):
+    """
+    Çalışan süreci ölmüş işleri hatalı say
+
+    Çalışan süreç öldüğünde (yeniden başlatma, OOM) CALISIYOR kalan işler içindir:
+    bu çalışan adıyla kalanlar (aynı makine adı ve PID ile yeniden başlayan konteyner)
+    hemen, diğer çalışanlarınkiler ARKA_PLAN_IS_ZAMAN_ASIMI saniyedir nabız gelmemişse
+    işaretlenir. Canlı çalışanlar calisan_nabzi() ile işlerini tazelediğinden
+    başka bir çalışanda süren iş hatalı sayılmaz.
+    """
+    simdi = timezone.now()
+    sinir = simdi - timedelta(seconds=settings.ARKA_PLAN_IS_ZAMAN_ASIMI)
+    return ArkaPlanIsi.objects.filter(
+        Q(calisan=calisan) | Q(guncelleme_tarihi__lt=sinir), durum='CALISIYOR'
+    ).update(
+        durum='HATALI', hata='Zaman aşımı: çalışan süreç yanıt vermedi', bitis_tarihi=simdi, guncelleme_tarihi=simdi
+    )
+
+
+def _yetki_kontrolu(kullanici, gereken_seviye):
+    """İşi başlatan kullanıcının yetkileriyle sulama_id alan yetki kontrol fonksiyonu"""
+    if kullanici is None:
+        return lambda sulama_id: False
+    if kullanici.is_superuser:
+        return lambda sulama_id: True
+    yetkiler = kullanici_yetkileri(kullanici)
+    return lambda sulama_id: (
+        sulama_id in yetkiler and yetki_seviyesi_yeterli(yetkiler[sulama_id], gereken_seviye)
+    )
+
+
+def _girdi_satirlari(is_, kayitlar):
+    if kayitlar is not None:
+        return kayitlar
+    with is_.girdi_dosyasi.open('rb') as dosya:
+        return dosya_satirlarini_oku(dosya)
+
+
+# İş türleri
+
+@is_turu('planlama_excel')
+def planlama_excel_isi(is_, kayit_id, kurum=''):
+    kayit = YillikGenelSuTuketimi.objects.select_related('sulama').get(pk=kayit_id)
+    dosya_adi, icerik = yillik_planlama_excel(kayit, kurum)
+    is_.dosya_kaydet(dosya_adi, icerik)
+    return {'dosya_adi': dosya_adi}
+
+
+@is_turu('yillik_tuketim_kaydet')
+def yillik_tuketim_kaydet_isi(is_, sulama, yil, ciftlik_randi, iletim_randi, satirlar):
+    return yillik_tuketim_detaylarini_kaydet(
+        Sulama.objects.get(pk=sulama), yil, ciftlik_randi, iletim_randi,
+        {int(urun_id): degerler for urun_id, degerler in satirlar},
+    )
+
+
+@is_turu('sebeke_su_yukleme')
+def sebeke_su_yukleme_isi(is_, interpolasyon=True, kayitlar=None):
+    return sebeke_su_miktarlarini_yukle(
+        _girdi_satirlari(is_, kayitlar), _yetki_kontrolu(is_.kullanici, 'VERI_GIRISI'),
+        interpolasyon=interpolasyon, ilerleme=is_.ilerleme_bildir,
+    )
+
+
+@is_turu('depolama_su_yukleme')
+def depolama_su_yukleme_isi(is_, interpolasyon=True, kayitlar=None):
+    return depolama_su_miktarlarini_yukle(
+        _girdi_satirlari(is_, kayitlar), _yetki_kontrolu(is_.kullanici, 'VERI_GIRISI'),
+        interpolasyon=interpolasyon, ilerleme=is_.ilerleme_bildir,
+    )
+
+
+@is_turu('yillik_ozet_hesaplama')
+def yillik_ozet_hesaplama_isi(is_, yil=None, sulama=None, batch_size=200):
+    queryset = YillikGenelSuTuketimi.objects.order_by('id')
+    if yil:
+        queryset = queryset.filter(yil=yil)
+    if sulama:
+        queryset = queryset.filter(sulama_id=sulama)
+
+    kayit_idleri = list(queryset.values_list('id', flat=True))
+    guncellenen = 0
+    for i in range(0, len(kayit_idleri), batch_size):
+        parca = kayit_idleri[i:i + batch_size]
+        guncellenen += yillik_ozetleri_guncelle(YillikGenelSuTuketimi.objects.filter(id__in=parca))
+        is_.ilerleme_bildir(guncellenen, len(kayit_idleri))
+    return {'guncellenen': guncellenen}
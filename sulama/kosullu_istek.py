@@ -0,0 +1,52 @@
+"""
+Liste endpoint'leri için koşullu GET (ETag / Last-Modified)
+
+Sulama, tesis, kanal ve ürün listeleri sayfalanmadan döner ve her sayfa geçişinde
+yeniden istenir. ETag; kullanıcının yetki kapsamındaki sulamaların SulamaVeriSurumu
+satırlarından (tek küçük sorgu), istek adresinden ve yanıt biçiminden üretilir.
+Last-Modified kapsamdaki en son sürüm artışıdır. İstemcinin elindeki sürüm güncelse
+liste queryset'i hiç çalıştırılmadan 304 döner.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .models import SulamaVeriSurumu
+
+
+class KosulluListeMixin:
+    """
+    list() yanıtlarına güçlü ETag ve Last-Modified ekler, If-None-Match /
+    If-Modified-Since isteklerine 304 döner. SulamaBazliMixin ile birlikte kullanılır;
+    özel liste action'ları kosullu_yanit() ile sarılabilir.
+    """
+
+    def liste_surumu(self, request):
+        """(etag, son_degisiklik) - son_degisiklik kapsamda sürüm yoksa None"""
+        yetkiler = self.get_sulama_yetkileri()
+        ozet, son_degisiklik = SulamaVeriSurumu.kapsam_surumu(None if yetkiler is None else list(yetkiler))
+        kapsam = 'tum' if yetkiler is None else ','.join(str(sulama_id) for sulama_id in sorted(yetkiler))
+        anahtar = '|'.join([
+            request.get_full_path(), request.accepted_renderer.format, kapsam, ozet
+        ])
+        return f'"{hashlib.sha1(anahtar.encode()).hexdigest()}"', son_degisiklik
+
+    def kosullu_yanit(self, request, yanit_uret):
+        etag, son_degisiklik = self.liste_surumu(request)
+        yanit = get_conditional_response(
+            request, etag=etag,
+            last_modified=int(son_degisiklik.timestamp()) if son_degisiklik else None,
+        )
+        if yanit is None:
+            yanit = yanit_uret()
+        if yanit.status_code in (200, 304):
+            yanit['ETag'] = etag
+            if son_degisiklik:
+                yanit['Last-Modified'] = http_date(son_degisiklik.timestamp())
+            # Tarayıcı her seferinde doğrulasın, paylaşılan önbellekler saklamasın
+            patch_cache_control(yanit, private=True, no_cache=True)
+        return yanit
+
+    def list(self, request, *args, **kwargs):
+        return self.kosullu_yanit(request, lambda: super(KosulluListeMixin, self).list(request, *args, **kwargs))
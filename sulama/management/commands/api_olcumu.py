@@ -0,0 +1,341 @@
+import json
+import logging
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from sulama.management.commands.excel_aktarim_olcumu import _ornek_istek_verisi
+from sulama.management.commands.ornek_veri_olustur import YONETICI_ADI
+from sulama.models import (
+    GunlukDepolamaTesisiSuMiktari, GunlukSebekeyeAlinanSuMiktari, Kanal, Sulama, Urun, YillikGenelSuTuketimi
+)
+
+RAPOR_SURUMU = 1
+
+
+def _uc_noktalari(olcum, depolama_olcum, urun, plan):
+    """
+    (ad, yöntem, yol, gövde, yazma) listesi
+
+    Kapsam en son ölçümün kanalı, tesisi ve sulamasıdır; günlük ölçüm uç noktaları (tarih
+    filtresi verilmezse mevcut ayı gösterir) o ölçümün ayıyla çağrılır.
+    Yazma istekleri ölçümden sonra geri alınır.
+    """
+    kanal = olcum.kanal
+    tesis, sulama = kanal.depolama_tesisi, kanal.depolama_tesisi.sulama
+    yil, son = olcum.tarih.year, olcum.tarih
+    ay = f'baslangic_tarih={son.replace(day=1)}&bitis_tarih={son}'
+    yil_araligi = f'baslangic_tarih={yil}-01-01&bitis_tarih={yil}-12-31'
+    ay_gunleri = [son.replace(day=1) + timedelta(days=gun) for gun in range(son.day)]
+
+    uc_noktalari = [
+        ('sulamalar.list', 'get', '/sulama/sulamalar/', None),
+        ('sulamalar.retrieve', 'get', f'/sulama/sulamalar/{sulama.id}/', None),
+        ('sulamalar.ozet', 'get', '/sulama/sulamalar/ozet/', None),
+        ('sulamalar.istatistikler', 'get', f'/sulama/sulamalar/{sulama.id}/istatistikler/', None),
+        ('depolama_tesisleri.list', 'get', '/sulama/depolama-tesisleri/', None),
+        ('depolama_tesisleri.retrieve', 'get', f'/sulama/depolama-tesisleri/{tesis.id}/', None),
+        ('depolama_tesisleri.su_hacmi_hesapla', 'post', f'/sulama/depolama-tesisleri/{tesis.id}/su_hacmi_hesapla/',
+         {'kot': depolama_olcum.kot if depolama_olcum else 0}),
+        ('kanallar.list', 'get', '/sulama/kanallar/', None),
+        ('kanallar.retrieve', 'get', f'/sulama/kanallar/{kanal.id}/', None),
+        ('kanallar.ozet', 'get', '/sulama/kanallar/ozet/', None),
+        ('kanallar.son_veriler', 'get', f'/sulama/kanallar/{kanal.id}/son_veriler/', None),
+        ('kanallar.su_hacmi_hesapla', 'post', f'/sulama/kanallar/{kanal.id}/su_hacmi_hesapla/',
+         {'yukseklik': olcum.yukseklik}),
+        ('gunluk_sebeke_su.list', 'get', f'/sulama/gunluk-sebeke-su/?{ay}', None),
+        ('gunluk_sebeke_su.retrieve', 'get', f'/sulama/gunluk-sebeke-su/{olcum.id}/?{ay}', None),
+        ('gunluk_sebeke_su.tarih_araligi', 'get',
+         f'/sulama/gunluk-sebeke-su/tarih_araligi/?baslangic={son.replace(day=1)}&bitis={son}', None),
+        ('gunluk_sebeke_su.disari_aktar', 'get', f'/sulama/gunluk-sebeke-su/disari_aktar/?{yil_araligi}', None),
+        ('gunluk_sebeke_su.ozet_istatistik', 'get', f'/sulama/gunluk-sebeke-su/ozet_istatistik/?{yil_araligi}', None),
+        ('gunluk_sebeke_su.ozet_istatistik_ay_ortasi', 'get', f'/sulama/gunluk-sebeke-su/ozet_istatistik/?{ay}', None),
+        ('gunluk_sebeke_su.hesapla_su_miktari', 'post', '/sulama/gunluk-sebeke-su/hesapla_su_miktari/',
+         {'kanal': kanal.id, 'yukseklik': olcum.yukseklik}),
+        ('gunluk_sebeke_su.toplu_yukle', 'post', '/sulama/gunluk-sebeke-su/toplu_yukle/', {'kayitlar': [
+            {'kanal': kanal.id, 'tarih': str(gun), 'baslangic_saati': f'{gun}T21:00:00Z',
+             'bitis_saati': f'{gun}T22:00:00Z', 'yukseklik': olcum.yukseklik}
+            for gun in ay_gunleri
+        ]}),
+        ('gunluk_depolama_su.list', 'get', f'/sulama/gunluk-depolama-su/?{ay}', None),
+        ('gunluk_depolama_su.disari_aktar', 'get', f'/sulama/gunluk-depolama-su/disari_aktar/?{yil_araligi}', None),
+        ('gunluk_depolama_su.son_durum', 'get', '/sulama/gunluk-depolama-su/son_durum/', None),
+        ('gunluk_depolama_su.istatistikler', 'get', f'/sulama/gunluk-depolama-su/istatistikler/?{yil_araligi}', None),
+        ('gunluk_depolama_su.toplu_yukle', 'post', '/sulama/gunluk-depolama-su/toplu_yukle/', {'kayitlar': [
+            {'depolama_tesisi': tesis.id, 'tarih': str(gun), 'kot': depolama_olcum.kot if depolama_olcum else 0}
+            for gun in ay_gunleri
+        ]}),
+        ('urun_kategorileri.list', 'get', '/sulama/urun-kategorileri/', None),
+        ('urunler.list', 'get', '/sulama/urunler/', None),
+        ('urunler.ozet', 'get', '/sulama/urunler/ozet/', None),
+        ('yillik_tuketim.list', 'get', '/sulama/yillik-tuketim/', None),
+        ('yillik_tuketim.yil_ozeti', 'get', f'/sulama/yillik-tuketim/yil_ozeti/?yil={yil}', None),
+        ('yillik_tuketim.karsilastirma', 'get',
+         f'/sulama/yillik-tuketim/karsilastirma/?baslangic_yil={yil - 2}&bitis_yil={yil}', None),
+        ('yillik_urun_detay.list', 'get', '/sulama/yillik-urun-detay/', None),
+        ('dashboard.aylik_su_kullanimi', 'get', f'/sulama/dashboard/aylik_su_kullanimi/?yil={yil}', None),
+        ('dashboard.aylik_su_kullanimi_sulama', 'get',
+         f'/sulama/dashboard/aylik_su_kullanimi/?yil={yil}&sulama={sulama.id}', None),
+        ('dashboard.onbellek_istatistikleri', 'get', '/sulama/dashboard/onbellek_istatistikleri/', None),
+        ('abak_hesaplama.toplu_hacim_hesapla', 'post', '/sulama/abak-hesaplama/toplu_hacim_hesapla/', {'olcumler': [
+            {'kanal': kanal.id, 'yukseklik': round(0.1 + sira / 500, 3)} for sira in range(500)
+        ] + [
+            {'depolama_tesisi': tesis.id, 'kot': depolama_olcum.kot if depolama_olcum else 0}
+        ]}),
+        ('isler.list', 'get', '/sulama/isler/', None),
+        ('excel_export', 'post', '/sulama/api/excel-export/', json.loads(_ornek_istek_verisi())),
+    ]
+    if depolama_olcum:
+        uc_noktalari.append(
+            ('gunluk_depolama_su.retrieve', 'get', f'/sulama/gunluk-depolama-su/{depolama_olcum.id}/?{ay}', None)
+        )
+    if urun:
+        uc_noktalari += [
+            ('urunler.retrieve', 'get', f'/sulama/urunler/{urun.id}/', None),
+            ('urunler.yillik_tuketimler', 'get', f'/sulama/urunler/{urun.id}/yillik_tuketimler/', None),
+        ]
+    if plan:
+        uc_noktalari += [
+            ('yillik_tuketim.retrieve', 'get', f'/sulama/yillik-tuketim/{plan.id}/', None),
+            ('yillik_tuketim.excel_aktar', 'get', f'/sulama/yillik-tuketim/excel_aktar/?id={plan.id}', None),
+            ('yillik_tuketim.bulk_create', 'post', '/sulama/yillik-tuketim/bulk_create/', {
+                'sulama': plan.sulama_id, 'yil': plan.yil, 'ciftlik_randi': plan.ciftlik_randi,
+                'iletim_randi': plan.iletim_randi, 'table_data': [
+                    {'urun': detay.urun_id, 'ekim_alani': detay.alan * 1.1, 'ekim_orani': detay.ekim_orani,
+                     'su_tuketimi': detay.su_tuketimi}
+                    for detay in plan.urun_detaylari.all()
+                ],
+            }),
+            ('yillik_tuketim.ozetleri_hesapla', 'post', '/sulama/yillik-tuketim/ozetleri_hesapla/',
+             {'sulama': plan.sulama_id, 'yil': plan.yil}),
+        ]
+    return [
+        {'ad': ad, 'yontem': yontem, 'yol': yol, 'govde': govde, 'yazma': yontem == 'post' and ad.endswith(
+            ('toplu_yukle', 'bulk_create', 'ozetleri_hesapla'))}
+        for ad, yontem, yol, govde in sorted(uc_noktalari)
+    ]
+
+
+def _yuzdelik(degerler, oran):
+    return degerler[round(oran * (len(degerler) - 1))]
+
+
+class Command(BaseCommand):
+    help = ("Sulama API'sindeki tüm viewset action'larının süre, sorgu sayısı ve tepe bellek kullanımını "
+            "ölçer; çalıştırmalar arasında karşılaştırılabilir JSON rapor yazar")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kullanici', default=None,
+                            help=f"İstekleri yapan kullanıcı (varsayılan: {YONETICI_ADI} veya ilk superuser)")
+        parser.add_argument('--tekrar', type=int, default=5, help="Süre ölçümü için istek sayısı")
+        parser.add_argument('--isinma', type=int, default=1, help="Ölçüm öncesi ısınma isteği sayısı")
+        parser.add_argument('--soguk', action='store_true', help="Her istekten önce Django önbelleğini temizle")
+        parser.add_argument('--sadece', nargs='+', default=None, help="Adında bu ifadelerden biri geçen uç noktalar")
+        parser.add_argument('--yazma-yok', action='store_true', help="Veri yazan (geri alınan) istekleri atla")
+        parser.add_argument('--cikti', default=None, help="JSON raporun yazılacağı dosya")
+        parser.add_argument('--karsilastir', default=None, help="Karşılaştırılacak önceki JSON rapor")
+        parser.add_argument('--esik', type=float, default=25.0,
+                            help="Karşılaştırmada p50 süresinde gerileme sayılacak artış yüzdesi")
+        parser.add_argument('--esik-ms', type=float, default=5.0,
+                            help="Bundan küçük p50 farkları ölçüm gürültüsü sayılır (ms)")
+
+    def handle(self, *args, **options):
+        if options['tekrar'] < 1:
+            raise CommandError("--tekrar en az 1 olmalı")
+        kullanici = self._kullanici(options['kullanici'])
+        istemci = APIClient(raise_request_exception=False)
+        istemci.force_authenticate(kullanici)
+
+        olcum = GunlukSebekeyeAlinanSuMiktari.objects.select_related('kanal__depolama_tesisi__sulama').filter(
+            kanal__depolama_tesisi__sulama__in=self._kapsam(kullanici)
+        ).order_by('-tarih', '-baslangic_saati', '-id').first()
+        if olcum is None:
+            raise CommandError("Ölçülecek veri yok (önce: manage.py ornek_veri_olustur)")
+        sulama = olcum.kanal.depolama_tesisi.sulama
+        uc_noktalari = _uc_noktalari(
+            olcum,
+            GunlukDepolamaTesisiSuMiktari.objects.filter(depolama_tesisi=olcum.kanal.depolama_tesisi)
+            .order_by('-tarih').first(),
+            Urun.objects.filter(sulama=sulama).order_by('id').first(),
+            YillikGenelSuTuketimi.objects.filter(sulama=sulama).order_by('-yil', 'id').first(),
+        )
+        if options['sadece']:
+            uc_noktalari = [uc for uc in uc_noktalari if any(ifade in uc['ad'] for ifade in options['sadece'])]
+        if options['yazma_yok']:
+            uc_noktalari = [uc for uc in uc_noktalari if not uc['yazma']]
+
+        sonuclar = {}
+        self.stdout.write(f"{'uç nokta':<44} {'durum':>5} {'p50 ms':>8} {'p95 ms':>8} {'sorgu':>6} "
+                          f"{'tepe KB':>9} {'yanıt KB':>9}")
+        # İstemci 'testserver' adıyla istek yapar; hatalı yanıtlar her tekrarda loglanmasın, raporda durum kodu var
+        istek_logu = logging.getLogger('django.request')
+        log_seviyesi = istek_logu.level
+        istek_logu.setLevel(logging.CRITICAL)
+        try:
+            # Dashboard'un bayat yanıt yenilemesi arka plan thread'i başlatır; ölçülen isteklerle çakışmasın.
+            # Sentetik istekler canlı /metrics değerlerine yazılmasın (middleware ilk istekte yüklenir)
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], DASHBOARD_BAYAT_SURESI=0,
+                                   METRIKLER_ETKIN=False):
+                for uc in uc_noktalari:
+                    sonuc = sonuclar[uc['ad']] = self._olc(istemci, uc, options)
+                    satir = (
+                        f"{uc['ad']:<44} {sonuc['durum']:>5} {sonuc['sure_ms']['p50']:>8.1f} "
+                        f"{sonuc['sure_ms']['p95']:>8.1f} {sonuc['sorgu_sayisi']:>6} "
+                        f"{sonuc['tepe_bellek_kb']:>9.0f} {sonuc['yanit_bayt'] / 1024:>9.1f}"
+                    )
+                    self.stdout.write(self.style.WARNING(satir) if sonuc['durum'] >= 400 else satir)
+        finally:
+            istek_logu.setLevel(log_seviyesi)
+        hatali = [ad for ad, sonuc in sonuclar.items() if sonuc['durum'] >= 400]
+        if hatali:
+            self.stdout.write(self.style.WARNING(f"Hata dönen uç noktalar: {', '.join(hatali)}"))
+
+        rapor = {
+            'surum': RAPOR_SURUMU,
+            'zaman': timezone.now().isoformat(),
+            'commit': self._commit(),
+            'veritabani': connection.vendor,
+            'kullanici': kullanici.username,
+            'parametreler': {'tekrar': options['tekrar'], 'isinma': options['isinma'], 'soguk': options['soguk']},
+            'veri': {
+                'sulama': Sulama.objects.count(),
+                'kanal': Kanal.objects.count(),
+                'sebeke_olcum': GunlukSebekeyeAlinanSuMiktari.objects.count(),
+                'depolama_olcum': GunlukDepolamaTesisiSuMiktari.objects.count(),
+                'yillik_plan': YillikGenelSuTuketimi.objects.count(),
+            },
+            'sonuclar': sonuclar,
+        }
+        if options['cikti']:
+            with open(options['cikti'], 'w', encoding='utf-8') as dosya:
+                json.dump(rapor, dosya, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Rapor yazıldı: {options['cikti']}")
+
+        if options['karsilastir']:
+            self._karsilastir(rapor, options['karsilastir'], options['esik'], options['esik_ms'])
+
+    def _kullanici(self, kullanici_adi):
+        if kullanici_adi:
+            kullanici = User.objects.filter(username=kullanici_adi).first()
+        else:
+            kullanici = (User.objects.filter(username=YONETICI_ADI).first()
+                         or User.objects.filter(is_superuser=True).order_by('id').first())
+        if kullanici is None:
+            raise CommandError("Ölçüm kullanıcısı bulunamadı (--kullanici verin veya ornek_veri_olustur çalıştırın)")
+        return kullanici
+
+    def _kapsam(self, kullanici):
+        if kullanici.is_superuser:
+            return Sulama.objects.values('id')
+        return kullanici.profil.kullanici_sulama_yetkileri.filter(aktif=True).values('sulama')
+
+    def _istek(self, istemci, uc, soguk):
+        """İsteği yap, akış yanıtlarını da tüket; (yanıt, gövde boyutu) döndürür"""
+        if soguk:
+            cache.clear()
+        with transaction.atomic():
+            if uc['yontem'] == 'post':
+                yanit = istemci.post(uc['yol'], uc['govde'], format='json')
+            else:
+                yanit = istemci.get(uc['yol'])
+            boyut = (sum(len(parca) for parca in yanit.streaming_content) if yanit.streaming
+                     else len(yanit.content))
+            if uc['yazma']:
+                transaction.set_rollback(True)
+        return yanit, boyut
+
+    def _olc(self, istemci, uc, options):
+        for _ in range(options['isinma']):
+            self._istek(istemci, uc, options['soguk'])
+
+        # Süreler tracemalloc ve sorgu kaydı kapalıyken ölçülür
+        sureler = []
+        for _ in range(options['tekrar']):
+            baslangic = time.perf_counter()
+            self._istek(istemci, uc, options['soguk'])
+            sureler.append((time.perf_counter() - baslangic) * 1000)
+        sureler.sort()
+
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as sorgular:
+                yanit, boyut = self._istek(istemci, uc, options['soguk'])
+            _, tepe = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'yontem': uc['yontem'].upper(),
+            'yol': uc['yol'],
+            'durum': yanit.status_code,
+            'sure_ms': {
+                'min': round(sureler[0], 2),
+                'p50': round(statistics.median(sureler), 2),
+                'p95': round(_yuzdelik(sureler, 0.95), 2),
+                'ortalama': round(statistics.fmean(sureler), 2),
+            },
+            'sorgu_sayisi': len(sorgular.captured_queries),
+            'sorgu_suresi_ms': round(sum(float(sorgu['time']) for sorgu in sorgular.captured_queries) * 1000, 2),
+            'tepe_bellek_kb': round(tepe / 1024, 1),
+            'yanit_bayt': boyut,
+        }
+
+    def _commit(self):
+        try:
+            sonuc = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                                   capture_output=True, text=True, timeout=5)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return sonuc.stdout.strip() or None
+
+    def _karsilastir(self, rapor, yol, esik, esik_ms):
+        try:
+            with open(yol, encoding='utf-8') as dosya:
+                onceki = json.load(dosya)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Önceki rapor okunamadı ({yol}): {e}")
+        if onceki.get('surum') != RAPOR_SURUMU:
+            raise CommandError(f"Rapor sürümü uyumsuz: {onceki.get('surum')} != {RAPOR_SURUMU}")
+        if onceki.get('veri') != rapor['veri']:
+            self.stdout.write(self.style.WARNING(
+                f"Veri büyüklükleri farklı, sonuçlar doğrudan karşılaştırılamayabilir: {onceki.get('veri')}"
+            ))
+
+        self.stdout.write(f"\nKarşılaştırma: {onceki.get('commit') or yol} -> {rapor['commit'] or 'şimdiki'}")
+        self.stdout.write(f"{'uç nokta':<44} {'p50 ms':>17} {'değişim':>8} {'sorgu':>9}")
+        gerilemeler = []
+        for ad, sonuc in rapor['sonuclar'].items():
+            eski = onceki['sonuclar'].get(ad)
+            if eski is None:
+                continue
+            eski_sure, yeni_sure = eski['sure_ms']['p50'], sonuc['sure_ms']['p50']
+            degisim = (yeni_sure - eski_sure) / eski_sure * 100 if eski_sure else 0
+            if eski['durum'] != sonuc['durum']:
+                # Farklı yanıtların süreleri karşılaştırılmaz; hata vermeye başlamak gerilemedir
+                if eski['durum'] < 400 <= sonuc['durum']:
+                    gerilemeler.append(ad)
+                satir = f"{ad:<44} durum {eski['durum']} > {sonuc['durum']}"
+            else:
+                yavasladi = degisim > esik and yeni_sure - eski_sure > esik_ms
+                if yavasladi or sonuc['sorgu_sayisi'] > eski['sorgu_sayisi']:
+                    gerilemeler.append(ad)
+                satir = (f"{ad:<44} {eski_sure:>8.1f}>{yeni_sure:<8.1f} {degisim:>+7.0f}% "
+                         f"{eski['sorgu_sayisi']:>4}>{sonuc['sorgu_sayisi']:<4}")
+            self.stdout.write(self.style.ERROR(satir) if ad in gerilemeler else satir)
+
+        if gerilemeler:
+            raise CommandError(
+                f"Gerileme (p50 > %{esik:g}, sorgu sayısı artışı veya hata yanıtı): {', '.join(gerilemeler)}"
+            )
+        self.stdout.write(self.style.SUCCESS("Gerileme yok"))
@@ -0,0 +1,43 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils.dateparse import parse_date
+
+from sulama.aylik_ozet import aylik_ozetleri_yeniden_olustur, ay_sonu
+from sulama.models import GunlukSebekeyeAlinanSuMiktari
+
+
+class Command(BaseCommand):
+    help = "Aylık kanal su özetlerini verilen tarih aralığının ayları için ham ölçümlerden yeniden hesaplar"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--baslangic', help="YYYY-MM-DD (varsayılan: ilk ölçüm)")
+        parser.add_argument('--bitis', help="YYYY-MM-DD (varsayılan: son ölçüm)")
+        parser.add_argument('--kanal', type=int, nargs='+', default=None, help="Sadece bu kanallar")
+
+    def _tarih(self, deger, ad):
+        tarih = parse_date(deger) if deger else None
+        if deger and tarih is None:
+            raise CommandError(f"Geçersiz {ad} tarihi: {deger} (YYYY-MM-DD kullanın)")
+        return tarih
+
+    def handle(self, *args, **options):
+        baslangic = self._tarih(options['baslangic'], 'başlangıç')
+        bitis = self._tarih(options['bitis'], 'bitiş')
+        if baslangic is None or bitis is None:
+            sinirlar = GunlukSebekeyeAlinanSuMiktari.objects.aggregate(ilk=Min('tarih'), son=Max('tarih'))
+            baslangic = baslangic or sinirlar['ilk'] or date.today()
+            bitis = bitis or sinirlar['son'] or date.today()
+        if baslangic > bitis:
+            raise CommandError("Başlangıç tarihi bitiş tarihinden sonra olamaz")
+
+        # Her yıl kendi transaction'ında: uzun kilitlerden ve büyük bellek kullanımından kaçınılır
+        toplam = 0
+        for yil in range(baslangic.year, bitis.year + 1):
+            yil_baslangic = max(baslangic, date(yil, 1, 1))
+            yil_bitis = min(ay_sonu(bitis), date(yil, 12, 31))
+            yazilan = aylik_ozetleri_yeniden_olustur(yil_baslangic, yil_bitis, options['kanal'])
+            toplam += yazilan
+            self.stdout.write(f"{yil}: {yazilan} aylık özet")
+        self.stdout.write(self.style.SUCCESS(f"Toplam {toplam} aylık özet yeniden hesaplandı"))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from sulama.iceri_aktarma import dosya_satirlarini_oku, depolama_su_miktarlarini_yukle
+
+
+class Command(BaseCommand):
+    help = "CSV/XLSX dosyasındaki günlük depolama tesisi kot ölçümlerini (depolama_tesisi, tarih) anahtarıyla içeri aktarır"
+
+    def add_arguments(self, parser):
+        parser.add_argument('dosya', help="depolama_tesisi, tarih, kot (ve opsiyonel su_miktari) sütunlarını içeren .csv/.xlsx dosyası")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Tek transaction'da yazılacak satır sayısı")
+        parser.add_argument('--interpolasyonsuz', action='store_true', help="Sadece abakta tam eşleşen kotları kabul et")
+        parser.add_argument('--hata-limiti', type=int, default=50, help="Ekrana yazılacak en fazla hatalı satır sayısı")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['dosya'], 'rb') as dosya:
+                satirlar = dosya_satirlarini_oku(dosya)
+        except OSError as e:
+            raise CommandError(f"Dosya açılamadı: {e}")
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"{len(satirlar)} satır okundu")
+
+        def ilerleme(islenen, toplam):
+            self.stdout.write(f"{islenen}/{toplam} kayıt yazıldı")
+
+        sonuc = depolama_su_miktarlarini_yukle(
+            satirlar,
+            lambda sulama_id: True,
+            interpolasyon=not options['interpolasyonsuz'],
+            batch_size=options['batch_size'],
+            ilerleme=ilerleme,
+        )
+
+        for hata in sonuc['hatalar'][:options['hata_limiti']]:
+            mesajlar = ', '.join(f"{alan}: {mesaj}" for alan, mesaj in hata['hatalar'].items())
+            self.stderr.write(f"Satır {hata['satir']}: {mesajlar}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Toplam {sonuc['kaydedilen']} kayıt yazıldı, {sonuc['hatali']} satır hatalı"
+        ))
@@ -0,0 +1,78 @@
+import json
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from sulama.excel import sablon_kopyasi, sablon_yolu
+from sulama.views import export_to_excel_with_template
+
+
+def _ornek_istek_verisi(satir_sayisi=16):
+    """Planlama ekranındaki tipik tablo büyüklüğünde istek gövdesi"""
+    return json.dumps({
+        'formData': {'yil': 2024, 'sulama': 'Ölçüm Sulaması', 'kurumAdi': 'DSİ', 'ciftlikRandi': 80, 'iletimRandi': 85},
+        'tableData': [
+            {
+                'urun': f'Ürün {i}', 'ekim_alani': 100 + i, 'ekim_orani': 100,
+                'ur_values': [10 * ((i + ay) % 7) for ay in range(12)], 'toplam_ur': 420, 'su_tuketimi': 1000,
+            }
+            for i in range(satir_sayisi)
+        ],
+        'results': {},
+    })
+
+
+class Command(BaseCommand):
+    help = "Şablonlu Excel dışa aktarımının 1, 10 ve 50 eşzamanlı istekte gecikme ve bellek kullanımını ölçer"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--eszamanli', type=int, nargs='+', default=[1, 10, 50],
+                            help="Ölçülecek eşzamanlı istek sayıları")
+        parser.add_argument('--tekrar', type=int, default=3,
+                            help="Her eşzamanlılık seviyesinde kaç tur istek gönderileceği")
+        parser.add_argument('--satir', type=int, default=16, help="Tablodaki ürün satırı sayısı")
+
+    def handle(self, *args, **options):
+        try:
+            sablon_kopyasi()
+        except OSError as e:
+            raise CommandError(f"Şablon okunamadı ({sablon_yolu()}): {e}")
+
+        fabrika = RequestFactory()
+        govde = _ornek_istek_verisi(options['satir'])
+
+        def istek_gonder(_):
+            istek = fabrika.post('/sulama/api/excel-export/', data=govde, content_type='application/json')
+            baslangic = time.perf_counter()
+            yanit = export_to_excel_with_template(istek)
+            boyut = sum(len(parca) for parca in yanit.streaming_content)
+            return time.perf_counter() - baslangic, boyut
+
+        self.stdout.write(f"{'eşzamanlı':>10} {'istek':>6} {'p50 ms':>8} {'p95 ms':>8} {'maks ms':>8} "
+                          f"{'istek/sn':>9} {'tepe bellek MB':>15}")
+        for eszamanli in options['eszamanli']:
+            istek_sayisi = eszamanli * options['tekrar']
+
+            # Gecikme ölçümü (tracemalloc kapalı)
+            with ThreadPoolExecutor(max_workers=eszamanli) as havuz:
+                baslangic = time.perf_counter()
+                sonuclar = list(havuz.map(istek_gonder, range(istek_sayisi)))
+                toplam_sure = time.perf_counter() - baslangic
+            sureler = sorted(sure * 1000 for sure, _ in sonuclar)
+
+            # Bellek ölçümü: aynı yük altında Python ayırmalarının tepe değeri
+            tracemalloc.start()
+            with ThreadPoolExecutor(max_workers=eszamanli) as havuz:
+                list(havuz.map(istek_gonder, range(eszamanli)))
+            _, tepe = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            self.stdout.write(
+                f"{eszamanli:>10} {istek_sayisi:>6} {statistics.median(sureler):>8.1f} "
+                f"{sureler[int(0.95 * (len(sureler) - 1))]:>8.1f} {sureler[-1]:>8.1f} "
+                f"{istek_sayisi / toplam_sure:>9.1f} {tepe / 1024 / 1024:>15.1f}"
+            )
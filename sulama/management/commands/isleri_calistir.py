@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from sulama.isler import (
+    alt_surecte_yurut, calisan_nabzi, isi_hatali_isaretle, isi_kuyruga_geri_al, siradaki_isi_al,
+    yarim_kalan_isleri_isaretle
+)
+
+
+class Command(BaseCommand):
+    help = "Kuyruktaki arka plan işlerini sınırlı sayıda alt süreçte çalıştırır"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--eszamanli', type=int, default=None,
+                            help="Aynı anda çalışacak iş sayısı (varsayılan: ARKA_PLAN_IS_SAYISI)")
+        parser.add_argument('--bekleme', type=float, default=2.0,
+                            help="Kuyruk boşken yeni iş için bekleme süresi (saniye)")
+        parser.add_argument('--tek-sefer', action='store_true',
+                            help="Kuyruktaki işler bitince çık")
+        parser.add_argument('--surec-basina-is', type=int, default=50,
+                            help="Bir alt süreç bu kadar işten sonra yenilenir (bellek birikimini önler)")
+
+    def handle(self, *args, **options):
+        eszamanli = max(1, options['eszamanli'] or settings.ARKA_PLAN_IS_SAYISI)
+        calisan = f"{socket.gethostname()}:{os.getpid()}"
+
+        asimlar = yarim_kalan_isleri_isaretle(calisan)
+        if asimlar:
+            self.stdout.write(self.style.WARNING(f"{asimlar} yarım kalmış iş hatalı olarak işaretlendi"))
+
+        havuz = self._havuz_olustur(eszamanli, options['surec_basina_is'])
+        self.stdout.write(f"{calisan} {eszamanli} eşzamanlı iş ile başladı")
+
+        # Süren işler zaman aşımının en fazla dörtte biri aralıklarla canlı bildirilir
+        nabiz_araligi = min(60, settings.ARKA_PLAN_IS_ZAMAN_ASIMI / 4)
+        son_nabiz = time.monotonic()
+        suren = {}
+        try:
+            while True:
+                if suren and time.monotonic() - son_nabiz >= nabiz_araligi:
+                    calisan_nabzi(calisan)
+                    son_nabiz = time.monotonic()
+
+                havuz_bozuk = False
+                for gelecek in [gelecek for gelecek in suren if gelecek.done()]:
+                    is_id = suren.pop(gelecek)
+                    try:
+                        durum = gelecek.result()
+                    except Exception as e:
+                        # Alt süreç çöktü (ör. bellek yetersizliği) - iş sonucu kaydedilemedi
+                        isi_hatali_isaretle(is_id, f"Alt süreç hatası: {e}")
+                        havuz_bozuk = havuz_bozuk or isinstance(e, BrokenProcessPool)
+                        durum = 'HATALI'
+                    self.stdout.write(f"İş #{is_id}: {durum}")
+                if havuz_bozuk:
+                    havuz = self._havuzu_yenile(havuz, suren, eszamanli, options['surec_basina_is'])
+
+                yeni_is = False
+                while len(suren) < eszamanli:
+                    is_ = siradaki_isi_al(calisan)
+                    if is_ is None:
+                        break
+                    try:
+                        gelecek = havuz.submit(alt_surecte_yurut, is_.id)
+                    except BrokenProcessPool:
+                        # Havuz sonuçlar okunduktan sonra bozuldu: iş hiç başlamadığından kuyruğa döner
+                        # ve beklemeden yeni havuzla tekrar alınır
+                        isi_kuyruga_geri_al(is_.id)
+                        havuz = self._havuzu_yenile(havuz, suren, eszamanli, options['surec_basina_is'])
+                        yeni_is = True
+                        break
+                    yeni_is = True
+                    self.stdout.write(f"İş #{is_.id} ({is_.tur}) başladı")
+                    suren[gelecek] = is_.id
+
+                if options['tek_sefer'] and not suren and not yeni_is:
+                    break
+                if not yeni_is:
+                    time.sleep(options['bekleme'] if not suren else min(options['bekleme'], 0.5))
+        except KeyboardInterrupt:
+            self.stdout.write("Durduruluyor, süren işler bekleniyor...")
+        finally:
+            havuz.shutdown(wait=True)
+            for gelecek, is_id in suren.items():
+                if gelecek.exception() is not None:
+                    isi_hatali_isaretle(is_id, f"Alt süreç hatası: {gelecek.exception()}")
+
+    @staticmethod
+    def _havuz_olustur(eszamanli, surec_basina_is):
+        # Alt süreçler 'spawn' ile temiz başlar ve kendi veritabanı bağlantılarını açar
+        connections.close_all()
+        return ProcessPoolExecutor(
+            max_workers=eszamanli,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup,
+            max_tasks_per_child=surec_basina_is,
+        )
+
+    def _havuzu_yenile(self, havuz, suren, eszamanli, surec_basina_is):
+        """
+        Bozulan havuzu kapatıp yenisini aç
+
+        Bir alt süreç öldürüldüğünde (OOM, segfault) havuz kalıcı olarak bozulur ve içindeki
+        tüm işler BrokenProcessPool ile biter; bunlar hatalı işaretlenir, çalıştırıcı yeni
+        havuzla kuyruğu işlemeye devam eder.
+        """
+        self.stdout.write(self.style.WARNING("Alt süreç havuzu bozuldu, yeniden oluşturuluyor"))
+        havuz.shutdown(wait=True)
+        for gelecek, is_id in suren.items():
+            hata = gelecek.exception()
+            if hata is not None:
+                isi_hatali_isaretle(is_id, f"Alt süreç hatası: {hata}")
+            self.stdout.write(f"İş #{is_id}: {'HATALI' if hata is not None else gelecek.result()}")
+        suren.clear()
+        return self._havuz_olustur(eszamanli, surec_basina_is)
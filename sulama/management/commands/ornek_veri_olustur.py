@@ -0,0 +1,210 @@
+import random
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from authentication.models import KullaniciSulamaYetkisi
+from sulama.abak import AbakEgrisi, depolama_abaklari, kanal_abaklari
+from sulama.aylik_ozet import aylik_ozetleri_yeniden_olustur
+from sulama.iceri_aktarma import yillik_tuketim_detaylarini_kaydet
+from sulama.models import (
+    Bolge, DepolamaTesisi, DepolamaTesisiAbak, GunlukDepolamaTesisiSuMiktari, GunlukSebekeyeAlinanSuMiktari,
+    Kanal, KanalAbak, Sulama, SulamaVeriSurumu, Urun, UrunKategorisi
+)
+
+BOLGE_ONEKI = 'Örnek Bölge'
+KULLANICI_ONEKI = 'ornek_kullanici_'
+YONETICI_ADI = 'ornek_yonetici'
+KATEGORILER = ['Hububat', 'Sebze', 'Meyve', 'Endüstri Bitkileri', 'Yem Bitkileri']
+AYLAR = ['ocak', 'subat', 'mart', 'nisan', 'mayis', 'haziran',
+         'temmuz', 'agustos', 'eylul', 'ekim', 'kasim', 'aralik']
+# Sulama sezonu dışında da ölçüm olur ama az; (ay -> ortalama açılma yüksekliği m)
+SEZON_YUKSEKLIGI = [0.2, 0.2, 0.3, 0.6, 1.0, 1.4, 1.6, 1.5, 1.1, 0.6, 0.3, 0.2]
+# Tüm kanal ve tesislerde aynı abak: (yükseklik m, hacim m³) ve (kot m, hacim m³)
+KANAL_ABAGI = [(adim / 10, round(900 * (adim / 10) ** 1.5, 2)) for adim in range(21)]
+DEPOLAMA_ABAGI = [(900 + adim, round(1e6 * adim ** 1.4 / 1.2)) for adim in range(31)]
+
+
+class Command(BaseCommand):
+    help = ("Performans ölçümleri için ayarlanabilir büyüklükte örnek veri üretir: bölge, sulama, "
+            "abaklı depolama tesisleri ve kanallar, yıllarca günlük ölçüm, ürünler ve yıllık planlar")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bolge', type=int, default=2, help="Bölge sayısı")
+        parser.add_argument('--sulama', type=int, default=3, help="Bölge başına sulama")
+        parser.add_argument('--tesis', type=int, default=2, help="Sulama başına depolama tesisi")
+        parser.add_argument('--kanal', type=int, default=4, help="Tesis başına kanal")
+        parser.add_argument('--yil', type=int, default=3, help="Kaç yıllık günlük ölçüm")
+        parser.add_argument('--son-yil', type=int, default=None, help="Son ölçüm yılı (varsayılan: geçen yıl)")
+        parser.add_argument('--gunluk-olcum', type=int, default=1, help="Kanal başına günlük ölçüm (açılış) sayısı")
+        parser.add_argument('--urun', type=int, default=10, help="Sulama başına ürün")
+        parser.add_argument('--kullanici', type=int, default=10, help="Sulama yetkili kullanıcı sayısı")
+        parser.add_argument('--tohum', type=int, default=42, help="Rastgele sayı tohumu (aynı tohum aynı veri)")
+        parser.add_argument('--temizle', action='store_true', help="Önce daha önce üretilmiş örnek veriyi sil")
+
+    def handle(self, *args, **options):
+        if min(options['bolge'], options['sulama'], options['tesis'], options['kanal'], options['yil'],
+               options['gunluk_olcum']) < 1 or options['gunluk_olcum'] > 12:
+            raise CommandError("Sayılar en az 1 olmalı, günlük ölçüm en fazla 12 olabilir")
+        if options['temizle']:
+            self._temizle()
+        elif Bolge.objects.filter(isim__startswith=BOLGE_ONEKI).exists():
+            raise CommandError("Örnek veri zaten var (yeniden üretmek için --temizle)")
+
+        self.rastgele = random.Random(options['tohum'])
+        son_yil = options['son_yil'] or timezone.localdate().year - 1
+        self.yillar = list(range(son_yil - options['yil'] + 1, son_yil + 1))
+
+        with transaction.atomic():
+            sulamalar = self._sulamalari_olustur(options)
+            tesisler, kanallar = self._tesisleri_olustur(sulamalar, options)
+            self.stdout.write(f"{len(sulamalar)} sulama, {len(tesisler)} tesis, {len(kanallar)} kanal")
+            olcum_sayisi = self._olcumleri_olustur(tesisler, kanallar, options['gunluk_olcum'])
+            self.stdout.write(f"{olcum_sayisi} günlük ölçüm")
+            plan_sayisi = self._planlari_olustur(sulamalar, options['urun'])
+            self.stdout.write(f"{plan_sayisi} yıllık plan")
+            self._kullanicilari_olustur(sulamalar, options['kullanici'])
+
+            # Toplu eklemeler sinyal tetiklemez: türetilmiş tablo ve sürümleri elle güncelle
+            aylik_ozetleri_yeniden_olustur(date(self.yillar[0], 1, 1), date(self.yillar[-1], 12, 31),
+                                           [kanal.id for kanal in kanallar])
+            SulamaVeriSurumu.artir(sulama.id for sulama in sulamalar)
+        kanal_abaklari.temizle()
+        depolama_abaklari.temizle()
+        self.stdout.write(self.style.SUCCESS(
+            f"Örnek veri oluşturuldu ({self.yillar[0]}-{self.yillar[-1]}); ölçüm kullanıcısı: {YONETICI_ADI}"
+        ))
+
+    def _temizle(self):
+        with transaction.atomic():
+            sulama_idleri = list(Sulama.objects.filter(bolge__isim__startswith=BOLGE_ONEKI).values_list('id', flat=True))
+            Bolge.objects.filter(isim__startswith=BOLGE_ONEKI).delete()
+            User.objects.filter(username__startswith=KULLANICI_ONEKI).delete()
+            User.objects.filter(username=YONETICI_ADI).delete()
+        self.stdout.write(f"Önceki örnek veri silindi ({len(sulama_idleri)} sulama)")
+
+    def _sulamalari_olustur(self, options):
+        sulamalar = []
+        for b in range(1, options['bolge'] + 1):
+            bolge = Bolge.objects.create(isim=f'{BOLGE_ONEKI} {b}')
+            sulamalar += Sulama.objects.bulk_create([
+                Sulama(bolge=bolge, isim=f'Örnek Sulama {b}-{s}') for s in range(1, options['sulama'] + 1)
+            ])
+        return sulamalar
+
+    def _tesisleri_olustur(self, sulamalar, options):
+        tesisler = DepolamaTesisi.objects.bulk_create([
+            DepolamaTesisi(
+                sulama=sulama, isim=f'Baraj {t}', minimum_su_kot=900, maksimum_su_kot=930,
+                kret_kotu=932, minimum_hacim=0, maksimum_hacim=30 * 1e6,
+            )
+            for sulama in sulamalar for t in range(1, options['tesis'] + 1)
+        ])
+        DepolamaTesisiAbak.objects.bulk_create([
+            DepolamaTesisiAbak(depolama_tesisi=tesis, kot=kot, hacim=hacim)
+            for tesis in tesisler for kot, hacim in DEPOLAMA_ABAGI
+        ])
+        # Kanal.save() kodu pk'dan ürettiğinden toplu eklemede kod elle verilir
+        kanallar = Kanal.objects.bulk_create([
+            Kanal(depolama_tesisi=tesis, isim=f'Kanal {k}', kanal_kodu=f'O-{tesis.id}-{k}')
+            for tesis in tesisler for k in range(1, options['kanal'] + 1)
+        ])
+        KanalAbak.objects.bulk_create([
+            KanalAbak(kanal=kanal, yukseklik=yukseklik, hacim=hacim)
+            for kanal in kanallar for yukseklik, hacim in KANAL_ABAGI
+        ])
+        return tesisler, kanallar
+
+    def _olcumleri_olustur(self, tesisler, kanallar, gunluk_olcum):
+        rastgele = self.rastgele
+        gunler = []
+        gun = date(self.yillar[0], 1, 1)
+        while gun.year <= self.yillar[-1]:
+            gunler.append(gun)
+            gun += timedelta(days=1)
+
+        kanal_egrisi = AbakEgrisi(*zip(*KANAL_ABAGI))
+        depolama_egrisi = AbakEgrisi(*zip(*DEPOLAMA_ABAGI))
+        saat_araligi = 24 // gunluk_olcum
+        # Başlangıç saatleri tüm kanallar için aynı; abak hacimleri kanal başına tek vektörel hesapla bulunur
+        saatler = [
+            (gun, timezone.make_aware(datetime.combine(gun, time(sira * saat_araligi))))
+            for gun in gunler for sira in range(gunluk_olcum)
+        ]
+        toplam = 0
+        for kanal in kanallar:
+            yukseklikler = [
+                round(min(2.0, max(0.05, rastgele.gauss(SEZON_YUKSEKLIGI[gun.month - 1], 0.15))), 2)
+                for gun, _ in saatler
+            ]
+            hacimler = kanal_egrisi.hacimler_bul(yukseklikler).tolist()
+            GunlukSebekeyeAlinanSuMiktari.objects.bulk_create([
+                GunlukSebekeyeAlinanSuMiktari(
+                    kanal=kanal, tarih=gun, yukseklik=yukseklik, su_miktari=hacim, baslangic_saati=baslangic,
+                    bitis_saati=baslangic + timedelta(minutes=rastgele.randint(30, saat_araligi * 60)),
+                )
+                for (gun, baslangic), yukseklik, hacim in zip(saatler, yukseklikler, hacimler)
+            ], batch_size=5000)
+            toplam += len(saatler)
+
+        for tesis in tesisler:
+            kot, kotlar = 920.0, []
+            for gun in gunler:
+                # Bahar dolumu, yaz boşalması
+                kot += (0.08 if gun.month in (2, 3, 4, 5) else -0.06 if gun.month in (6, 7, 8, 9) else 0.01)
+                kot = round(min(929.5, max(900.5, kot + rastgele.uniform(-0.02, 0.02))), 2)
+                kotlar.append(kot)
+            GunlukDepolamaTesisiSuMiktari.objects.bulk_create([
+                GunlukDepolamaTesisiSuMiktari(depolama_tesisi=tesis, tarih=gun, kot=kot, su_miktari=hacim)
+                for gun, kot, hacim in zip(gunler, kotlar, depolama_egrisi.hacimler_bul(kotlar).tolist())
+            ], batch_size=5000)
+            toplam += len(gunler)
+        return toplam
+
+    def _planlari_olustur(self, sulamalar, urun_sayisi):
+        kategoriler = [UrunKategorisi.objects.get_or_create(isim=isim)[0] for isim in KATEGORILER]
+        rastgele = self.rastgele
+        plan_sayisi = 0
+        for sulama in sulamalar:
+            urunler = Urun.objects.bulk_create([
+                Urun(
+                    sulama=sulama, isim=f'Ürün {u}', kar_orani=rastgele.choice([None, 20, 40]),
+                    **{ay: round(rastgele.uniform(20, 180), 1) if 3 <= i <= 9 else 0 for i, ay in enumerate(AYLAR)},
+                )
+                for u in range(1, urun_sayisi + 1)
+            ])
+            Urun.kategori.through.objects.bulk_create([
+                Urun.kategori.through(urun_id=urun.id, urunkategorisi_id=rastgele.choice(kategoriler).id)
+                for urun in urunler
+            ])
+            for yil in self.yillar:
+                satirlar = {
+                    urun.id: {
+                        'alan': round(rastgele.uniform(50, 2000), 1),
+                        'ekim_orani': rastgele.choice([100, 100, 80, 60]),
+                        'su_tuketimi': round(rastgele.uniform(1e5, 5e6)),
+                    }
+                    for urun in rastgele.sample(urunler, max(1, len(urunler) * 2 // 3))
+                }
+                yillik_tuketim_detaylarini_kaydet(sulama, yil, 80, 85, satirlar)
+                plan_sayisi += 1
+        return plan_sayisi
+
+    def _kullanicilari_olustur(self, sulamalar, kullanici_sayisi):
+        yonetici = User.objects.create_superuser(YONETICI_ADI, f'{YONETICI_ADI}@example.com', None)
+        yonetici.set_unusable_password()
+        yonetici.save(update_fields=['password'])
+        seviyeler = [seviye for seviye, _ in KullaniciSulamaYetkisi.YETKI_SEVIYELERI[:3]]
+        for k in range(1, kullanici_sayisi + 1):
+            kullanici = User(username=f'{KULLANICI_ONEKI}{k}')
+            kullanici.set_unusable_password()
+            kullanici.save()
+            KullaniciSulamaYetkisi.objects.bulk_create([
+                KullaniciSulamaYetkisi(
+                    kullanici_profili=kullanici.profil, sulama=sulama, yetki_seviyesi=self.rastgele.choice(seviyeler),
+                )
+                for sulama in self.rastgele.sample(sulamalar, min(2, len(sulamalar)))
+            ])
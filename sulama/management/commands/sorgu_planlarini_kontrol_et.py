@@ -0,0 +1,154 @@
+import json
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Max
+from django.test.utils import CaptureQueriesContext
+
+from authentication.models import GirisKaydi, KullaniciProfili, KullaniciSulamaYetkisi
+from authentication.yetki_kapsami import _veritabanindan_oku
+from sulama.dashboard import aylik_su_kullanimi_hesapla
+from sulama.models import (
+    AylikKanalSuOzeti, GunlukDepolamaTesisiSuMiktari, GunlukSebekeyeAlinanSuMiktari, Sulama, YillikGenelSuTuketimi
+)
+from sulama.pagination import ZamanSerisiCursorPagination
+
+
+def _plan_dugumleri(plan):
+    yield plan
+    for alt_plan in plan.get('Plans', []):
+        yield from _plan_dugumleri(alt_plan)
+
+
+class Command(BaseCommand):
+    help = ("Dashboard, günlük liste ve yetki sorgularının EXPLAIN planlarında sıcak tablolarda "
+            "Seq Scan olmadığını kontrol eder (PostgreSQL)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sulama', type=int, default=None,
+                            help="Sorguların kapsamı olacak sulama (varsayılan: en çok ölçümü olan)")
+        parser.add_argument('--yil', type=int, default=None, help="Varsayılan: son ölçümün yılı")
+        parser.add_argument('--analyze', action='store_true',
+                            help="Kontrolden önce tabloların istatistiklerini güncelle (ANALYZE)")
+        parser.add_argument('--kucuk-tablo-sayfa', type=int, default=16,
+                            help="Bu kadar sayfadan (8 KB) küçük tablolarda tablo taraması kabul edilir")
+        parser.add_argument('--seqscan-kapali', action='store_true',
+                            help="enable_seqscan=off ile sadece uygun indeksin varlığını kontrol et "
+                                 "(küçük veri setlerinde planlayıcı tablo taramasını seçebilir)")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Bu kontrol PostgreSQL gerektirir")
+
+        sulama_id = options['sulama'] or GunlukSebekeyeAlinanSuMiktari.objects.values(
+            'kanal__depolama_tesisi__sulama'
+        ).annotate(sayi=Count('id')).order_by('-sayi').values_list('kanal__depolama_tesisi__sulama', flat=True).first()
+        if sulama_id is None:
+            sulama_id = Sulama.objects.values_list('id', flat=True).first()
+        if sulama_id is None:
+            raise CommandError("Kontrol için veri yok (önce örnek veri yükleyin)")
+        son_tarih = GunlukSebekeyeAlinanSuMiktari.objects.aggregate(son=Max('tarih'))['son'] or date.today()
+        yil = options['yil'] or son_tarih.year
+
+        sebeke = GunlukSebekeyeAlinanSuMiktari._meta.db_table
+        depolama = GunlukDepolamaTesisiSuMiktari._meta.db_table
+        aylik_ozet = AylikKanalSuOzeti._meta.db_table
+        gunluk_liste = GunlukSebekeyeAlinanSuMiktari.objects.filter(
+            tarih__gte=son_tarih.replace(day=1), tarih__lte=son_tarih,
+        ).order_by(*ZamanSerisiCursorPagination.ordering)
+        # Yetkili kullanıcı (tek sulama) ve superuser (tüm sulamalar) kapsamları
+        kontroller = [
+            ('dashboard', self._yakala(lambda: aylik_su_kullanimi_hesapla(yil, sulama_idleri=[sulama_id])),
+             {aylik_ozet, depolama, YillikGenelSuTuketimi._meta.db_table}),
+            ('dashboard_tum', self._yakala(lambda: aylik_su_kullanimi_hesapla(yil)),
+             {aylik_ozet, depolama}),
+            ('gunluk_liste', [self._sql(
+                gunluk_liste.filter(kanal__depolama_tesisi__sulama__in=[sulama_id])[:ZamanSerisiCursorPagination.page_size]
+            )], {sebeke}),
+            ('gunluk_liste_tum', [self._sql(gunluk_liste[:ZamanSerisiCursorPagination.page_size])], {sebeke}),
+            ('gunluk_depolama_liste', [self._sql(
+                GunlukDepolamaTesisiSuMiktari.objects.filter(
+                    depolama_tesisi__sulama__in=[sulama_id], tarih__year=yil,
+                ).order_by('-tarih', 'depolama_tesisi', 'id')[:ZamanSerisiCursorPagination.page_size]
+            )], {depolama}),
+            ('yillik_tuketim', [self._sql(
+                YillikGenelSuTuketimi.objects.filter(sulama_id=sulama_id, yil=yil).order_by()
+            )], {YillikGenelSuTuketimi._meta.db_table}),
+        ]
+        kullanici = User.objects.filter(
+            id__in=KullaniciSulamaYetkisi.objects.values('kullanici_profili__user')
+        ).first() or User.objects.first()
+        if kullanici is not None:
+            kontroller += [
+                ('yetki', self._yakala(lambda: _veritabanindan_oku(kullanici)),
+                 {KullaniciSulamaYetkisi._meta.db_table, KullaniciProfili._meta.db_table}),
+                ('giris_kayitlari', [self._sql(
+                    GirisKaydi.objects.filter(user=kullanici).order_by('-giris_tarihi')[:5]
+                )], {GirisKaydi._meta.db_table}),
+            ]
+
+        with connection.cursor() as cursor:
+            if options['analyze']:
+                for model in (GunlukSebekeyeAlinanSuMiktari, GunlukDepolamaTesisiSuMiktari, AylikKanalSuOzeti,
+                              YillikGenelSuTuketimi, KullaniciSulamaYetkisi, KullaniciProfili, GirisKaydi):
+                    cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+            # Bölümlü tablolarda (GUNLUK_VERI_BOLUMLEME) planda yıl bölümleri taranır; üst tabloya eşlenir
+            sicak = sorted(set().union(*(tablolar for _, _, tablolar in kontroller)))
+            cursor.execute(
+                'SELECT c.relname, c.relpages, p.relname FROM pg_class c '
+                'LEFT JOIN pg_inherits i ON i.inhrelid = c.oid LEFT JOIN pg_class p ON p.oid = i.inhparent '
+                'WHERE c.relname = ANY(%s) OR p.relname = ANY(%s)', [sicak, sicak]
+            )
+            esik = 0 if options['seqscan_kapali'] else options['kucuk_tablo_sayfa']
+            kucuk_tablolar, ust_tablolar = set(), {}
+            for tablo, sayfa, ust_tablo in cursor.fetchall():
+                if sayfa < esik:
+                    kucuk_tablolar.add(tablo)
+                if ust_tablo:
+                    ust_tablolar[tablo] = ust_tablo
+
+            if options['seqscan_kapali']:
+                cursor.execute('SET enable_seqscan = off')
+            try:
+                hatalar = self._kontrol_et(cursor, kontroller, kucuk_tablolar, ust_tablolar)
+            finally:
+                if options['seqscan_kapali']:
+                    cursor.execute('RESET enable_seqscan')
+
+        if hatalar:
+            raise CommandError("Tablo taraması yapan sorgular: " + "; ".join(hatalar))
+        self.stdout.write(self.style.SUCCESS(f"Tüm sorgular indeks kullanıyor (sulama={sulama_id}, yıl={yil})"))
+
+    def _yakala(self, calistir):
+        with CaptureQueriesContext(connection) as sorgular:
+            calistir()
+        return [sorgu['sql'] for sorgu in sorgular.captured_queries]
+
+    def _sql(self, queryset):
+        sql, parametreler = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            sql = cursor.mogrify(sql, parametreler)
+        return sql.decode() if isinstance(sql, bytes) else sql
+
+    def _kontrol_et(self, cursor, kontroller, kucuk_tablolar, ust_tablolar):
+        hatalar = []
+        for ad, sorgular, sicak_tablolar in kontroller:
+            for sql in sorgular:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+                plan = cursor.fetchone()[0]
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                dugumler = list(_plan_dugumleri(plan[0]['Plan']))
+                taramalar = sorted({
+                    dugum['Relation Name'] for dugum in dugumler
+                    if dugum['Node Type'] == 'Seq Scan' and dugum['Relation Name'] not in kucuk_tablolar
+                    and ust_tablolar.get(dugum['Relation Name'], dugum['Relation Name']) in sicak_tablolar
+                })
+                indeksler = sorted({dugum['Index Name'] for dugum in dugumler if 'Index Name' in dugum})
+                if taramalar:
+                    hatalar.append(f"{ad}: {', '.join(taramalar)}")
+                    self.stdout.write(self.style.ERROR(f"{ad:<22} Seq Scan: {', '.join(taramalar)}"))
+                else:
+                    self.stdout.write(f"{ad:<22} {', '.join(indeksler) or '-'}")
+        return hatalar
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from sulama.hesaplama import yillik_ozetleri_guncelle
+from sulama.models import YillikGenelSuTuketimi
+
+
+class Command(BaseCommand):
+    help = "Yıllık genel su tüketimi kayıtlarının saklanan alan, tüketim ve aylık su ihtiyacı değerlerini yeniden hesaplar"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--yil', type=int, help="Sadece bu yılın kayıtlarını güncelle")
+        parser.add_argument('--sulama', type=int, help="Sadece bu sulama sisteminin kayıtlarını güncelle")
+        parser.add_argument('--batch-size', type=int, default=200, help="Tek seferde güncellenecek kayıt sayısı")
+
+    def handle(self, *args, **options):
+        queryset = YillikGenelSuTuketimi.objects.order_by('id')
+        if options['yil']:
+            queryset = queryset.filter(yil=options['yil'])
+        if options['sulama']:
+            queryset = queryset.filter(sulama_id=options['sulama'])
+
+        kayit_idleri = list(queryset.values_list('id', flat=True))
+        batch_size = options['batch_size']
+        guncellenen = 0
+
+        for i in range(0, len(kayit_idleri), batch_size):
+            parca = kayit_idleri[i:i + batch_size]
+            guncellenen += yillik_ozetleri_guncelle(YillikGenelSuTuketimi.objects.filter(id__in=parca))
+            self.stdout.write(f"{guncellenen}/{len(kayit_idleri)} kayıt güncellendi")
+
+        self.stdout.write(self.style.SUCCESS(f"Toplam {guncellenen} kayıt güncellendi"))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from sulama.bolumleme import bolumlu_mu, tabloyu_bolumle, yil_bolumleri, yil_bolumu_olustur
+from sulama.models import GunlukDepolamaTesisiSuMiktari, GunlukSebekeyeAlinanSuMiktari
+
+
+class Command(BaseCommand):
+    help = ("Yıl bölümlü günlük ölçüm tablolarına gelecek yılların bölümlerini önceden ekler "
+            "(PostgreSQL, GUNLUK_VERI_BOLUMLEME)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--yil', type=int, default=None, help="Varsayılan: gelecek yıl")
+        parser.add_argument('--ileri', type=int, default=1,
+                            help="--yil verilmezse bu yıldan sonraki kaç yılın bölümü açılacak")
+        parser.add_argument('--donustur', action='store_true',
+                            help="Bölümlü olmayan tabloları önce bölümlü tabloya dönüştür (tabloyu kilitler)")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Tablo bölümleme PostgreSQL gerektirir")
+        bu_yil = timezone.localdate().year
+        yillar = [options['yil']] if options['yil'] else range(bu_yil, bu_yil + options['ileri'] + 1)
+
+        for model in (GunlukSebekeyeAlinanSuMiktari, GunlukDepolamaTesisiSuMiktari):
+            tablo = model._meta.db_table
+            if not bolumlu_mu(connection, tablo):
+                if not options['donustur']:
+                    self.stdout.write(self.style.WARNING(f"{tablo}: bölümlü değil, atlandı (--donustur)"))
+                    continue
+                tabloyu_bolumle(connection, tablo, options['ileri'])
+                self.stdout.write(f"{tablo}: bölümlü tabloya dönüştürüldü")
+            eklenen = [yil for yil in yillar if yil_bolumu_olustur(connection, tablo, yil)]
+            mevcut = yil_bolumleri(connection, tablo)
+            self.stdout.write(self.style.SUCCESS(
+                f"{tablo}: {', '.join(map(str, eklenen)) or 'yeni bölüm yok'} "
+                f"(bölümler: {mevcut[0]}-{mevcut[-1]})"
+            ))
@@ -0,0 +1,100 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('sulama', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SulamaVeriSurumu',
+            fields=[
+                ('sulama_id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='Sulama ID')),
+                ('surum', models.BigIntegerField(default=0, verbose_name='Sürüm')),
+                ('guncelleme_tarihi', models.DateTimeField(auto_now=True, verbose_name='Güncelleme Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Sulama Veri Sürümü',
+                'verbose_name_plural': 'Sulama Veri Sürümleri',
+            },
+        ),
+        migrations.AddField(
+            model_name='yillikgenelsutuketimi',
+            name='brut_su_aylik',
+            field=models.JSONField(default=list, editable=False, verbose_name='Aylık Brüt Su İhtiyacı (hm³)'),
+        ),
+        migrations.AddField(
+            model_name='yillikgenelsutuketimi',
+            name='brut_su_toplam',
+            field=models.FloatField(default=0, editable=False, verbose_name='Brüt Su İhtiyacı (hm³)'),
+        ),
+        migrations.AddField(
+            model_name='yillikgenelsutuketimi',
+            name='ciftlik_su_aylik',
+            field=models.JSONField(default=list, editable=False, verbose_name='Aylık Çiftlik Su İhtiyacı (hm³)'),
+        ),
+        migrations.AddField(
+            model_name='yillikgenelsutuketimi',
+            name='ciftlik_su_toplam',
+            field=models.FloatField(default=0, editable=False, verbose_name='Çiftlik Su İhtiyacı (hm³)'),
+        ),
+        migrations.AddField(
+            model_name='yillikgenelsutuketimi',
+            name='net_su_aylik',
+            field=models.JSONField(default=list, editable=False, verbose_name='Aylık Net Su İhtiyacı (hm³)'),
+        ),
+        migrations.AddField(
+            model_name='yillikgenelsutuketimi',
+            name='net_su_toplam',
+            field=models.FloatField(default=0, editable=False, verbose_name='Net Su İhtiyacı (hm³)'),
+        ),
+        migrations.AddField(
+            model_name='yillikgenelsutuketimi',
+            name='toplam_alan',
+            field=models.FloatField(default=0, editable=False, verbose_name='Toplam Alan (ha)'),
+        ),
+        migrations.AddField(
+            model_name='yillikgenelsutuketimi',
+            name='toplam_su_tuketimi',
+            field=models.FloatField(default=0, editable=False, verbose_name='Toplam Su Tüketimi (m³)'),
+        ),
+        migrations.AddField(
+            model_name='yillikgenelsutuketimi',
+            name='urun_sayisi',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Ürün Sayısı'),
+        ),
+        migrations.CreateModel(
+            name='ArkaPlanIsi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tur', models.CharField(max_length=50, verbose_name='İş Türü')),
+                ('durum', models.CharField(choices=[('BEKLIYOR', 'Bekliyor'), ('CALISIYOR', 'Çalışıyor'), ('TAMAMLANDI', 'Tamamlandı'), ('HATALI', 'Hatalı')], default='BEKLIYOR', max_length=20, verbose_name='Durum')),
+                ('parametreler', models.JSONField(blank=True, default=dict, verbose_name='Parametreler')),
+                ('girdi_dosyasi', models.FileField(blank=True, null=True, upload_to='isler/girdi/%Y/%m/', verbose_name='Girdi Dosyası')),
+                ('ilerleme', models.PositiveSmallIntegerField(default=0, verbose_name='İlerleme (%)')),
+                ('ilerleme_mesaji', models.CharField(blank=True, default='', max_length=255, verbose_name='İlerleme Mesajı')),
+                ('sonuc', models.JSONField(blank=True, null=True, verbose_name='Sonuç')),
+                ('sonuc_dosyasi', models.FileField(blank=True, null=True, upload_to='isler/sonuc/%Y/%m/', verbose_name='Sonuç Dosyası')),
+                ('hata', models.TextField(blank=True, default='', verbose_name='Hata')),
+                ('calisan', models.CharField(blank=True, default='', max_length=100, verbose_name='Çalışan Süreç')),
+                ('olusturma_tarihi', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturma Tarihi')),
+                ('baslama_tarihi', models.DateTimeField(blank=True, null=True, verbose_name='Başlama Tarihi')),
+                ('bitis_tarihi', models.DateTimeField(blank=True, null=True, verbose_name='Bitiş Tarihi')),
+                ('guncelleme_tarihi', models.DateTimeField(auto_now=True, verbose_name='Güncelleme Tarihi')),
+                ('kullanici', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='arka_plan_isleri', to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı')),
+            ],
+            options={
+                'verbose_name': 'Arka Plan İşi',
+                'verbose_name_plural': 'Arka Plan İşleri',
+                'ordering': ['-olusturma_tarihi'],
+                'indexes': [models.Index(fields=['durum', 'olusturma_tarihi'], name='sulama_arka_durum_d0ff4d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:24
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class AddIndexPostgresteEsZamanli(AddIndexConcurrently):
+    """PostgreSQL'de CREATE INDEX CONCURRENTLY, diğer veritabanlarında (testlerde SQLite) normal AddIndex"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    # Günlük ölçüm tablolarına indeks eklenirken yazmalar kilitlenmesin
+    atomic = False
+
+    dependencies = [
+        ('sulama', '0002_seri_modelleri'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='arkaplanisi',
+            name='sulama_arka_durum_d0ff4d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='arkaplanisi',
+            index=models.Index(condition=models.Q(('durum', 'BEKLIYOR')), fields=['olusturma_tarihi', 'id'], name='arka_plan_isi_kuyruk_idx'),
+        ),
+        AddIndexPostgresteEsZamanli(
+            model_name='gunlukdepolamatesisisumiktari',
+            index=models.Index(fields=['-tarih', 'depolama_tesisi', 'id'], include=('su_miktari',), name='depolama_tarih_sirasi_idx'),
+        ),
+        AddIndexPostgresteEsZamanli(
+            model_name='gunluksebekeyealinansumiktari',
+            index=models.Index(fields=['-tarih', '-baslangic_saati', '-id'], include=('kanal', 'su_miktari'), name='sebeke_tarih_sirasi_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='yillikgenelsutuketimi',
+            index=models.Index(fields=['sulama', 'yil'], name='yillik_tuketim_sulama_yil_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:48
+
+from django.db import migrations, models
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Max, Min, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+import django.db.models.deletion
+
+
+def mevcut_olcumlerden_olustur(apps, schema_editor):
+    """Var olan ölçümlerin aylık özetlerini tek gruplu sorguyla oluştur"""
+    GunlukSebekeyeAlinanSuMiktari = apps.get_model('sulama', 'GunlukSebekeyeAlinanSuMiktari')
+    AylikKanalSuOzeti = apps.get_model('sulama', 'AylikKanalSuOzeti')
+
+    satirlar = GunlukSebekeyeAlinanSuMiktari.objects.order_by().annotate(
+        yil=ExtractYear('tarih'), ay=ExtractMonth('tarih')
+    ).values('kanal_id', 'yil', 'ay').annotate(
+        toplam=Sum('su_miktari'), sayi=Count('id'), en_az=Min('su_miktari'), en_cok=Max('su_miktari'),
+        acik_kalma=Sum(ExpressionWrapper(F('bitis_saati') - F('baslangic_saati'), output_field=DurationField())),
+    )
+    AylikKanalSuOzeti.objects.bulk_create([
+        AylikKanalSuOzeti(
+            kanal_id=satir['kanal_id'], yil=satir['yil'], ay=satir['ay'],
+            toplam_su=satir['toplam'] or 0, kayit_sayisi=satir['sayi'],
+            en_az_su=satir['en_az'], en_cok_su=satir['en_cok'],
+            acik_kalma_dakika=satir['acik_kalma'].total_seconds() / 60 if satir['acik_kalma'] else 0,
+        )
+        for satir in satirlar.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sulama', '0003_sorgu_indeksleri'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AylikKanalSuOzeti',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('yil', models.PositiveSmallIntegerField(verbose_name='Yıl')),
+                ('ay', models.PositiveSmallIntegerField(verbose_name='Ay')),
+                ('toplam_su', models.FloatField(default=0, verbose_name='Toplam Su Miktarı (m³)')),
+                ('kayit_sayisi', models.PositiveIntegerField(default=0, verbose_name='Ölçüm Sayısı')),
+                ('en_az_su', models.FloatField(blank=True, null=True, verbose_name='En Az Su Miktarı (m³)')),
+                ('en_cok_su', models.FloatField(blank=True, null=True, verbose_name='En Çok Su Miktarı (m³)')),
+                ('acik_kalma_dakika', models.FloatField(default=0, verbose_name='Toplam Açık Kalma Süresi (dk)')),
+                ('guncelleme_tarihi', models.DateTimeField(auto_now=True, verbose_name='Güncelleme Tarihi')),
+                ('kanal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aylik_su_ozetleri', to='sulama.kanal', verbose_name='Kanal')),
+            ],
+            options={
+                'verbose_name': 'Aylık Kanal Su Özeti',
+                'verbose_name_plural': 'Aylık Kanal Su Özetleri',
+                'ordering': ['-yil', '-ay', 'kanal'],
+                'indexes': [models.Index(fields=['yil', 'ay'], name='aylik_kanal_ozeti_yil_ay_idx')],
+                'unique_together': {('kanal', 'yil', 'ay')},
+            },
+        ),
+        migrations.RunPython(mevcut_olcumlerden_olustur, migrations.RunPython.noop),
+    ]
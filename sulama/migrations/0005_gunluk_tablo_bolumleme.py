@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.db import migrations
+
+from sulama.bolumleme import bolumlemeyi_kaldir, tabloyu_bolumle
+
+TABLOLAR = ['sulama_gunluksebekeyealinansumiktari', 'sulama_gunlukdepolamatesisisumiktari']
+
+
+def bolumle(apps, schema_editor):
+    """GUNLUK_VERI_BOLUMLEME açıksa günlük ölçüm tablolarını yıl bölümlü tablolara dönüştür"""
+    if schema_editor.connection.vendor != 'postgresql' or not settings.GUNLUK_VERI_BOLUMLEME:
+        return
+    for tablo in TABLOLAR:
+        tabloyu_bolumle(schema_editor.connection, tablo)
+
+
+def bolumlemeyi_geri_al(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for tablo in TABLOLAR:
+        bolumlemeyi_kaldir(schema_editor.connection, tablo)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sulama', '0004_aylik_kanal_su_ozeti'),
+    ]
+
+    operations = [
+        migrations.RunPython(bolumle, bolumlemeyi_geri_al),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:26
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def mukerrer_ana_kayitlari_birlestir(apps, schema_editor):
+    """
+    Aynı (sulama, yıl) için birden fazla ana kayıt varsa en eskisini tut
+
+    Diğer kayıtların ana kayıtta bulunmayan ürün detayları en eski kayda taşınır,
+    kalanlar ana kayıtlarıyla birlikte silinir.
+    """
+    YillikGenelSuTuketimi = apps.get_model('sulama', 'YillikGenelSuTuketimi')
+    YillikUrunDetay = apps.get_model('sulama', 'YillikUrunDetay')
+
+    mukerrerler = YillikGenelSuTuketimi.objects.order_by().values('sulama_id', 'yil').annotate(
+        sayi=Count('id'), ilk_id=Min('id')
+    ).filter(sayi__gt=1)
+    for grup in mukerrerler:
+        digerleri = YillikGenelSuTuketimi.objects.filter(
+            sulama_id=grup['sulama_id'], yil=grup['yil']
+        ).exclude(id=grup['ilk_id'])
+        mevcut_urunler = YillikUrunDetay.objects.filter(
+            yillik_tuketim_id=grup['ilk_id']
+        ).values_list('urun_id', flat=True)
+
+        tasinacaklar = {}
+        for detay_id, urun_id in YillikUrunDetay.objects.filter(
+            yillik_tuketim__in=digerleri
+        ).exclude(urun_id__in=mevcut_urunler).order_by('yillik_tuketim_id', 'id').values_list('id', 'urun_id'):
+            tasinacaklar.setdefault(urun_id, detay_id)
+        YillikUrunDetay.objects.filter(id__in=tasinacaklar.values()).update(yillik_tuketim_id=grup['ilk_id'])
+        digerleri.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sulama', '0005_gunluk_tablo_bolumleme'),
+    ]
+
+    operations = [
+        migrations.RunPython(mukerrer_ana_kayitlari_birlestir, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:26
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sulama', '0006_mukerrer_yillik_tuketimleri'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='yillikgenelsutuketimi',
+            unique_together={('sulama', 'yil')},
+        ),
+        migrations.RemoveIndex(
+            model_name='yillikgenelsutuketimi',
+            name='yillik_tuketim_sulama_yil_idx',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sulama', '0007_yillik_tuketim_tekil'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='depolamatesisi',
+            name='abak_surumu',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Abak Sürümü'),
+        ),
+        migrations.AddField(
+            model_name='kanal',
+            name='abak_surumu',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Abak Sürümü'),
+        ),
+    ]
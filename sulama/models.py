@@ -1,5 +1,11 @@
-from django.db import models
-from django.db.models import Sum
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -47,6 +53,8 @@ class DepolamaTesisi(models.Model):
     minimum_hacim = models.FloatField(null=True, blank=True, verbose_name="Minimum Hacim (m³)")
     sulama = models.ForeignKey(Sulama, on_delete=models.CASCADE, related_name='depolama_tesisleri', verbose_name="Sulama Adi")
     olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
+    # Abak satırları değiştikçe artar; süreç içi abak önbellekleri bununla doğrulanır (sulama/abak.py)
+    abak_surumu = models.PositiveIntegerField(default=0, editable=False, verbose_name="Abak Sürümü")
 
     def __str__(self):
         return f"{self.sulama.bolge.isim} - {self.isim}"
@@ -77,13 +85,15 @@ class Kanal(models.Model):
     aciklama = models.TextField(null=True, blank=True, verbose_name="Açıklama")
     kanal_kodu = models.CharField(max_length=20, null=True, blank=True, verbose_name="Kanal Kodu")
     olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
+    # Abak satırları değiştikçe artar; süreç içi abak önbellekleri bununla doğrulanır (sulama/abak.py)
+    abak_surumu = models.PositiveIntegerField(default=0, editable=False, verbose_name="Abak Sürümü")
 
     def save(self, *args, **kwargs):
         # İlk kaydetme işlemi
         if not self.pk and not self.kanal_kodu:
             super().save(*args, **kwargs)  # ID'yi alabilmek için kaydet
             self.kanal_kodu = f"S-{self.pk}"
-            super().save(*args, **kwargs)  # Kodu güncellemek için tekrar kaydet
+            super().save(update_fields=['kanal_kodu'])  # Kodu güncellemek için tekrar kaydet
         else:
             super().save(*args, **kwargs)
 
@@ -118,18 +128,18 @@ class GunlukSebekeyeAlinanSuMiktari(models.Model):
     yukseklik = models.FloatField(verbose_name="Yükseklik (m)")
     su_miktari = models.FloatField(validators=[MinValueValidator(0)], verbose_name="Su Miktarı (m³)")
 
-    def hesapla_su_miktari(self):
-        """Yükseklik değerine göre kanal abağından su miktarını hesapla - Birebir eşleşme gerekli"""
+    def hesapla_su_miktari(self, interpolasyon=True):
+        """Yükseklik değerine göre kanal abağından su miktarını hesapla
+        
+        Abak satırları arasındaki yükseklikler doğrusal interpolasyonla hesaplanır,
+        abak aralığı dışındaki değerler için 0 döner.
+        """
         if not self.yukseklik or not self.kanal_id:
             return 0
         
-        # Kanala ait abakları kontrol et - TAM EŞLEŞMELİ
-        try:
-            abak = self.kanal.abaklar.get(yukseklik=self.yukseklik)
-            return abak.hacim
-        except KanalAbak.DoesNotExist:
-            # Eğer tam eşleşme yoksa 0 döndür
-            return 0
+        from .abak import kanal_abaklari
+        hacim = kanal_abaklari.hacim_bul(self.kanal_id, self.yukseklik, interpolasyon=interpolasyon)
+        return hacim if hacim is not None else 0
 
     def clean(self):
         from django.core.exceptions import ValidationError
@@ -141,7 +151,13 @@ class GunlukSebekeyeAlinanSuMiktari(models.Model):
         # Su miktarını otomatik hesapla (eğer manuel olarak set edilmemişse)
         if self.yukseklik and not kwargs.pop('manuel_su_miktari', False):
             self.su_miktari = self.hesapla_su_miktari()
-        super().save(*args, **kwargs)
+        # Aylık özet post_save/post_delete'te yenilenir; yenileme hata verirse ölçüm yazması da geri alınsın
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
 
     def __str__(self):
         return f"{self.kanal.isim} - {self.tarih} - {self.su_miktari} m³"
@@ -151,6 +167,43 @@ class GunlukSebekeyeAlinanSuMiktari(models.Model):
         verbose_name = "Günlük Şebekeye Alınan Su Miktarı"
         unique_together = ['kanal', 'tarih', 'baslangic_saati']
         ordering = ['-tarih', 'kanal']
+        indexes = [
+            # Liste/cursor sıralaması ve dashboard'un tarih aralığı toplamları (index-only scan)
+            models.Index(
+                fields=['-tarih', '-baslangic_saati', '-id'], include=['kanal', 'su_miktari'],
+                name='sebeke_tarih_sirasi_idx',
+            ),
+        ]
+
+class AylikKanalSuOzeti(models.Model):
+    """
+    Kanal bazında aylık şebekeye alınan su özeti
+
+    GunlukSebekeyeAlinanSuMiktari'ndan türetilir: ölçüm eklendikçe, değiştikçe veya
+    silindikçe ilgili ay aylik_ozet.aylik_ozetleri_yenile() ile aynı transaction'da
+    yeniden hesaplanır. Elle değiştirilmez; tutarsızlıkta aylik_ozetleri_yeniden_olustur
+    komutu kullanılır.
+    """
+    kanal = models.ForeignKey(Kanal, on_delete=models.CASCADE, related_name='aylik_su_ozetleri', verbose_name="Kanal")
+    yil = models.PositiveSmallIntegerField(verbose_name="Yıl")
+    ay = models.PositiveSmallIntegerField(verbose_name="Ay")
+    toplam_su = models.FloatField(default=0, verbose_name="Toplam Su Miktarı (m³)")
+    kayit_sayisi = models.PositiveIntegerField(default=0, verbose_name="Ölçüm Sayısı")
+    en_az_su = models.FloatField(null=True, blank=True, verbose_name="En Az Su Miktarı (m³)")
+    en_cok_su = models.FloatField(null=True, blank=True, verbose_name="En Çok Su Miktarı (m³)")
+    acik_kalma_dakika = models.FloatField(default=0, verbose_name="Toplam Açık Kalma Süresi (dk)")
+    guncelleme_tarihi = models.DateTimeField(auto_now=True, verbose_name="Güncelleme Tarihi")
+
+    def __str__(self):
+        return f"{self.kanal_id} - {self.yil}/{self.ay:02d} - {self.toplam_su} m³"
+
+    class Meta:
+        verbose_name_plural = "Aylık Kanal Su Özetleri"
+        verbose_name = "Aylık Kanal Su Özeti"
+        unique_together = ['kanal', 'yil', 'ay']
+        ordering = ['-yil', '-ay', 'kanal']
+        indexes = [models.Index(fields=['yil', 'ay'], name='aylik_kanal_ozeti_yil_ay_idx')]
+
 
 class GunlukDepolamaTesisiSuMiktari(models.Model):
     depolama_tesisi = models.ForeignKey(DepolamaTesisi, on_delete=models.CASCADE, related_name='gunluk_depolama_tesisi_su_miktarlari', verbose_name="Depolama Tesisi")
@@ -164,8 +217,16 @@ class GunlukDepolamaTesisiSuMiktari(models.Model):
     class Meta:
         verbose_name_plural = "Günlük Depolama Tesisi Su Miktarları"
         verbose_name = "Günlük Depolama Tesisi Su Miktarı"
+        # unique_together indeksi tesis bazında son kaydı (-tarih) da karşılar
         unique_together = ['depolama_tesisi', 'tarih']
         ordering = ['-tarih', 'depolama_tesisi']
+        indexes = [
+            # Liste/cursor sıralaması ve dashboard'un tarih aralığındaki son kayıt penceresi
+            models.Index(
+                fields=['-tarih', 'depolama_tesisi', 'id'], include=['su_miktari'],
+                name='depolama_tarih_sirasi_idx',
+            ),
+        ]
 
 class UrunKategorisi(models.Model):
     isim = models.CharField(max_length=100, unique=True, verbose_name="Kategori Adı")
@@ -256,6 +317,23 @@ class YillikGenelSuTuketimi(models.Model):
     iletim_randi = models.FloatField(verbose_name="İletim Randı (%)", default=85, validators=[MinValueValidator(0), MaxValueValidator(100)])
     olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
 
+    # Ürün detaylarından hesaplanan özet değerler - detaylar/ürün katsayıları değiştikçe güncellenir
+    toplam_alan = models.FloatField(default=0, editable=False, verbose_name="Toplam Alan (ha)")
+    toplam_su_tuketimi = models.FloatField(default=0, editable=False, verbose_name="Toplam Su Tüketimi (m³)")
+    urun_sayisi = models.IntegerField(default=0, editable=False, verbose_name="Ürün Sayısı")
+    net_su_aylik = models.JSONField(default=list, editable=False, verbose_name="Aylık Net Su İhtiyacı (hm³)")
+    ciftlik_su_aylik = models.JSONField(default=list, editable=False, verbose_name="Aylık Çiftlik Su İhtiyacı (hm³)")
+    brut_su_aylik = models.JSONField(default=list, editable=False, verbose_name="Aylık Brüt Su İhtiyacı (hm³)")
+    net_su_toplam = models.FloatField(default=0, editable=False, verbose_name="Net Su İhtiyacı (hm³)")
+    ciftlik_su_toplam = models.FloatField(default=0, editable=False, verbose_name="Çiftlik Su İhtiyacı (hm³)")
+    brut_su_toplam = models.FloatField(default=0, editable=False, verbose_name="Brüt Su İhtiyacı (hm³)")
+
+    OZET_ALANLARI = [
+        'toplam_alan', 'toplam_su_tuketimi', 'urun_sayisi',
+        'net_su_aylik', 'ciftlik_su_aylik', 'brut_su_aylik',
+        'net_su_toplam', 'ciftlik_su_toplam', 'brut_su_toplam',
+    ]
+
     def get_toplam_randi(self):
         """Toplam randı hesapla"""
         if self.ciftlik_randi is not None and self.iletim_randi is not None:
@@ -270,25 +348,86 @@ class YillikGenelSuTuketimi(models.Model):
         return 0
 
     def get_toplam_alan(self):
-        """Toplam alanı hesapla - tüm ürünlerin toplamı"""
-        return self.urun_detaylari.aggregate(
-            toplam=Sum('alan')
-        )['toplam'] or 0
+        """Toplam alan - tüm ürünlerin toplamı (saklanan özet değer)"""
+        return self.toplam_alan or 0
 
     def get_toplam_su_tuketimi(self):
-        """Toplam su tüketimini hesapla - tüm ürünlerin toplamı"""
-        return self.urun_detaylari.aggregate(
-            toplam=Sum('su_tuketimi')
-        )['toplam'] or 0
+        """Toplam su tüketimi - tüm ürünlerin toplamı (saklanan özet değer)"""
+        return self.toplam_su_tuketimi or 0
+
+    def ozetleri_guncelle(self):
+        """Saklanan alan, tüketim ve aylık su ihtiyacı değerlerini yeniden hesapla"""
+        if ozetleri_guncelle_veya_biriktir([self.pk]):
+            self.refresh_from_db(fields=YillikGenelSuTuketimi.OZET_ALANLARI)
   
     def __str__(self):
-        return f"{self.yil} - {self.sulama.isim} - {self.urun_detaylari.count()} ürün"
+        return f"{self.yil} - {self.sulama.isim} - {self.urun_sayisi} ürün"
     
     class Meta:
         verbose_name_plural = "Yıllık Genel Su Tüketimi"
         verbose_name = "Yıllık Genel Su Tüketimi"
-     
         ordering = ['-yil', 'sulama__bolge__isim', 'sulama__isim']
+        # Sulama ve yıl başına tek ana kayıt; indeksi sulama+yıl aramalarını da karşılar
+        unique_together = ['sulama', 'yil']
+
+
+_ozet_erteleme = threading.local()
+
+
+@contextmanager
+def ozet_guncellemelerini_birlestir():
+    """
+    Blok içindeki özet güncellemelerini biriktir, çıkışta tek seferde yap
+
+    Toplu kaydetmelerde her ekleme/silme için ayrı ayrı yeniden hesaplama
+    yapılmasını önler. Blok hata ile biterse güncelleme yapılmaz.
+    """
+    if getattr(_ozet_erteleme, 'idler', None) is not None:
+        yield
+        return
+
+    _ozet_erteleme.idler = set()
+    try:
+        yield
+        idler = _ozet_erteleme.idler
+    finally:
+        _ozet_erteleme.idler = None
+    ozetleri_guncelle_veya_biriktir(idler)
+
+
+def ozetleri_guncelle_veya_biriktir(yillik_tuketim_idleri):
+    """
+    Verilen yıllık tüketim kayıtlarının özetlerini güncelle
+
+    ozet_guncellemelerini_birlestir bloğu içindeyse sadece biriktirir ve False döner.
+    """
+    from .hesaplama import yillik_ozetleri_guncelle
+
+    yillik_tuketim_idleri = set(yillik_tuketim_idleri) - {None}
+    if getattr(_ozet_erteleme, 'idler', None) is not None:
+        _ozet_erteleme.idler.update(yillik_tuketim_idleri)
+        return False
+    if yillik_tuketim_idleri:
+        yillik_ozetleri_guncelle(YillikGenelSuTuketimi.objects.filter(id__in=yillik_tuketim_idleri))
+    return True
+
+
+class YillikUrunDetayQuerySet(models.QuerySet):
+    """Toplu işlemlerden sonra ana kayıtların özet değerlerini güncelleyen queryset"""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        self._ozetleri_guncelle(objs)
+        return objs
+
+    def bulk_update(self, objs, *args, **kwargs):
+        objs = list(objs)
+        sonuc = super().bulk_update(objs, *args, **kwargs)
+        self._ozetleri_guncelle(objs)
+        return sonuc
+
+    def _ozetleri_guncelle(self, objs):
+        ozetleri_guncelle_veya_biriktir(obj.yillik_tuketim_id for obj in objs)
 
 
 class YillikUrunDetay(models.Model):
@@ -300,6 +439,8 @@ class YillikUrunDetay(models.Model):
     su_tuketimi = models.FloatField(verbose_name="Su Tüketimi (m³)", validators=[MinValueValidator(0)])
     olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
 
+    objects = YillikUrunDetayQuerySet.as_manager()
+
     def get_birim_su_tuketimi(self):
         """Birim su tüketimini hesapla (m³/ha)"""
         if self.alan > 0:
@@ -331,4 +472,317 @@ class YillikUrunDetay(models.Model):
         verbose_name_plural = "Yıllık Ürün Detayları"
         verbose_name = "Yıllık Ürün Detayı"
         unique_together = ['yillik_tuketim', 'urun']
-        ordering = ['yillik_tuketim__yil', 'urun__isim']
\ No newline at end of file
+        ordering = ['yillik_tuketim__yil', 'urun__isim']
+
+
+class ArkaPlanIsi(models.Model):
+    """Kuyruğa alınıp arka planda çalıştırılan uzun süreli iş (bkz. sulama/isler.py)"""
+
+    DURUMLAR = [
+        ('BEKLIYOR', 'Bekliyor'),
+        ('CALISIYOR', 'Çalışıyor'),
+        ('TAMAMLANDI', 'Tamamlandı'),
+        ('HATALI', 'Hatalı'),
+    ]
+
+    tur = models.CharField(max_length=50, verbose_name="İş Türü")
+    durum = models.CharField(max_length=20, choices=DURUMLAR, default='BEKLIYOR', verbose_name="Durum")
+    kullanici = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='arka_plan_isleri', verbose_name="Kullanıcı")
+    parametreler = models.JSONField(default=dict, blank=True, verbose_name="Parametreler")
+    girdi_dosyasi = models.FileField(upload_to='isler/girdi/%Y/%m/', null=True, blank=True, verbose_name="Girdi Dosyası")
+    ilerleme = models.PositiveSmallIntegerField(default=0, verbose_name="İlerleme (%)")
+    ilerleme_mesaji = models.CharField(max_length=255, blank=True, default='', verbose_name="İlerleme Mesajı")
+    sonuc = models.JSONField(null=True, blank=True, verbose_name="Sonuç")
+    sonuc_dosyasi = models.FileField(upload_to='isler/sonuc/%Y/%m/', null=True, blank=True, verbose_name="Sonuç Dosyası")
+    hata = models.TextField(blank=True, default='', verbose_name="Hata")
+    calisan = models.CharField(max_length=100, blank=True, default='', verbose_name="Çalışan Süreç")
+    olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
+    baslama_tarihi = models.DateTimeField(null=True, blank=True, verbose_name="Başlama Tarihi")
+    bitis_tarihi = models.DateTimeField(null=True, blank=True, verbose_name="Bitiş Tarihi")
+    guncelleme_tarihi = models.DateTimeField(auto_now=True, verbose_name="Güncelleme Tarihi")
+
+    def ilerleme_bildir(self, islenen, toplam=None, mesaj=''):
+        """
+        İlerlemeyi kaydet (islenen/toplam veya doğrudan yüzde)
+
+        Sadece ilerleme alanları güncellenir; güncelleme tarihi çalışan işin canlı olduğunu gösterir.
+        """
+        yuzde = int(islenen * 100 / toplam) if toplam else int(islenen)
+        self.ilerleme = max(0, min(yuzde, 100))
+        self.ilerleme_mesaji = mesaj or (f"{islenen}/{toplam}" if toplam else '')
+        ArkaPlanIsi.objects.filter(pk=self.pk).update(
+            ilerleme=self.ilerleme, ilerleme_mesaji=self.ilerleme_mesaji, guncelleme_tarihi=timezone.now()
+        )
+
+    def dosya_kaydet(self, dosya_adi, icerik):
+        """Sonuç dosyasını depolamaya yaz (kayıt, iş tamamlanınca kaydedilir)"""
+        from django.core.files.base import ContentFile
+        self.sonuc_dosyasi.save(dosya_adi, ContentFile(icerik), save=False)
+
+    def __str__(self):
+        return f"{self.tur} #{self.pk} - {self.get_durum_display()}"
+
+    class Meta:
+        verbose_name_plural = "Arka Plan İşleri"
+        verbose_name = "Arka Plan İşi"
+        ordering = ['-olusturma_tarihi']
+        indexes = [
+            # Sadece kuyruktaki işler: siradaki_isi_al() sıralaması
+            models.Index(
+                fields=['olusturma_tarihi', 'id'], condition=models.Q(durum='BEKLIYOR'),
+                name='arka_plan_isi_kuyruk_idx',
+            ),
+        ]
+
+
+class SulamaVeriSurumu(models.Model):
+    """
+    Sulama bazında veri sürümü - dashboard önbelleğinin geçersiz kılınması için
+
+    Ölçüm, plan veya ürün verisi değiştikçe artırılır. Sürüm satırı sulama silindikten
+    sonra da kalabilsin diye sulama_id yabancı anahtar değil, düz alandır.
+    """
+    sulama_id = models.BigIntegerField(primary_key=True, verbose_name="Sulama ID")
+    surum = models.BigIntegerField(default=0, verbose_name="Sürüm")
+    guncelleme_tarihi = models.DateTimeField(auto_now=True, verbose_name="Güncelleme Tarihi")
+
+    @classmethod
+    def artir(cls, sulama_idleri):
+        """Verilen sulamaların sürümünü bir artır (satırı olmayanlar 1 ile oluşturulur)"""
+        sulama_idleri = {sulama_id for sulama_id in sulama_idleri if sulama_id is not None}
+        if not sulama_idleri:
+            return
+        simdi = timezone.now()
+        cls.objects.filter(sulama_id__in=sulama_idleri).update(surum=models.F('surum') + 1, guncelleme_tarihi=simdi)
+        cls.objects.bulk_create(
+            [cls(sulama_id=sulama_id, surum=1, guncelleme_tarihi=simdi) for sulama_id in sulama_idleri],
+            ignore_conflicts=True,
+        )
+
+    @classmethod
+    def kapsam_surumu(cls, sulama_idleri=None):
+        """
+        Kapsamdaki sulamaların sürümlerinden tek bir özet ve son değişiklik zamanı
+
+        sulama_idleri None ise tüm sulamalar. (özet, son_degisiklik) döndürür;
+        kapsamda sürüm satırı yoksa son_degisiklik None olur.
+        """
+        queryset = cls.objects.order_by('sulama_id')
+        if sulama_idleri is not None:
+            queryset = queryset.filter(sulama_id__in=sulama_idleri)
+        satirlar = list(queryset.values_list('sulama_id', 'surum', 'guncelleme_tarihi'))
+        ozet = hashlib.sha1(repr([satir[:2] for satir in satirlar]).encode()).hexdigest()
+        return ozet, max((satir[2] for satir in satirlar), default=None)
+
+    def __str__(self):
+        return f"Sulama {self.sulama_id} - sürüm {self.surum}"
+
+    class Meta:
+        verbose_name_plural = "Sulama Veri Sürümleri"
+        verbose_name = "Sulama Veri Sürümü"
+
+
+# Signal'ler - Yıllık tüketim özet değerlerini güncel tut
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+
+
+@receiver(post_save, sender=YillikGenelSuTuketimi)
+def yillik_tuketim_ozetlerini_guncelle(sender, instance, created, update_fields=None, **kwargs):
+    """Randı değerleri değişmiş olabilir - çiftlik/brüt ihtiyaçları yeniden hesapla"""
+    if update_fields and set(update_fields) <= set(YillikGenelSuTuketimi.OZET_ALANLARI):
+        return
+    instance.ozetleri_guncelle()
+
+
+@receiver(post_save, sender=YillikUrunDetay)
+@receiver(post_delete, sender=YillikUrunDetay)
+def urun_detayi_ozetlerini_guncelle(sender, instance, origin=None, **kwargs):
+    """Ürün detayı eklendiğinde, değiştiğinde veya silindiğinde ana kaydı güncelle"""
+    # Ana kayıt siliniyorsa (cascade) güncellemeye gerek yok
+    if isinstance(origin, YillikGenelSuTuketimi) or getattr(origin, 'model', None) is YillikGenelSuTuketimi:
+        return
+    ozetleri_guncelle_veya_biriktir([instance.yillik_tuketim_id])
+
+
+@receiver(post_save, sender=Urun)
+def urun_katsayilari_ozetlerini_guncelle(sender, instance, created, **kwargs):
+    """Ürün katsayıları değiştiğinde ürünü kullanan yıllık kayıtları güncelle"""
+    from .hesaplama import yillik_ozetleri_guncelle
+
+    if created:
+        return
+    yillik_ozetleri_guncelle(
+        YillikGenelSuTuketimi.objects.filter(urun_detaylari__urun=instance).distinct()
+    )
+
+
+@receiver(post_save, sender=KanalAbak)
+@receiver(post_delete, sender=KanalAbak)
+def kanal_abak_onbellegini_temizle(sender, instance, origin=None, **kwargs):
+    """
+    Kanal abağı değiştiğinde abak sürümünü artır ve süreç içi önbelleği temizle
+
+    Diğer süreçlerdeki önbellekler sürüm değişikliğini bir sonraki okumada görür.
+    """
+    from .abak import kanal_abaklari
+    if not _kaskad_silme_mi(sender, origin):
+        Kanal.objects.filter(pk=instance.kanal_id).update(abak_surumu=models.F('abak_surumu') + 1)
+    kanal_abaklari.temizle(instance.kanal_id)
+
+
+@receiver(post_save, sender=DepolamaTesisiAbak)
+@receiver(post_delete, sender=DepolamaTesisiAbak)
+def depolama_abak_onbellegini_temizle(sender, instance, origin=None, **kwargs):
+    """Depolama tesisi abağı değiştiğinde abak sürümünü artır ve süreç içi önbelleği temizle"""
+    from .abak import depolama_abaklari
+    if not _kaskad_silme_mi(sender, origin):
+        DepolamaTesisi.objects.filter(pk=instance.depolama_tesisi_id).update(abak_surumu=models.F('abak_surumu') + 1)
+    depolama_abaklari.temizle(instance.depolama_tesisi_id)
+
+
+# Signal'ler - Dashboard önbelleği için sulama veri sürümünü artır
+# (toplu yüklemeler ve özet güncellemeleri sürümü kendileri artırır)
+
+def _kaskad_silme_mi(sender, origin):
+    """Silme başka bir modelin silinmesinden (cascade) mi geliyor"""
+    return origin is not None and not (isinstance(origin, sender) or getattr(origin, 'model', None) is sender)
+
+
+def _toplu_silmede_ilk_mi(origin, anahtar):
+    """QuerySet.delete() ile silinen satırlarda aynı üst kayıt için sürüm bir kez artırılır"""
+    if not isinstance(origin, models.QuerySet):
+        return True
+    islenenler = origin.__dict__.setdefault('_surumu_artirilanlar', set())
+    if anahtar in islenenler:
+        return False
+    islenenler.add(anahtar)
+    return True
+
+
+def _kayit_surumunu_artir(sender, instance, alan, sulama_yolu, origin=None):
+    """
+    instance.<alan> üzerinden bağlı olduğu sulamanın sürümünü artır
+
+    Cascade silmelerde atlanır; sürüm silinen üst kaydın kendi signal'inde bir kez artar
+    (Sulama her durumda artırır). Böylece silinen her alt satır için sorgu yapılmaz.
+    """
+    if _kaskad_silme_mi(sender, origin):
+        return
+    if not _toplu_silmede_ilk_mi(origin, getattr(instance, instance._meta.get_field(alan).attname)):
+        return
+    SulamaVeriSurumu.artir([_iliskili_sulama_id(instance, alan, sulama_yolu)])
+
+
+def _iliskili_sulama_id(instance, alan, sulama_yolu):
+    """instance.<alan> üzerinden sulama_id - ilişki yüklenmemişse tek değer sorgusu"""
+    iliski = instance._meta.get_field(alan)
+    if iliski.is_cached(instance):
+        hedef = getattr(instance, alan)
+        for parca in sulama_yolu.split('__')[:-1]:
+            hedef = getattr(hedef, parca)
+        return getattr(hedef, sulama_yolu.split('__')[-1])
+    return iliski.related_model.objects.filter(
+        pk=getattr(instance, iliski.attname)
+    ).values_list(sulama_yolu, flat=True).first()
+
+
+@receiver(post_save, sender=GunlukSebekeyeAlinanSuMiktari)
+@receiver(post_delete, sender=GunlukSebekeyeAlinanSuMiktari)
+def sebeke_su_veri_surumunu_artir(sender, instance, origin=None, **kwargs):
+    _kayit_surumunu_artir(sender, instance, 'kanal', 'depolama_tesisi__sulama_id', origin)
+
+
+# Signal'ler - Aylık kanal su özetini güncel tut (toplu yüklemeler özeti kendileri yeniler)
+
+@receiver(pre_save, sender=GunlukSebekeyeAlinanSuMiktari)
+def sebeke_su_eski_ozet_anahtarini_sakla(sender, instance, raw=False, **kwargs):
+    """Güncellemede kanal veya tarih değişirse eski ayın özeti de yenilenmeli"""
+    instance._eski_ozet_anahtari = None
+    if instance.pk and not raw:
+        eski = sender.objects.filter(pk=instance.pk).values_list('kanal_id', 'tarih').first()
+        if eski is not None:
+            instance._eski_ozet_anahtari = (eski[0], eski[1].year, eski[1].month)
+
+
+@receiver(post_save, sender=GunlukSebekeyeAlinanSuMiktari)
+@receiver(post_delete, sender=GunlukSebekeyeAlinanSuMiktari)
+def sebeke_su_aylik_ozetini_yenile(sender, instance, origin=None, **kwargs):
+    from .aylik_ozet import aylik_ozetleri_yenile
+
+    # Kanal/tesis/sulama siliniyorsa (cascade) özet satırları da cascade ile silinir
+    if _kaskad_silme_mi(sender, origin):
+        return
+    tarih = instance.tarih
+    if isinstance(tarih, str):
+        tarih = date.fromisoformat(tarih)
+    anahtarlar = [(instance.kanal_id, tarih.year, tarih.month)]
+    if getattr(instance, '_eski_ozet_anahtari', None):
+        anahtarlar.append(instance._eski_ozet_anahtari)
+    aylik_ozetleri_yenile(anahtarlar)
+
+
+@receiver(post_save, sender=GunlukDepolamaTesisiSuMiktari)
+@receiver(post_delete, sender=GunlukDepolamaTesisiSuMiktari)
+def depolama_su_veri_surumunu_artir(sender, instance, origin=None, **kwargs):
+    _kayit_surumunu_artir(sender, instance, 'depolama_tesisi', 'sulama_id', origin)
+
+
+@receiver(post_save, sender=YillikUrunDetay)
+@receiver(post_delete, sender=YillikUrunDetay)
+def urun_detayi_veri_surumunu_artir(sender, instance, origin=None, **kwargs):
+    _kayit_surumunu_artir(sender, instance, 'yillik_tuketim', 'sulama_id', origin)
+
+
+@receiver(post_save, sender=YillikGenelSuTuketimi)
+@receiver(post_delete, sender=YillikGenelSuTuketimi)
+@receiver(post_save, sender=Urun)
+@receiver(post_delete, sender=Urun)
+@receiver(post_save, sender=DepolamaTesisi)
+@receiver(post_delete, sender=DepolamaTesisi)
+def sulama_veri_surumunu_artir(sender, instance, origin=None, **kwargs):
+    if _kaskad_silme_mi(sender, origin) or not _toplu_silmede_ilk_mi(origin, instance.sulama_id):
+        return
+    SulamaVeriSurumu.artir([instance.sulama_id])
+
+
+# Liste endpoint'lerinin ETag'leri de aynı sürümden üretilir - tanım verileri de sürümü artırır
+
+@receiver(post_save, sender=Sulama)
+@receiver(post_delete, sender=Sulama)
+def sulama_kaydi_veri_surumunu_artir(sender, instance, **kwargs):
+    SulamaVeriSurumu.artir([instance.id])
+
+
+@receiver(post_save, sender=Kanal)
+@receiver(post_delete, sender=Kanal)
+def kanal_veri_surumunu_artir(sender, instance, origin=None, **kwargs):
+    _kayit_surumunu_artir(sender, instance, 'depolama_tesisi', 'sulama_id', origin)
+
+
+@receiver(m2m_changed, sender=Urun.kategori.through)
+def urun_kategorileri_veri_surumunu_artir(sender, instance, action, pk_set=None, **kwargs):
+    if isinstance(instance, Urun):
+        if action.startswith('post_'):
+            SulamaVeriSurumu.artir([instance.sulama_id])
+    elif action == 'pre_clear':
+        # Kategori tarafından temizlemede pk_set gelmez - ürünler temizlenmeden okunur
+        SulamaVeriSurumu.artir(instance.urunler.values_list('sulama_id', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        SulamaVeriSurumu.artir(Urun.objects.filter(pk__in=pk_set).values_list('sulama_id', flat=True))
+
+
+@receiver(post_save, sender=Bolge)
+def bolge_veri_surumunu_artir(sender, instance, created, **kwargs):
+    """Bölge adı sulama, tesis ve ürün listelerinde görünür"""
+    if not created:
+        SulamaVeriSurumu.artir(instance.sulamalar.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=UrunKategorisi)
+@receiver(pre_delete, sender=UrunKategorisi)
+def urun_kategorisi_veri_surumunu_artir(sender, instance, **kwargs):
+    """Kategori adı ürün listesinde görünür (silinirken ilişki kaybolmadan önce)"""
+    if kwargs.get('created'):
+        return
+    SulamaVeriSurumu.artir(instance.urunler.values_list('sulama_id', flat=True))
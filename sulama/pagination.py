@@ -0,0 +1,146 @@
+"""
+Günlük zaman serisi endpoint'leri için isteğe bağlı keyset (cursor) sayfalama
+
+Sayfa, sıralama alanlarının son görülen değerlerinden (ör. tarih, baslangic_saati, id)
+sonraki satırlar olarak WHERE ile seçilir; OFFSET ve COUNT(*) kullanılmaz. İstekte
+'cursor' veya 'page_size' parametresi yoksa sayfalama yapılmaz, tüm liste döner.
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from functools import reduce
+import operator
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class ZamanSerisiCursorPagination(BasePagination):
+    """
+    Bileşik anahtarlı keyset sayfalama
+
+    Sıralama view.cursor_ordering ile belirlenir (varsayılan: -tarih, -baslangic_saati, -id)
+    ve toplam sıralama olmalıdır (son alan benzersiz olmalı). Sayfalı isteklerde
+    OrderingFilter'ın sıralaması yerine bu sıralama kullanılır.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 500
+    max_page_size = 5000
+    ordering = ('-tarih', '-baslangic_saati', '-id')
+    invalid_cursor_message = 'Geçersiz cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (self.cursor_query_param not in request.query_params
+                and self.page_size_query_param not in request.query_params):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(getattr(view, 'cursor_ordering', self.ordering))
+        self.alanlar = [queryset.model._meta.get_field(alan.lstrip('-')) for alan in self.ordering]
+        konum, self.geri = self.decode_cursor(request)
+
+        siralama = self.ordering if not self.geri else tuple(self._ters(alan) for alan in self.ordering)
+        queryset = queryset.order_by(*siralama)
+        if konum is not None:
+            queryset = queryset.filter(self._sonrasi(siralama, konum))
+
+        # Bir fazla satır okunarak sonraki sayfa olup olmadığı anlaşılır
+        sonuclar = list(queryset[:self.page_size + 1])
+        self.devami_var = len(sonuclar) > self.page_size
+        sonuclar = sonuclar[:self.page_size]
+        if self.geri:
+            sonuclar.reverse()
+
+        self.ilk_konum = self._konum(sonuclar[0]) if sonuclar else konum
+        self.son_konum = self._konum(sonuclar[-1]) if sonuclar else konum
+        # Başlangıç konumu verilmişse o yönde önceki satırlar vardır
+        self.onceki_var = konum is not None
+        return sonuclar
+
+    def get_page_size(self, request):
+        try:
+            boyut = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(boyut, self.max_page_size))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        ileride_var = self.onceki_var if self.geri else self.devami_var
+        if not ileride_var or self.son_konum is None:
+            return None
+        return self.encode_cursor(self.son_konum, geri=False)
+
+    def get_previous_link(self):
+        geride_var = self.devami_var if self.geri else self.onceki_var
+        if not geride_var or self.ilk_konum is None:
+            return None
+        return self.encode_cursor(self.ilk_konum, geri=True)
+
+    def decode_cursor(self, request):
+        """Cursor parametresinden (konum, geri) çiftini çöz"""
+        kodlu = request.query_params.get(self.cursor_query_param)
+        if not kodlu:
+            return None, False
+        try:
+            veri = json.loads(urlsafe_b64decode(kodlu.encode('ascii')).decode('utf-8'))
+            degerler = veri['p']
+            if len(degerler) != len(self.alanlar):
+                raise ValueError
+            konum = [alan.to_python(deger) for alan, deger in zip(self.alanlar, degerler)]
+            return konum, bool(veri.get('r'))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, konum, geri):
+        # Tarih/saat değerleri ISO biçiminde saklanır, çözülürken alanın to_python'u ile geri çevrilir
+        veri = {'p': [deger.isoformat() if hasattr(deger, 'isoformat') else deger for deger in konum]}
+        if geri:
+            veri['r'] = 1
+        kodlu = urlsafe_b64encode(json.dumps(veri, separators=(',', ':')).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, kodlu)
+
+    def _konum(self, nesne):
+        return [getattr(nesne, alan.attname) for alan in self.alanlar]
+
+    @staticmethod
+    def _ters(alan):
+        return alan[1:] if alan.startswith('-') else f'-{alan}'
+
+    @staticmethod
+    def _sonrasi(siralama, konum):
+        """
+        Sıralamada konumdan sonra gelen satırlar için WHERE koşulu
+
+        (a, b, c) > (x, y, z)  ==  a > x  OR  (a = x AND b > y)  OR  (a = x AND b = y AND c > z)
+        Azalan alanlarda > yerine < kullanılır.
+        """
+        kosullar = []
+        for i, alan in enumerate(siralama):
+            ad = alan.lstrip('-')
+            esitler = {siralama[j].lstrip('-'): konum[j] for j in range(i)}
+            karsilastirma = 'lt' if alan.startswith('-') else 'gt'
+            kosullar.append(Q(**esitler, **{f'{ad}__{karsilastirma}': konum[i]}))
+        return reduce(operator.or_, kosullar)
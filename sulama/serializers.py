@@ -1,9 +1,24 @@
+import numpy as np
+from django.db import models
 from rest_framework import serializers
 from .models import (
     Bolge, Sulama, DepolamaTesisi, Kanal, 
     GunlukSebekeyeAlinanSuMiktari, GunlukDepolamaTesisiSuMiktari,
-    UrunKategorisi, Urun, YillikGenelSuTuketimi, YillikUrunDetay
+    UrunKategorisi, Urun, YillikGenelSuTuketimi, YillikUrunDetay, ArkaPlanIsi
 )
+from .abak import kanal_abaklari
+
+
+def _sayi(obj, annotation, iliski):
+    """
+    ViewSet'in eklediği sayım annotation'ını döndür
+
+    Annotation yoksa (tekil nesne, create/update yanıtı) ilişkideki kayıtlar sayılır.
+    """
+    deger = getattr(obj, annotation, None)
+    if deger is None:
+        deger = getattr(obj, iliski).count()
+    return deger
 
 
 class BolgeSerializer(serializers.ModelSerializer):
@@ -16,7 +31,7 @@ class BolgeSerializer(serializers.ModelSerializer):
         read_only_fields = ['olusturma_tarihi']
     
     def get_sulama_sayisi(self, obj):
-        return obj.sulamalar.count()
+        return _sayi(obj, 'sulama_sayisi', 'sulamalar')
 
 
 class SulamaSerializer(serializers.ModelSerializer):
@@ -34,10 +49,10 @@ class SulamaSerializer(serializers.ModelSerializer):
         read_only_fields = ['olusturma_tarihi']
     
     def get_depolama_tesisi_sayisi(self, obj):
-        return obj.depolama_tesisleri.count()
+        return _sayi(obj, 'depolama_tesisi_sayisi', 'depolama_tesisleri')
     
     def get_urun_sayisi(self, obj):
-        return obj.urunler.count()
+        return _sayi(obj, 'urun_sayisi', 'urunler')
 
 
 class DepolamaTesisiSerializer(serializers.ModelSerializer):
@@ -56,7 +71,7 @@ class DepolamaTesisiSerializer(serializers.ModelSerializer):
         read_only_fields = ['olusturma_tarihi']
     
     def get_kanal_sayisi(self, obj):
-        return obj.kanallar.count()
+        return _sayi(obj, 'kanal_sayisi', 'kanallar')
 
 
 class KanalSerializer(serializers.ModelSerializer):
@@ -74,7 +89,23 @@ class KanalSerializer(serializers.ModelSerializer):
         read_only_fields = ['kanal_kodu', 'olusturma_tarihi']
     
     def get_gunluk_veri_sayisi(self, obj):
-        return obj.gunluk_su_miktarlari.count()
+        return _sayi(obj, 'gunluk_veri_sayisi', 'gunluk_su_miktarlari')
+
+
+class GunlukSebekeyeAlinanSuMiktariListSerializer(serializers.ListSerializer):
+    """Listedeki tüm ölçümlerin hesaplanan su miktarlarını tek seferde hesaplar"""
+
+    def to_representation(self, data):
+        kayitlar = list(data.all() if isinstance(data, models.Manager) else data)
+        if 'hesaplanan_su_miktari' in self.child.fields and kayitlar:
+            hacimler = kanal_abaklari.toplu_hacim_bul(
+                [kayit.kanal_id for kayit in kayitlar],
+                [kayit.yukseklik if kayit.yukseklik is not None else np.nan for kayit in kayitlar],
+            )
+            for kayit, hacim in zip(kayitlar, hacimler):
+                # Model.hesapla_su_miktari ile aynı: yükseklik yoksa veya abakta bulunamazsa 0
+                kayit.hesaplanan_su_miktari = float(hacim) if kayit.yukseklik and not np.isnan(hacim) else 0
+        return super().to_representation(kayitlar)
 
 
 class GunlukSebekeyeAlinanSuMiktariSerializer(serializers.ModelSerializer):
@@ -92,6 +123,15 @@ class GunlukSebekeyeAlinanSuMiktariSerializer(serializers.ModelSerializer):
             'tarih', 'baslangic_saati', 'bitis_saati', 'yukseklik', 'su_miktari', 
             'sure_dakika', 'hesaplanan_su_miktari'
         ]
+        list_serializer_class = GunlukSebekeyeAlinanSuMiktariListSerializer
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # ?hesaplanan=false ile abaktan hesaplanan su miktarı alanı hiç hesaplanmaz
+        request = self.context.get('request')
+        hesaplanan = getattr(request, 'query_params', {}).get('hesaplanan', '')
+        if str(hesaplanan).lower() in ('0', 'false', 'hayir', 'hayır'):
+            self.fields.pop('hesaplanan_su_miktari', None)
     
     def get_sure_dakika(self, obj):
         if obj.baslangic_saati and obj.bitis_saati:
@@ -100,20 +140,21 @@ class GunlukSebekeyeAlinanSuMiktariSerializer(serializers.ModelSerializer):
         return None
     
     def get_hesaplanan_su_miktari(self, obj):
-        """Yükseklik değerine göre hesaplanan su miktarını döndür"""
-        return obj.hesapla_su_miktari()
+        """Yükseklik değerine göre hesaplanan su miktarını döndür (listede toplu hesaplanmış olabilir)"""
+        hesaplanan = getattr(obj, 'hesaplanan_su_miktari', None)
+        if hesaplanan is None:
+            hesaplanan = obj.hesapla_su_miktari()
+        return hesaplanan
     
     def validate(self, attrs):
         if attrs.get('baslangic_saati') and attrs.get('bitis_saati'):
             if attrs['baslangic_saati'] >= attrs['bitis_saati']:
                 raise serializers.ValidationError("Başlangıç saati bitiş saatinden önce olmalıdır.")
         
-        # Yükseklik kontrolü - abakta var mı?
+        # Yükseklik kontrolü - abak aralığında mı?
         if attrs.get('yukseklik') and attrs.get('kanal'):
-            from .models import KanalAbak
-            try:
-                KanalAbak.objects.get(kanal=attrs['kanal'], yukseklik=attrs['yukseklik'])
-            except KanalAbak.DoesNotExist:
+            egri = kanal_abaklari.egri(attrs['kanal'].id)
+            if not egri.kapsar(attrs['yukseklik']):
                 raise serializers.ValidationError({
                     'yukseklik': f"Bu kanal için {attrs['yukseklik']} m yükseklik değeri abakta bulunamadı."
                 })
@@ -164,7 +205,7 @@ class UrunKategorisiSerializer(serializers.ModelSerializer):
         read_only_fields = ['olusturma_tarihi']
     
     def get_urun_sayisi(self, obj):
-        return obj.urunler.count()
+        return _sayi(obj, 'urun_sayisi', 'urunler')
 
 
 class UrunSerializer(serializers.ModelSerializer):
@@ -194,7 +235,7 @@ class UrunSerializer(serializers.ModelSerializer):
         return [k.isim for k in obj.kategori.all()]
     
     def get_yillik_tuketim_sayisi(self, obj):
-        return obj.yillik_urun_detaylari.count()
+        return _sayi(obj, 'yillik_tuketim_sayisi', 'yillik_urun_detaylari')
     
     def get_aylik_katsayilar(self, obj):
         aylar = [
@@ -273,13 +314,14 @@ class YillikGenelSuTuketimiSerializer(serializers.ModelSerializer):
     toplam_randi = serializers.SerializerMethodField()
     net_su_ihtiyaci = serializers.SerializerMethodField()
     birim_su_tuketimi = serializers.SerializerMethodField()
+    aylik_su_ihtiyaci = serializers.SerializerMethodField()
     
     class Meta:
         model = YillikGenelSuTuketimi
         fields = [
             'id', 'yil', 'sulama', 'sulama_isim', 'bolge_isim', 'kurumAdi',
             'ciftlik_randi', 'iletim_randi', 'toplam_randi',
-            'net_su_ihtiyaci', 'birim_su_tuketimi', 'urun_detaylari', 
+            'net_su_ihtiyaci', 'birim_su_tuketimi', 'aylik_su_ihtiyaci', 'urun_detaylari', 
             'olusturma_tarihi'
         ]
         read_only_fields = ['olusturma_tarihi']
@@ -296,10 +338,21 @@ class YillikGenelSuTuketimiSerializer(serializers.ModelSerializer):
             return round(obj.get_toplam_su_tuketimi() / toplam_alan, 4)
         return None
     
+    def get_aylik_su_ihtiyaci(self, obj):
+        """Aylık net, çiftlik ve brüt su ihtiyaçları (hm³) - saklanan özet değerler"""
+        return {
+            'net_su_aylik': obj.net_su_aylik,
+            'ciftlik_su_aylik': obj.ciftlik_su_aylik,
+            'brut_su_aylik': obj.brut_su_aylik,
+            'net_su_toplam': obj.net_su_toplam,
+            'ciftlik_su_toplam': obj.ciftlik_su_toplam,
+            'brut_su_toplam': obj.brut_su_toplam,
+        }
+    
     def get_urun_detaylari(self, obj):
         """Bu yıla ait tüm ürün detaylarını döndür"""
-        detaylar = obj.urun_detaylari.all().select_related('urun')
-        return YillikUrunDetaySerializer(detaylar, many=True).data
+        # .all() ViewSet'in prefetch ettiği urun_detaylari__urun satırlarını kullanır, ek sorgu yapılmaz
+        return YillikUrunDetaySerializer(obj.urun_detaylari.all(), many=True).data
 
 
 # Özet serializer'lar
@@ -327,4 +380,20 @@ class UrunOzetSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Urun
-        fields = ['id', 'isim', 'sulama_isim'] 
\ No newline at end of file
+        fields = ['id', 'isim', 'sulama_isim'] 
+
+class ArkaPlanIsiSerializer(serializers.ModelSerializer):
+    """Arka plan işi durum serializer"""
+    durum_display = serializers.CharField(source='get_durum_display', read_only=True)
+    dosya_var = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ArkaPlanIsi
+        fields = [
+            'id', 'tur', 'durum', 'durum_display', 'ilerleme', 'ilerleme_mesaji',
+            'sonuc', 'hata', 'dosya_var', 'olusturma_tarihi', 'baslama_tarihi', 'bitis_tarihi'
+        ]
+        read_only_fields = fields
+
+    def get_dosya_var(self, obj):
+        return bool(obj.sonuc_dosyasi)
@@ -0,0 +1,1582 @@
+import json
+import os
+import signal
+import tempfile
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from openpyxl import load_workbook
+from prometheus_client import REGISTRY
+
+from authentication.models import KullaniciSulamaYetkisi
+from .. import excel
+from ..abak import AbakEgrisi, kanal_abaklari, depolama_abaklari
+from ..bolumleme import bolumlemeyi_kaldir, bolumlu_mu, tabloyu_bolumle, yil_bolumleri
+from ..hesaplama import SuIhtiyaciMotoru
+from ..isler import calisan_nabzi, isi_kuyruga_geri_al, isi_yurut, siradaki_isi_al, yarim_kalan_isleri_isaretle
+from ..management.commands.isleri_calistir import Command as IsleriCalistirKomutu
+from ..models import (
+    ArkaPlanIsi, AylikKanalSuOzeti, Sulama, DepolamaTesisi, Kanal, KanalAbak, GunlukDepolamaTesisiSuMiktari,
+    GunlukSebekeyeAlinanSuMiktari, SulamaVeriSurumu, Urun, UrunKategorisi, YillikGenelSuTuketimi, YillikUrunDetay
+)
+from .yardimci import GeciciSablonMixin, SulamaTestCase
+
+
+@override_settings(DASHBOARD_BAYAT_SURESI=0)
+class DashboardAylikSuKullanimiTests(SulamaTestCase):
+    """Dashboard aylık su kullanımı endpoint testleri"""
+
+    url = '/sulama/dashboard/aylik_su_kullanimi/'
+    zincir = 'sulama'
+
+    def _depolama_verisi_olustur(self, tesis_sayisi, ay_sayisi, yil=2024):
+        """Her tesis için her ayın 10. ve 20. gününe kayıt oluştur"""
+        mevcut = DepolamaTesisi.objects.count()
+        for t in range(mevcut, mevcut + tesis_sayisi):
+            tesis = DepolamaTesisi.objects.create(sulama=self.sulama, isim=f'Tesis {t}')
+            for ay in range(1, ay_sayisi + 1):
+                GunlukDepolamaTesisiSuMiktari.objects.create(
+                    depolama_tesisi=tesis, tarih=date(yil, ay, 10), kot=100, su_miktari=1000
+                )
+                GunlukDepolamaTesisiSuMiktari.objects.create(
+                    depolama_tesisi=tesis, tarih=date(yil, ay, 20), kot=101, su_miktari=ay * 100
+                )
+
+    def _sorgu_sayisi(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, {'yil': 2024})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.data
+
+    def test_ayin_son_kaydi_toplanir(self):
+        self._depolama_verisi_olustur(tesis_sayisi=3, ay_sayisi=2)
+        _, data = self._sorgu_sayisi()
+
+        aylik = {veri['ay_no']: veri for veri in data['aylik_veriler']}
+        self.assertEqual(aylik[1]['depolama_su'], 300.0)
+        self.assertEqual(aylik[1]['depolama_kayit_sayisi'], 3)
+        self.assertEqual(aylik[2]['depolama_su'], 600.0)
+        self.assertEqual(aylik[3]['depolama_su'], 0)
+
+    def test_sorgu_sayisi_tesis_ve_ay_sayisindan_bagimsiz(self):
+        self._depolama_verisi_olustur(tesis_sayisi=1, ay_sayisi=1)
+        az_veri_sorgu, _ = self._sorgu_sayisi()
+
+        self._depolama_verisi_olustur(tesis_sayisi=5, ay_sayisi=12)
+        cok_veri_sorgu, _ = self._sorgu_sayisi()
+
+        self.assertEqual(az_veri_sorgu, cok_veri_sorgu)
+        # Veri sürümü + şebeke, depolama ve tüketim sorguları
+        self.assertEqual(cok_veri_sorgu, 4)
+
+
+class SuIhtiyaciMotoruTabloTests(SimpleTestCase):
+    """Frontend tablo verisinden su ihtiyacı hesaplama testleri"""
+
+    def test_net_ciftlik_brut_formulleri(self):
+        tablo = [
+            {'ekim_alani': '100', 'ekim_orani': '50', 'ur_values': [0, 0, 0, 100, 200] + [0] * 7},
+            {'ekim_alani': '', 'ekim_orani': '0', 'ur_values': [''] * 12},
+        ]
+        sonuc = SuIhtiyaciMotoru.from_tablo(tablo, 80, 50).sonuc()
+
+        self.assertAlmostEqual(sonuc['net_su_aylik'][3], 100 * 100 / 100000)
+        self.assertAlmostEqual(sonuc['net_su_toplam'], 100 * 300 / 100000)
+        self.assertAlmostEqual(sonuc['ciftlik_su_toplam'], sonuc['net_su_toplam'] * 100 / 80)
+        self.assertAlmostEqual(sonuc['brut_su_toplam'], sonuc['ciftlik_su_toplam'] * 100 / 50)
+
+    def test_net_su_toplam_alanla_olceklenir(self):
+        # hesaplama_duzeltme.py'deki alan payı formülü iki durumda da 0.1 hm³ verirdi
+        for alan, beklenen in ((100, 0.1), (200, 0.2)):
+            tablo = [{'ekim_alani': alan, 'ekim_orani': 100, 'ur_values': [100] + [0] * 11}]
+            sonuc = SuIhtiyaciMotoru.from_tablo(tablo, 100, 100).sonuc()
+            self.assertAlmostEqual(sonuc['net_su_toplam'], beklenen)
+
+
+class SuIhtiyaciMotoruTests(SulamaTestCase):
+    """Yıllık tüketim kayıtlarından su ihtiyacı hesaplama testleri"""
+
+    zincir = 'sulama'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.misir = Urun.objects.create(sulama=cls.sulama, isim='Mısır', haziran=120, temmuz=200)
+        cls.bugday = Urun.objects.create(sulama=cls.sulama, isim='Buğday', nisan=50)
+        cls.kayit1 = YillikGenelSuTuketimi.objects.create(yil=2024, sulama=cls.sulama)
+        cls.kayit2 = YillikGenelSuTuketimi.objects.create(
+            yil=2025, sulama=cls.sulama, ciftlik_randi=50, iletim_randi=100
+        )
+        YillikUrunDetay.objects.create(yillik_tuketim=cls.kayit1, urun=cls.misir, alan=200, su_tuketimi=0)
+        YillikUrunDetay.objects.create(yillik_tuketim=cls.kayit1, urun=cls.bugday, alan=100, su_tuketimi=0)
+        YillikUrunDetay.objects.create(yillik_tuketim=cls.kayit2, urun=cls.misir, alan=10, su_tuketimi=0)
+
+    def test_queryset_ve_instance_sonuclari_ayni(self):
+        qs = YillikGenelSuTuketimi.objects.filter(sulama=self.sulama)
+        with self.assertNumQueries(2):
+            motor = SuIhtiyaciMotoru.from_queryset(qs)
+        motor2 = SuIhtiyaciMotoru.from_instances(qs.prefetch_related('urun_detaylari__urun'))
+
+        for kayit in (self.kayit1, self.kayit2):
+            self.assertEqual(motor.sonuc(kayit.id), motor2.sonuc(kayit.id))
+
+        sonuc1 = motor.sonuc(self.kayit1.id)
+        self.assertAlmostEqual(sonuc1['net_su_aylik'][3], 100 * 50 / 100000)
+        self.assertAlmostEqual(sonuc1['net_su_aylik'][6], 200 * 200 / 100000)
+        self.assertAlmostEqual(sonuc1['brut_su_toplam'], sonuc1['net_su_toplam'] * 100 / 80 * 100 / 85)
+
+        sonuc2 = motor.sonuc(self.kayit2.id)
+        self.assertAlmostEqual(sonuc2['ciftlik_su_toplam'], sonuc2['net_su_toplam'] * 2)
+
+
+class YillikOzetGuncellemeTests(SulamaTestCase):
+    """Yıllık tüketim kayıtlarında saklanan özet değerlerin güncel tutulması"""
+
+    zincir = 'sulama'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.misir = Urun.objects.create(sulama=cls.sulama, isim='Mısır', temmuz=200)
+        cls.bugday = Urun.objects.create(sulama=cls.sulama, isim='Buğday', nisan=50)
+
+    def setUp(self):
+        super().setUp()
+        self.kayit = YillikGenelSuTuketimi.objects.create(yil=2024, sulama=self.sulama)
+
+    def test_detay_kaydedilince_ve_silinince_guncellenir(self):
+        detay = YillikUrunDetay.objects.create(
+            yillik_tuketim=self.kayit, urun=self.misir, alan=100, su_tuketimi=5000
+        )
+        self.kayit.refresh_from_db()
+        self.assertEqual(self.kayit.toplam_alan, 100)
+        self.assertEqual(self.kayit.toplam_su_tuketimi, 5000)
+        self.assertEqual(self.kayit.urun_sayisi, 1)
+        self.assertAlmostEqual(self.kayit.net_su_aylik[6], 100 * 200 / 100000)
+
+        detay.delete()
+        self.kayit.refresh_from_db()
+        self.assertEqual(self.kayit.urun_sayisi, 0)
+        self.assertEqual(self.kayit.net_su_toplam, 0)
+
+    def test_bulk_create_ve_urun_katsayisi_degisimi(self):
+        YillikUrunDetay.objects.bulk_create([
+            YillikUrunDetay(yillik_tuketim=self.kayit, urun=self.misir, alan=100, su_tuketimi=0),
+            YillikUrunDetay(yillik_tuketim=self.kayit, urun=self.bugday, alan=50, su_tuketimi=0),
+        ])
+        self.kayit.refresh_from_db()
+        self.assertEqual(self.kayit.toplam_alan, 150)
+        self.assertEqual(self.kayit.urun_sayisi, 2)
+
+        self.bugday.nisan = 100
+        self.bugday.save()
+        self.kayit.refresh_from_db()
+        self.assertAlmostEqual(self.kayit.net_su_aylik[3], 50 * 100 / 100000)
+
+    def test_randi_degisimi_brut_ihtiyaci_gunceller(self):
+        YillikUrunDetay.objects.create(yillik_tuketim=self.kayit, urun=self.misir, alan=100, su_tuketimi=0)
+        self.kayit.ciftlik_randi = 50
+        self.kayit.iletim_randi = 50
+        self.kayit.save()
+        self.kayit.refresh_from_db()
+        self.assertAlmostEqual(self.kayit.brut_su_toplam, self.kayit.net_su_toplam * 4)
+
+
+class YillikTuketimOzetEndpointTests(SulamaTestCase):
+    """yil_ozeti ve karsilastirma endpoint testleri"""
+
+    zincir = 'bolge'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for s in range(3):
+            sulama = Sulama.objects.create(bolge=cls.bolge, isim=f'Sulama {s}')
+            urun = Urun.objects.create(sulama=sulama, isim='Mısır', temmuz=200)
+            for yil in (2022, 2023, 2024):
+                kayit = YillikGenelSuTuketimi.objects.create(yil=yil, sulama=sulama)
+                YillikUrunDetay.objects.create(
+                    yillik_tuketim=kayit, urun=urun, alan=100 * (yil - 2021), su_tuketimi=1000
+                )
+
+    def test_yil_ozeti(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/sulama/yillik-tuketim/yil_ozeti/', {'yil': 2023})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['genel_ozet']['toplam_alan'], 600)
+        self.assertEqual(response.data['genel_ozet']['toplam_tuketim'], 3000)
+        self.assertEqual(response.data['genel_ozet']['kayit_sayisi'], 3)
+        self.assertEqual(len(response.data['sulama_ozeti']), 3)
+        self.assertEqual(response.data['sulama_ozeti'][0]['urun_sayisi'], 1)
+
+    def test_karsilastirma_iki_yil(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/sulama/yillik-tuketim/karsilastirma/', {'yil1': 2022, 'yil2': 2024})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['2022_veriler']['toplam_alan'], 300)
+        self.assertEqual(response.data['2024_veriler']['toplam_alan'], 900)
+        self.assertEqual(response.data['degisim_oranlari']['toplam_alan'], 200.0)
+
+    def test_karsilastirma_yil_araligi(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                '/sulama/yillik-tuketim/karsilastirma/', {'baslangic_yil': 2022, 'bitis_yil': 2024}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['yillar'], [2022, 2023, 2024])
+        self.assertEqual(len(response.data['yillik_degisim_oranlari']), 2)
+        self.assertEqual(len(response.data['sulama_karsilastirmasi']), 3)
+        self.assertEqual(response.data['sulama_karsilastirmasi'][0]['yillar'][2023]['toplam_alan'], 200)
+
+    def test_karsilastirma_tek_yil_hatali(self):
+        response = self.client.get('/sulama/yillik-tuketim/karsilastirma/', {'yillar': '2022'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_karsilastirma_buyuk_aralik_liste_olusturmadan_reddedilir(self):
+        url = '/sulama/yillik-tuketim/karsilastirma/'
+        with mock.patch('sulama.views.range', side_effect=AssertionError, create=True), self.assertNumQueries(0):
+            response = self.client.get(url, {'baslangic_yil': 0, 'bitis_yil': 1000000000})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('En fazla', response.data['error'])
+
+        response = self.client.get(url, {'yillar': ','.join(['2024'] * 1000)})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('En fazla', response.data['error'])
+
+
+class AbakEgrisiTests(SimpleTestCase):
+    """Abak eğrisi arama ve interpolasyon testleri"""
+
+    def setUp(self):
+        self.egri = AbakEgrisi([0.5, 1.0, 2.0], [100, 200, 600])
+
+    def test_tam_eslesme(self):
+        self.assertEqual(self.egri.hacim_bul(1.0), 200)
+        self.assertEqual(self.egri.hacim_bul(2.0, interpolasyon=False), 600)
+
+    def test_interpolasyon(self):
+        self.assertAlmostEqual(self.egri.hacim_bul(1.5), 400)
+        self.assertIsNone(self.egri.hacim_bul(1.5, interpolasyon=False))
+
+    def test_aralik_disi(self):
+        self.assertIsNone(self.egri.hacim_bul(0.1))
+        self.assertIsNone(self.egri.hacim_bul(2.5))
+        self.assertIsNone(AbakEgrisi([], []).hacim_bul(1.0))
+
+
+class KanalAbakOnbellegiTests(SulamaTestCase):
+    """Kanal abak önbelleğinin yüklenmesi ve temizlenmesi"""
+
+    def _abak_sorgulari(self, sorgular):
+        return [sorgu for sorgu in sorgular.captured_queries if 'sulama_kanalabak' in sorgu['sql']]
+
+    def test_egri_bir_kez_yuklenir(self):
+        with CaptureQueriesContext(connection) as sorgular:
+            kanal_abaklari.hacim_bul(self.kanal.id, 1.0)
+            kanal_abaklari.hacim_bul(self.kanal.id, 1.5)
+        # Her okumada sadece kanal sürümü sorgulanır, abak satırları bir kez
+        self.assertEqual(len(sorgular.captured_queries), 3)
+        self.assertEqual(len(self._abak_sorgulari(sorgular)), 1)
+
+    def test_abak_degisince_onbellek_temizlenir(self):
+        self.assertEqual(kanal_abaklari.hacim_bul(self.kanal.id, 2.0), 200)
+        KanalAbak.objects.filter(kanal=self.kanal, yukseklik=2.0).get().delete()
+        self.assertIsNone(kanal_abaklari.hacim_bul(self.kanal.id, 2.0))
+
+    def test_baska_surecte_degisen_abak_surumden_anlasilir(self):
+        self.assertEqual(kanal_abaklari.hacim_bul(self.kanal.id, 2.0), 200)
+        # Başka bir worker'daki değişiklik: bu sürecin önbelleği temizlenmez, sadece sürüm artar
+        with mock.patch.object(kanal_abaklari, 'temizle'):
+            abak = KanalAbak.objects.get(kanal=self.kanal, yukseklik=2.0)
+            abak.hacim = 500
+            abak.save()
+
+        self.assertEqual(kanal_abaklari.hacim_bul(self.kanal.id, 2.0), 500)
+        olcum = GunlukSebekeyeAlinanSuMiktari.objects.create(
+            kanal=self.kanal, tarih=date(2024, 6, 1), yukseklik=2.0, su_miktari=0,
+            baslangic_saati='2024-06-01T08:00:00Z', bitis_saati='2024-06-01T09:00:00Z',
+        )
+        self.assertEqual(olcum.su_miktari, 500)
+
+
+class TopluHacimHesaplamaTests(SulamaTestCase):
+    """Toplu hacim hesaplama endpoint testleri"""
+
+    url = '/sulama/abak-hesaplama/toplu_hacim_hesapla/'
+    zincir = 'tesis'
+    tesis_abagi = ((800, 1000), (810, 3000))
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.kanallar = []
+        for k in range(3):
+            kanal = Kanal.objects.create(depolama_tesisi=cls.tesis, isim=f'Kanal {k}')
+            KanalAbak.objects.create(kanal=kanal, yukseklik=0, hacim=0)
+            KanalAbak.objects.create(kanal=kanal, yukseklik=1, hacim=100 * (k + 1))
+            cls.kanallar.append(kanal)
+
+    def test_sonuclar_girdi_sirasiyla_doner(self):
+        olcumler = [{'kanal': kanal.id, 'yukseklik': 0.5} for kanal in self.kanallar]
+        olcumler += [
+            {'depolama_tesisi': self.tesis.id, 'kot': 805},
+            {'kanal': self.kanallar[0].id, 'yukseklik': 5},
+            {'kanal': 999999, 'yukseklik': 1},
+            {'yukseklik': 1},
+        ]
+        # Kanal ve tesis eğrileri için birer abak sürümü ve abak satırı sorgusu
+        with self.assertNumQueries(6):
+            response = self.client.post(self.url, {'olcumler': olcumler}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        sonuclar = response.data['sonuclar']
+        self.assertEqual([sonuc['sira'] for sonuc in sonuclar], list(range(len(olcumler))))
+        self.assertEqual([sonuc['su_hacmi'] for sonuc in sonuclar[:4]], [50, 100, 150, 2000])
+        self.assertEqual(response.data['basarili_sayisi'], 4)
+        self.assertEqual(response.data['hatali_sayisi'], 3)
+
+
+class SebekeSuTopluYuklemeTests(SulamaTestCase):
+    """Şebeke su ölçümlerinin toplu içeri aktarımı"""
+
+    url = '/sulama/gunluk-sebeke-su/toplu_yukle/'
+
+    def _satir(self, gun, saat, yukseklik, **ekstra):
+        satir = {
+            'kanal': self.kanal.id,
+            'tarih': f'2024-06-{gun:02d}',
+            'baslangic_saati': f'2024-06-{gun:02d}T{saat:02d}:00:00',
+            'bitis_saati': f'2024-06-{gun:02d}T{saat + 1:02d}:00:00',
+            'yukseklik': yukseklik,
+        }
+        satir.update(ekstra)
+        return satir
+
+    def test_json_upsert_ve_satir_hatalari(self):
+        response = self.client.post(self.url, {'kayitlar': [
+            self._satir(1, 8, 1),
+            self._satir(1, 9, 0.5, su_miktari=42),
+        ]}, format='json')
+        self.assertEqual(response.data['kaydedilen'], 2)
+
+        response = self.client.post(self.url, {'kayitlar': [
+            self._satir(1, 8, 1.5),
+            self._satir(2, 8, 5),
+            self._satir(2, 9, 1, kanal=999999),
+            {'kanal': self.kanal.id, 'tarih': 'dun'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['kaydedilen'], 1)
+        self.assertEqual(response.data['hatali'], 3)
+        self.assertEqual([hata['satir'] for hata in response.data['hatalar']], [2, 3, 4])
+        self.assertIn('yukseklik', response.data['hatalar'][0]['hatalar'])
+        self.assertEqual(
+            sorted(GunlukSebekeyeAlinanSuMiktari.objects.values_list('su_miktari', flat=True)), [42, 150]
+        )
+
+    def test_abak_disi_yukseklik_su_miktari_verilse_de_reddedilir(self):
+        response = self.client.post(self.url, {'kayitlar': [
+            self._satir(4, 8, 5, su_miktari=640),
+            self._satir(4, 9, 5),
+        ]}, format='json')
+
+        self.assertEqual(response.data['kaydedilen'], 0)
+        self.assertEqual(
+            [(hata['satir'], list(hata['hatalar'])) for hata in response.data['hatalar']],
+            [(1, ['yukseklik']), (2, ['yukseklik'])]
+        )
+        self.assertFalse(GunlukSebekeyeAlinanSuMiktari.objects.exists())
+
+        # Tekil kayıt da aynı yüksekliği reddeder
+        tekil = self._satir(4, 10, 5, su_miktari=640)
+        response = self.client.post('/sulama/gunluk-sebeke-su/', tekil, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('yukseklik', response.data)
+
+    def test_csv_dosyasi(self):
+        icerik = 'kanal;tarih;baslangic_saati;bitis_saati;yukseklik\n'
+        for saat in range(3):
+            satir = self._satir(3, saat, 2)
+            icerik += ';'.join(str(satir[alan]) for alan in (
+                'kanal', 'tarih', 'baslangic_saati', 'bitis_saati', 'yukseklik'
+            )) + '\n'
+        dosya = SimpleUploadedFile('olcumler.csv', icerik.encode('utf-8'), content_type='text/csv')
+
+        response = self.client.post(self.url, {'dosya': dosya}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['kaydedilen'], 3)
+        self.assertEqual(GunlukSebekeyeAlinanSuMiktari.objects.filter(su_miktari=200).count(), 3)
+
+
+class DepolamaSuTopluYuklemeTests(SulamaTestCase):
+    """Depolama tesisi kot ölçümlerinin toplu içeri aktarımı"""
+
+    url = '/sulama/gunluk-depolama-su/toplu_yukle/'
+    zincir = 'tesis'
+    tesis_abagi = ((800, 1000), (810, 3000))
+
+    def test_endpoint_upsert(self):
+        GunlukDepolamaTesisiSuMiktari.objects.create(
+            depolama_tesisi=self.tesis, tarih=date(2024, 5, 1), kot=800, su_miktari=1000
+        )
+        kayitlar = [
+            {'depolama_tesisi': self.tesis.id, 'tarih': f'2024-05-{gun:02d}', 'kot': 805}
+            for gun in range(1, 11)
+        ]
+        kayitlar.append({'depolama_tesisi': self.tesis.id, 'tarih': '2024-05-11', 'kot': 900})
+
+        response = self.client.post(self.url, {'kayitlar': kayitlar}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['kaydedilen'], 10)
+        self.assertEqual(response.data['hatalar'], [{'satir': 11, 'hatalar': {
+            'kot': 'Bu depolama tesisi için 900.0 m kot değeri abakta bulunamadı.'
+        }}])
+        self.assertEqual(GunlukDepolamaTesisiSuMiktari.objects.count(), 10)
+        self.assertEqual(
+            set(GunlukDepolamaTesisiSuMiktari.objects.values_list('su_miktari', flat=True)), {2000}
+        )
+
+    def test_abak_disi_kot_sadece_su_miktari_ile(self):
+        response = self.client.post(self.url, {'kayitlar': [
+            {'depolama_tesisi': self.tesis.id, 'tarih': '2024-06-01', 'kot': 900, 'su_miktari': 4500},
+            {'depolama_tesisi': self.tesis.id, 'tarih': '2024-06-02', 'kot': 900},
+        ]}, format='json')
+
+        self.assertEqual(response.data['kaydedilen'], 1)
+        self.assertEqual([(hata['satir'], list(hata['hatalar'])) for hata in response.data['hatalar']], [(2, ['kot'])])
+        self.assertEqual(GunlukDepolamaTesisiSuMiktari.objects.get().su_miktari, 4500)
+
+    def test_yonetim_komutu_parcali_yazar(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as dosya:
+            dosya.write('depolama_tesisi,tarih,kot\n')
+            for gun in range(1, 6):
+                dosya.write(f'{self.tesis.id},2024-07-{gun:02d},810\n')
+            dosya.write(f'{self.tesis.id},tarih-yok,810\n')
+        self.addCleanup(os.remove, dosya.name)
+
+        cikti, hata_ciktisi = StringIO(), StringIO()
+        call_command(
+            'depolama_su_miktarlarini_yukle', dosya.name, '--batch-size', '2',
+            stdout=cikti, stderr=hata_ciktisi
+        )
+
+        self.assertIn('2/5 kayıt yazıldı', cikti.getvalue())
+        self.assertIn('5/5 kayıt yazıldı', cikti.getvalue())
+        self.assertIn('Satır 6: tarih', hata_ciktisi.getvalue())
+        self.assertEqual(GunlukDepolamaTesisiSuMiktari.objects.filter(su_miktari=3000).count(), 5)
+
+
+class YillikTuketimTopluKaydetmeTests(SulamaTestCase):
+    """Planlama tablosunun fark bazlı kaydedilmesi"""
+
+    url = '/sulama/yillik-tuketim/bulk_create/'
+    zincir = 'sulama'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.urunler = [
+            Urun.objects.create(sulama=cls.sulama, isim=f'Ürün {i}', temmuz=100 * (i + 1)) for i in range(4)
+        ]
+
+    def _kaydet(self, alanlar, ciftlik_randi=80):
+        return self.client.post(self.url, {
+            'sulama': self.sulama.id, 'yil': 2024, 'ciftlik_randi': ciftlik_randi, 'iletim_randi': 85,
+            'table_data': [
+                {'urun': self.urunler[i].id, 'ekim_alani': alan, 'ekim_orani': 100}
+                for i, alan in alanlar.items()
+            ],
+        }, format='json')
+
+    def test_sadece_degisen_satirlar_yazilir(self):
+        ilk = self._kaydet({0: 10, 1: 20, 2: 30})
+        self.assertEqual(ilk.status_code, 201)
+        detay_idleri = dict(YillikUrunDetay.objects.values_list('urun_id', 'id'))
+
+        response = self._kaydet({0: 10, 1: 25, 3: 40})
+
+        self.assertEqual(response.data['ana_kayit_id'], ilk.data['ana_kayit_id'])
+        self.assertEqual(
+            (response.data['eklenen'], response.data['guncellenen'], response.data['silinen']), (1, 1, 1)
+        )
+        yeni_idler = dict(YillikUrunDetay.objects.values_list('urun_id', 'id'))
+        self.assertEqual(yeni_idler[self.urunler[0].id], detay_idleri[self.urunler[0].id])
+        self.assertEqual(yeni_idler[self.urunler[1].id], detay_idleri[self.urunler[1].id])
+        self.assertNotIn(self.urunler[2].id, yeni_idler)
+
+        kayit = YillikGenelSuTuketimi.objects.get()
+        self.assertEqual(kayit.toplam_alan, 75)
+        self.assertEqual(kayit.urun_sayisi, 3)
+        self.assertAlmostEqual(kayit.net_su_aylik[6], (10 * 100 + 25 * 200 + 40 * 400) / 100000)
+
+    def test_ayni_tablo_tekrar_kaydedilince_yazma_yapilmaz(self):
+        self._kaydet({0: 10, 1: 20})
+        with CaptureQueriesContext(connection) as sorgular:
+            response = self._kaydet({0: 10, 1: 20})
+
+        self.assertEqual(response.status_code, 201)
+        yazma_sorgulari = [
+            sorgu['sql'] for sorgu in sorgular.captured_queries
+            if sorgu['sql'].split(' ', 1)[0] in ('INSERT', 'UPDATE', 'DELETE')
+        ]
+        self.assertEqual(yazma_sorgulari, [])
+
+    def test_randi_degisimi_ozetleri_gunceller(self):
+        self._kaydet({0: 10})
+        self._kaydet({0: 10}, ciftlik_randi=50)
+        kayit = YillikGenelSuTuketimi.objects.get()
+        self.assertEqual(kayit.ciftlik_randi, 50)
+        self.assertAlmostEqual(kayit.ciftlik_su_toplam, kayit.net_su_toplam * 2)
+
+    def test_hatali_satir_mevcut_veriyi_degistirmez(self):
+        self._kaydet({0: 10, 1: 20})
+        response = self.client.post(self.url, {
+            'sulama': self.sulama.id, 'yil': 2024, 'ciftlik_randi': 80, 'iletim_randi': 85,
+            'table_data': [{'urun': self.urunler[0].id, 'ekim_alani': 'on'}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(YillikUrunDetay.objects.count(), 2)
+
+    def test_ayni_sulama_ve_yil_icin_tek_ana_kayit(self):
+        self._kaydet({0: 10})
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            YillikGenelSuTuketimi.objects.create(sulama=self.sulama, yil=2024)
+
+        response = self.client.post('/sulama/yillik-tuketim/', {'sulama': self.sulama.id, 'yil': 2024}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(YillikGenelSuTuketimi.objects.count(), 1)
+
+
+class ListeSayimAnnotationTests(SulamaTestCase):
+    """Liste endpoint'lerinde sayıların satır başına sorgu olmadan gelmesi"""
+
+    zincir = 'bolge'
+
+    def _sulama_ekle(self):
+        sira = Sulama.objects.count()
+        sulama = Sulama.objects.create(bolge=self.bolge, isim=f'Sulama {sira}')
+        tesis = DepolamaTesisi.objects.create(sulama=sulama, isim='Tesis')
+        for k in range(2):
+            kanal = Kanal.objects.create(depolama_tesisi=tesis, isim=f'Kanal {k}')
+            GunlukSebekeyeAlinanSuMiktari.objects.bulk_create([
+                GunlukSebekeyeAlinanSuMiktari(
+                    kanal=kanal, tarih=date(2024, 1, gun), yukseklik=1, su_miktari=1,
+                    baslangic_saati=f'2024-01-{gun:02d}T08:00:00Z', bitis_saati=f'2024-01-{gun:02d}T09:00:00Z'
+                ) for gun in range(1, 4)
+            ])
+        Urun.objects.create(sulama=sulama, isim='Mısır')
+
+    def _sorgu_sayilari(self, url):
+        sayilar = []
+        for _ in range(2):
+            self._sulama_ekle()
+            with CaptureQueriesContext(connection) as sorgular:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            sayilar.append(len(sorgular))
+        return sayilar, response.data
+
+    def test_kanal_listesi(self):
+        sayilar, veri = self._sorgu_sayilari('/sulama/kanallar/')
+        self.assertEqual(sayilar[0], sayilar[1])
+        self.assertEqual({kanal['gunluk_veri_sayisi'] for kanal in veri}, {3})
+
+    def test_sulama_ve_tesis_listesi(self):
+        sayilar, veri = self._sorgu_sayilari('/sulama/sulamalar/')
+        self.assertEqual(sayilar[0], sayilar[1])
+        self.assertEqual({(s['depolama_tesisi_sayisi'], s['urun_sayisi']) for s in veri}, {(1, 1)})
+
+        sayilar, veri = self._sorgu_sayilari('/sulama/depolama-tesisleri/')
+        self.assertEqual(sayilar[0], sayilar[1])
+        self.assertEqual({tesis['kanal_sayisi'] for tesis in veri}, {2})
+
+        # Tesis ve ürün sayıları birbirini çoğaltmaz
+        sulama = Sulama.objects.order_by('id').first()
+        DepolamaTesisi.objects.create(sulama=sulama, isim='Tesis 2')
+        Urun.objects.bulk_create([Urun(sulama=sulama, isim=f'Ürün {u}') for u in range(2)])
+        veri = self.client.get(f'/sulama/sulamalar/{sulama.id}/').data
+        self.assertEqual((veri['depolama_tesisi_sayisi'], veri['urun_sayisi']), (2, 3))
+
+    def test_urun_listesi(self):
+        sayilar, veri = self._sorgu_sayilari('/sulama/urunler/')
+        self.assertEqual(sayilar[0], sayilar[1])
+        self.assertEqual({urun['yillik_tuketim_sayisi'] for urun in veri}, {0})
+
+        urun, diger = Urun.objects.order_by('id')
+        kategori = UrunKategorisi.objects.create(isim='Tahıl')
+        urun.kategori.add(kategori, UrunKategorisi.objects.create(isim='Yazlık'))
+        diger.kategori.add(kategori)
+        for yil in (2023, 2024):
+            tuketim = YillikGenelSuTuketimi.objects.create(sulama=urun.sulama, yil=yil)
+            YillikUrunDetay.objects.create(yillik_tuketim=tuketim, urun=urun, alan=10, su_tuketimi=0)
+
+        beklenen = {urun.id: 2, diger.id: 0}
+        veri = self.client.get('/sulama/urunler/').data
+        self.assertEqual({u['id']: u['yillik_tuketim_sayisi'] for u in veri}, beklenen)
+        # Kategori araması (çoklu ilişki JOIN'i) sayıları çoğaltmaz
+        veri = self.client.get('/sulama/urunler/', {'search': 'a'}).data
+        self.assertEqual({u['id']: u['yillik_tuketim_sayisi'] for u in veri}, beklenen)
+
+        veri = self.client.get('/sulama/urun-kategorileri/').data
+        self.assertEqual({k['isim']: k['urun_sayisi'] for k in veri}, {'Tahıl': 2, 'Yazlık': 1})
+
+
+class KosulluListeTests(SulamaTestCase):
+    """Liste endpoint'lerinde ETag / Last-Modified ile 304 yanıtları"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.urun = Urun.objects.create(sulama=cls.sulama, isim='Mısır')
+
+    def test_degismeyen_liste_304_doner(self):
+        for url in ('/sulama/sulamalar/', '/sulama/depolama-tesisleri/', '/sulama/kanallar/',
+                    '/sulama/urunler/', '/sulama/kanallar/ozet/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('Last-Modified', response)
+
+            # Liste sorgusu çalışmaz: sadece sürüm okunur
+            with self.assertNumQueries(1):
+                response_304 = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response_304.status_code, 304)
+            self.assertEqual(response_304['ETag'], response['ETag'])
+
+            response_304 = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+            self.assertEqual(response_304.status_code, 304)
+
+    def test_veri_degisince_etag_degisir(self):
+        etag = self.client.get('/sulama/kanallar/')['ETag']
+
+        self.kanal.isim = 'Yeni Kanal'
+        self.kanal.save()
+        response = self.client.get('/sulama/kanallar/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data[0]['isim'], 'Yeni Kanal')
+
+        # Bölge adı listede görünür
+        etag = response['ETag']
+        self.bolge.isim = 'Yeni Bölge'
+        self.bolge.save()
+        self.assertNotEqual(self.client.get('/sulama/kanallar/')['ETag'], etag)
+
+        etag = self.client.get('/sulama/urunler/')['ETag']
+        self.urun.kategori.add(UrunKategorisi.objects.create(isim='Tahıl'))
+        self.assertNotEqual(self.client.get('/sulama/urunler/')['ETag'], etag)
+
+    def test_etag_sorguya_ve_kapsama_gore_degisir(self):
+        etag = self.client.get('/sulama/sulamalar/')['ETag']
+        self.assertNotEqual(self.client.get('/sulama/sulamalar/?isim=Yok')['ETag'], etag)
+
+        # Yetkisi olmayan kullanıcı superuser'ın ETag'iyle 304 alamaz
+        kullanici = User.objects.create_user('okuyucu', 'okuyucu@example.com', 'okuyucu1234')
+        diger_sulama = Sulama.objects.create(bolge=self.bolge, isim='Diğer Sulama')
+        KullaniciSulamaYetkisi.objects.create(kullanici_profili=kullanici.profil, sulama=diger_sulama)
+        etag = self.client.get('/sulama/sulamalar/')['ETag']
+        self.client.force_authenticate(kullanici)
+        response = self.client.get('/sulama/sulamalar/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([sulama['id'] for sulama in response.data], [diger_sulama.id])
+
+
+class SorguPlanlariTests(SulamaTestCase):
+    """Sıcak sorguların uygun indekslerle çalışabilmesi (EXPLAIN)"""
+
+    kanal_abagi = ()
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for gun in range(1, 11):
+            GunlukSebekeyeAlinanSuMiktari.objects.create(
+                kanal=cls.kanal, tarih=date(2024, 5, gun), yukseklik=0, su_miktari=10,
+                baslangic_saati=f'2024-05-{gun:02d}T08:00:00Z', bitis_saati=f'2024-05-{gun:02d}T09:00:00Z'
+            )
+            GunlukDepolamaTesisiSuMiktari.objects.create(
+                depolama_tesisi=cls.tesis, tarih=date(2024, 5, gun), kot=1, su_miktari=100
+            )
+        YillikGenelSuTuketimi.objects.create(sulama=cls.sulama, yil=2024)
+        kullanici = User.objects.create_user('okuyucu', 'okuyucu@example.com', 'okuyucu1234')
+        KullaniciSulamaYetkisi.objects.create(kullanici_profili=kullanici.profil, sulama=cls.sulama)
+
+    def test_sicak_sorgular_indeks_kullanir(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('EXPLAIN kontrolü PostgreSQL gerektirir')
+        cikti = StringIO()
+        call_command('sorgu_planlarini_kontrol_et', seqscan_kapali=True, stdout=cikti)
+        if not bolumlu_mu(connection, GunlukSebekeyeAlinanSuMiktari._meta.db_table):
+            # Bölümlü tabloda planda bölüm indekslerinin adları görünür
+            self.assertIn('sebeke_tarih_sirasi_idx', cikti.getvalue())
+        self.assertIn('aktif_sulama_yetkisi_idx', cikti.getvalue())
+
+
+class AylikKanalSuOzetiTests(SulamaTestCase):
+    """Aylık kanal su özetinin ölçüm yazmalarıyla güncel tutulması"""
+
+    def _olcum(self, tarih, su_miktari, saat=8, sure=2):
+        return GunlukSebekeyeAlinanSuMiktari.objects.create(
+            kanal=self.kanal, tarih=tarih, yukseklik=0, su_miktari=su_miktari,
+            baslangic_saati=f'{tarih}T{saat:02d}:00:00Z', bitis_saati=f'{tarih}T{saat + sure:02d}:00:00Z'
+        )
+
+    def _ozetler(self):
+        return {
+            (ozet.yil, ozet.ay): (ozet.toplam_su, ozet.kayit_sayisi, ozet.en_az_su, ozet.en_cok_su, ozet.acik_kalma_dakika)
+            for ozet in AylikKanalSuOzeti.objects.filter(kanal=self.kanal)
+        }
+
+    def test_kayit_guncelleme_ve_silme(self):
+        self._olcum('2024-05-01', 10)
+        olcum = self._olcum('2024-05-02', 30, sure=1)
+        self.assertEqual(self._ozetler(), {(2024, 5): (40, 2, 10, 30, 180)})
+
+        olcum.tarih = date(2024, 6, 2)
+        olcum.baslangic_saati = '2024-06-02T08:00:00Z'
+        olcum.bitis_saati = '2024-06-02T09:00:00Z'
+        olcum.save()
+        self.assertEqual(self._ozetler(), {(2024, 5): (10, 1, 10, 10, 120), (2024, 6): (30, 1, 30, 30, 60)})
+
+        olcum.delete()
+        self.assertEqual(self._ozetler(), {(2024, 5): (10, 1, 10, 10, 120)})
+
+        GunlukSebekeyeAlinanSuMiktari.objects.filter(kanal=self.kanal).delete()
+        self.assertEqual(self._ozetler(), {})
+
+    def test_ozet_yenilenemezse_olcum_yazmasi_geri_alinir(self):
+        olcum = self._olcum('2024-05-01', 10)
+        with mock.patch('sulama.aylik_ozet.aylik_ozetleri_yenile', side_effect=RuntimeError('özet hatası')):
+            with self.assertRaises(RuntimeError):
+                self._olcum('2024-05-02', 30)
+            with self.assertRaises(RuntimeError):
+                olcum.su_miktari = 99
+                olcum.save()
+            with self.assertRaises(RuntimeError):
+                olcum.delete()
+
+        self.assertEqual(list(GunlukSebekeyeAlinanSuMiktari.objects.values_list('tarih', 'su_miktari')), [(date(2024, 5, 1), 10)])
+        self.assertEqual(self._ozetler(), {(2024, 5): (10, 1, 10, 10, 120)})
+
+    def test_toplu_yukleme_ozeti_gunceller(self):
+        self._olcum('2024-06-01', 5)
+        response = self.client.post('/sulama/gunluk-sebeke-su/toplu_yukle/', {'kayitlar': [
+            {'kanal': self.kanal.id, 'tarih': f'2024-06-{gun:02d}', 'baslangic_saati': f'2024-06-{gun:02d}T08:00:00Z',
+             'bitis_saati': f'2024-06-{gun:02d}T10:00:00Z', 'yukseklik': 0, 'su_miktari': gun}
+            for gun in range(1, 4)
+        ] + [{'kanal': self.kanal.id, 'tarih': '2024-07-01', 'baslangic_saati': '2024-07-01T08:00:00',
+              'bitis_saati': '2024-07-01T08:30:00', 'yukseklik': 0, 'su_miktari': 7}]}, format='json')
+        self.assertEqual(response.data['kaydedilen'], 4)
+        # 1 Haziran'daki ölçüm aynı anahtarla güncellendi
+        self.assertEqual(self._ozetler(), {(2024, 6): (6, 3, 1, 3, 360), (2024, 7): (7, 1, 7, 7, 30)})
+
+    def test_yeniden_olusturma_komutu(self):
+        for gun in range(1, 4):
+            self._olcum(f'2024-05-{gun:02d}', gun * 10)
+        self._olcum('2025-01-15', 50)
+        beklenen = self._ozetler()
+
+        AylikKanalSuOzeti.objects.all().update(toplam_su=0, kayit_sayisi=0)
+        AylikKanalSuOzeti.objects.create(kanal=self.kanal, yil=2024, ay=9, toplam_su=1, kayit_sayisi=1)
+        cikti = StringIO()
+        call_command('aylik_ozetleri_yeniden_olustur', '--baslangic', '2024-05-10', '--bitis', '2024-12-31', stdout=cikti)
+        self.assertEqual(self._ozetler(), {**beklenen, (2025, 1): (0, 0, 50, 50, 120)})
+
+        call_command('aylik_ozetleri_yeniden_olustur', stdout=cikti)
+        self.assertEqual(self._ozetler(), beklenen)
+
+    def test_ozet_istatistik_tam_aylarda_ozetten_okur(self):
+        for gun in range(1, 11):
+            self._olcum(f'2024-05-{gun:02d}', gun)
+        url = '/sulama/gunluk-sebeke-su/ozet_istatistik/'
+
+        with CaptureQueriesContext(connection) as sorgular:
+            response = self.client.get(url, {'baslangic_tarih': '2024-05-01', 'bitis_tarih': '2024-05-31',
+                                             'kanal': self.kanal.id})
+        self.assertEqual(response.data, {'toplam_su': 55, 'ortalama_su': 5.5, 'kayit_sayisi': 10})
+        self.assertTrue(all(GunlukSebekeyeAlinanSuMiktari._meta.db_table not in sorgu['sql']
+                            for sorgu in sorgular.captured_queries))
+
+        # Ay ortasında biten aralık ham ölçümlerden hesaplanır
+        response = self.client.get(url, {'baslangic_tarih': '2024-05-01', 'bitis_tarih': '2024-05-04'})
+        self.assertEqual(response.data, {'toplam_su': 10, 'ortalama_su': 2.5, 'kayit_sayisi': 4})
+
+
+class GunlukTabloBolumlemeTests(SulamaTestCase):
+    """Günlük ölçüm tablolarının yıl bölümlü tabloya dönüştürülmesi (PostgreSQL)"""
+
+    kanal_abagi = ()
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        KullaniciSulamaYetkisi.objects.create(
+            kullanici_profili=User.objects.create_user('okuyucu', 'okuyucu@example.com', 'okuyucu1234').profil,
+            sulama=cls.sulama,
+        )
+        YillikGenelSuTuketimi.objects.create(sulama=cls.sulama, yil=2024)
+
+    def setUp(self):
+        super().setUp()
+        if connection.vendor != 'postgresql':
+            self.skipTest('Tablo bölümleme PostgreSQL gerektirir')
+        self.sebeke = GunlukSebekeyeAlinanSuMiktari._meta.db_table
+        self.depolama = GunlukDepolamaTesisiSuMiktari._meta.db_table
+        # GUNLUK_VERI_BOLUMLEME ile migrate edilmiş test veritabanında düz tablodan başla
+        bolumlemeyi_kaldir(connection, self.sebeke)
+        bolumlemeyi_kaldir(connection, self.depolama)
+
+    def _olcum(self, tarih, su_miktari=10):
+        return GunlukSebekeyeAlinanSuMiktari.objects.create(
+            kanal=self.kanal, tarih=tarih, yukseklik=0, su_miktari=su_miktari,
+            baslangic_saati=f'{tarih}T08:00:00Z', bitis_saati=f'{tarih}T09:00:00Z'
+        )
+
+    def _taranan_tablolar(self, queryset):
+        """Sorgu planında taranan ölçüm tablosu bölümleri"""
+        sql, parametreler = queryset.order_by().values('id').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', parametreler)
+            plan = cursor.fetchone()[0]
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        tablolar, dugumler = set(), [plan[0]['Plan']]
+        while dugumler:
+            dugum = dugumler.pop()
+            if 'Relation Name' in dugum:
+                tablolar.add(dugum['Relation Name'])
+            dugumler.extend(dugum.get('Plans', []))
+        return tablolar
+
+    def test_donusum_orm_ve_bolum_budama(self):
+        self._olcum('2023-04-01')
+        olcum = self._olcum('2024-05-01', 20)
+        GunlukDepolamaTesisiSuMiktari.objects.create(depolama_tesisi=self.tesis, tarih=date(2024, 5, 1), kot=1, su_miktari=5)
+
+        self.assertTrue(tabloyu_bolumle(connection, self.sebeke))
+        self.assertTrue(tabloyu_bolumle(connection, self.depolama))
+        self.assertFalse(tabloyu_bolumle(connection, self.sebeke))
+        self.assertTrue(bolumlu_mu(connection, self.sebeke))
+        bu_yil = timezone.localdate().year
+        self.assertEqual(yil_bolumleri(connection, self.sebeke), list(range(2023, bu_yil + 2)))
+
+        # Mevcut ORM yolları: okuma, yıl değiştiren güncelleme, upsert, silme, yeni kayıt
+        self.assertEqual(GunlukSebekeyeAlinanSuMiktari.objects.get(pk=olcum.pk).su_miktari, 20)
+        olcum.tarih = date(2025, 1, 2)
+        olcum.baslangic_saati = '2025-01-02T08:00:00Z'
+        olcum.bitis_saati = '2025-01-02T09:00:00Z'
+        olcum.save()
+        self.assertEqual(GunlukSebekeyeAlinanSuMiktari.objects.filter(tarih__year=2025).get().pk, olcum.pk)
+        self.assertEqual(AylikKanalSuOzeti.objects.get(kanal=self.kanal, yil=2025, ay=1).toplam_su, 20)
+        GunlukSebekeyeAlinanSuMiktari.objects.bulk_create([GunlukSebekeyeAlinanSuMiktari(
+            kanal=self.kanal, tarih=date(2025, 1, 2), yukseklik=0, su_miktari=30,
+            baslangic_saati='2025-01-02T08:00:00Z', bitis_saati='2025-01-02T09:00:00Z',
+        )], update_conflicts=True, unique_fields=['kanal', 'tarih', 'baslangic_saati'], update_fields=['su_miktari'])
+        self.assertEqual(GunlukSebekeyeAlinanSuMiktari.objects.get(pk=olcum.pk).su_miktari, 30)
+        yeni = self._olcum('2024-06-01')
+        self.assertGreater(yeni.pk, olcum.pk)
+        yeni.delete()
+
+        self.assertEqual(
+            self._taranan_tablolar(GunlukSebekeyeAlinanSuMiktari.objects.filter(tarih__year=2024)), {f'{self.sebeke}_2024'}
+        )
+        self.assertEqual(
+            self._taranan_tablolar(GunlukDepolamaTesisiSuMiktari.objects.filter(tarih__gte=date(2024, 5, 1))),
+            {f'{self.depolama}_{yil}' for yil in range(2024, bu_yil + 2)} | {f'{self.depolama}_diger'}
+        )
+        call_command('sorgu_planlarini_kontrol_et', seqscan_kapali=True, stdout=StringIO())
+
+        self.assertTrue(bolumlemeyi_kaldir(connection, self.sebeke))
+        self.assertFalse(bolumlu_mu(connection, self.sebeke))
+        self.assertEqual(GunlukSebekeyeAlinanSuMiktari.objects.count(), 2)
+        self.assertGreater(self._olcum('2024-06-02').pk, olcum.pk)
+
+    def test_komut_yil_bolumu_ekler_ve_varsayilandan_tasir(self):
+        cikti = StringIO()
+        call_command('yillik_bolumleri_olustur', stdout=cikti)
+        self.assertIn('bölümlü değil', cikti.getvalue())
+
+        call_command('yillik_bolumleri_olustur', '--donustur', stdout=cikti)
+        uzak_yil = timezone.localdate().year + 5
+        self._olcum(f'{uzak_yil}-03-01')
+        self.assertEqual(
+            self._taranan_tablolar(GunlukSebekeyeAlinanSuMiktari.objects.filter(tarih__year=uzak_yil)),
+            {f'{self.sebeke}_diger'}
+        )
+
+        call_command('yillik_bolumleri_olustur', '--yil', str(uzak_yil), stdout=cikti)
+        self.assertIn(uzak_yil, yil_bolumleri(connection, self.sebeke))
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {self.sebeke}_{uzak_yil}')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute(f'SELECT COUNT(*) FROM {self.sebeke}_diger')
+            self.assertEqual(cursor.fetchone()[0], 0)
+        self.assertEqual(GunlukSebekeyeAlinanSuMiktari.objects.filter(tarih__year=uzak_yil).count(), 1)
+
+
+class SebekeSuHesaplananMiktarTests(SulamaTestCase):
+    """Ölçüm listesinde hesaplanan su miktarının toplu hesaplanması"""
+
+    url = '/sulama/gunluk-sebeke-su/tarih_araligi/?baslangic=2024-03-01&bitis=2024-03-31'
+    zincir = 'tesis'
+
+    def _kanal_ekle(self):
+        kanal = Kanal.objects.create(depolama_tesisi=self.tesis, isim=f'Kanal {Kanal.objects.count()}')
+        KanalAbak.objects.create(kanal=kanal, yukseklik=0, hacim=0)
+        KanalAbak.objects.create(kanal=kanal, yukseklik=1, hacim=100)
+        GunlukSebekeyeAlinanSuMiktari.objects.bulk_create([
+            GunlukSebekeyeAlinanSuMiktari(
+                kanal=kanal, tarih=date(2024, 3, gun), yukseklik=yukseklik, su_miktari=0,
+                baslangic_saati=f'2024-03-{gun:02d}T08:00:00Z', bitis_saati=f'2024-03-{gun:02d}T09:00:00Z'
+            ) for gun, yukseklik in ((1, 0.25), (2, 1), (3, 4))
+        ])
+
+    def _sorgu_sayisi(self, url):
+        kanal_abaklari.temizle()
+        with CaptureQueriesContext(connection) as sorgular:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(sorgular), response.data
+
+    def test_sorgu_sayisi_kanal_sayisindan_bagimsiz(self):
+        self._kanal_ekle()
+        ilk, _ = self._sorgu_sayisi(self.url)
+        for _ in range(3):
+            self._kanal_ekle()
+        sonraki, veri = self._sorgu_sayisi(self.url)
+
+        self.assertEqual(ilk, sonraki)
+        self.assertEqual(len(veri), 12)
+        self.assertEqual(
+            sorted({(kayit['yukseklik'], kayit['hesaplanan_su_miktari']) for kayit in veri}),
+            [(0.25, 25.0), (1.0, 100.0), (4.0, 0)]
+        )
+
+    def test_hesaplanan_alan_istenmezse_abak_okunmaz(self):
+        self._kanal_ekle()
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url + '&hesaplanan=false')
+        self.assertNotIn('hesaplanan_su_miktari', response.data[0])
+
+
+class YillikTuketimListeSorguTests(SulamaTestCase):
+    """Yıllık tüketim listesinin sorgu sayısının kayıt sayısından bağımsız olması"""
+
+    url = '/sulama/yillik-tuketim/'
+    zincir = 'bolge'
+
+    def _veri_ekle(self, sulama_sayisi, yil_sayisi):
+        for _ in range(sulama_sayisi):
+            sulama = Sulama.objects.create(bolge=self.bolge, isim=f'Sulama {Sulama.objects.count()}')
+            urunler = [Urun.objects.create(sulama=sulama, isim=f'Ürün {i}', temmuz=100) for i in range(3)]
+            for yil in range(2020, 2020 + yil_sayisi):
+                kayit = YillikGenelSuTuketimi.objects.create(yil=yil, sulama=sulama)
+                YillikUrunDetay.objects.bulk_create([
+                    YillikUrunDetay(yillik_tuketim=kayit, urun=urun, alan=10, su_tuketimi=1000)
+                    for urun in urunler
+                ])
+
+    def _sorgu_sayisi(self):
+        with CaptureQueriesContext(connection) as sorgular:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(sorgular), response.data
+
+    def test_sorgu_sayisi_yil_ve_sulama_sayisindan_bagimsiz(self):
+        self._veri_ekle(sulama_sayisi=1, yil_sayisi=1)
+        ilk, _ = self._sorgu_sayisi()
+        self._veri_ekle(sulama_sayisi=3, yil_sayisi=4)
+        sonraki, veri = self._sorgu_sayisi()
+
+        self.assertEqual(ilk, sonraki)
+        self.assertEqual(len(veri), 13)
+        self.assertEqual({len(kayit['urun_detaylari']) for kayit in veri}, {3})
+        self.assertEqual({kayit['birim_su_tuketimi'] for kayit in veri}, {100})
+
+
+class ZamanSerisiSayfalamaTests(SulamaTestCase):
+    """Günlük ölçümlerde isteğe bağlı keyset sayfalama"""
+
+    url = '/sulama/gunluk-sebeke-su/?baslangic_tarih=2024-04-01&bitis_tarih=2024-04-30'
+    zincir = 'tesis'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        kanallar = [Kanal.objects.create(depolama_tesisi=cls.tesis, isim=f'Kanal {k}') for k in range(2)]
+        # Aynı tarih ve saatte birden çok kanal: sıralama id ile tamamlanmalı
+        GunlukSebekeyeAlinanSuMiktari.objects.bulk_create([
+            GunlukSebekeyeAlinanSuMiktari(
+                kanal=kanal, tarih=date(2024, 4, gun), yukseklik=1, su_miktari=1,
+                baslangic_saati=f'2024-04-{gun:02d}T{saat:02d}:00:00Z',
+                bitis_saati=f'2024-04-{gun:02d}T{saat + 1:02d}:00:00Z'
+            ) for gun in (1, 2, 3) for saat in (6, 12) for kanal in kanallar
+        ])
+        cls.beklenen = list(GunlukSebekeyeAlinanSuMiktari.objects.order_by(
+            '-tarih', '-baslangic_saati', '-id'
+        ).values_list('id', flat=True))
+
+    def test_parametresiz_istek_tum_listeyi_doner(self):
+        response = self.client.get(self.url + '&hesaplanan=false')
+        self.assertEqual(len(response.data), 12)
+
+    def test_ileri_ve_geri_gezinme(self):
+        with CaptureQueriesContext(connection) as sorgular:
+            response = self.client.get(self.url + '&hesaplanan=false&page_size=5')
+        self.assertFalse(any('COUNT(' in sorgu['sql'] for sorgu in sorgular.captured_queries))
+        self.assertIsNone(response.data['previous'])
+
+        sayfalar = [[kayit['id'] for kayit in response.data['results']]]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            sayfalar.append([kayit['id'] for kayit in response.data['results']])
+        self.assertEqual([len(sayfa) for sayfa in sayfalar], [5, 5, 2])
+        self.assertEqual(sum(sayfalar, []), self.beklenen)
+
+        geri_sayfalar = []
+        while response.data['previous']:
+            response = self.client.get(response.data['previous'])
+            geri_sayfalar.append([kayit['id'] for kayit in response.data['results']])
+        self.assertEqual(geri_sayfalar, [sayfalar[1], sayfalar[0]])
+
+    def test_gecersiz_cursor(self):
+        response = self.client.get(self.url + '&cursor=bozuk')
+        self.assertEqual(response.status_code, 404)
+
+
+class GunlukVeriDisariAktarmaTests(SulamaTestCase):
+    """Günlük ölçümlerin akış halinde dışarı aktarımı"""
+
+    tesis_isim = 'Barajı'
+    kanal_isim = 'Sağ Sahil'
+    kanal_abagi = ()
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        GunlukSebekeyeAlinanSuMiktari.objects.bulk_create([
+            GunlukSebekeyeAlinanSuMiktari(
+                kanal=cls.kanal, tarih=date(2023, 5, gun), yukseklik=1, su_miktari=gun,
+                baslangic_saati=f'2023-05-{gun:02d}T08:00:00Z', bitis_saati=f'2023-05-{gun:02d}T09:00:00Z'
+            ) for gun in range(1, 31)
+        ])
+        GunlukDepolamaTesisiSuMiktari.objects.bulk_create([
+            GunlukDepolamaTesisiSuMiktari(depolama_tesisi=cls.tesis, tarih=date(2023, 5, gun), kot=800, su_miktari=gun)
+            for gun in range(1, 11)
+        ])
+
+    def _icerik(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv_tarih_filtresiyle(self):
+        response = self.client.get(
+            '/sulama/gunluk-sebeke-su/disari_aktar/?baslangic_tarih=2023-05-01&bitis_tarih=2023-05-10'
+        )
+        satirlar = self._icerik(response).lstrip('\ufeff').splitlines()
+        self.assertEqual(satirlar[0].split(',')[:3], ['id', 'kanal', 'kanal_isim'])
+        self.assertEqual(len(satirlar), 11)
+        self.assertIn('Sağ Sahil', satirlar[1])
+
+    def test_ndjson(self):
+        response = self.client.get(
+            '/sulama/gunluk-depolama-su/disari_aktar/?bicim=ndjson&baslangic_tarih=2023-01-01&bitis_tarih=2023-12-31'
+        )
+        kayitlar = [json.loads(satir) for satir in self._icerik(response).splitlines()]
+        self.assertEqual(len(kayitlar), 10)
+        self.assertEqual(kayitlar[0]['depolama_tesisi_isim'], 'Barajı')
+        self.assertEqual(kayitlar[0]['tarih'], '2023-05-10')
+
+    def test_gecersiz_bicim(self):
+        response = self.client.get('/sulama/gunluk-depolama-su/disari_aktar/?bicim=xml')
+        self.assertEqual(response.status_code, 400)
+
+
+class ExcelSablonAktarimTests(GeciciSablonMixin, SimpleTestCase):
+    """Şablonlu Excel dışa aktarımının bellekten ve önbellekli şablonla yapılması"""
+
+    govde = {
+        'formData': {'yil': 2024, 'sulama': 'Test Sulama', 'kurumAdi': 'DSİ'},
+        'tableData': [{'urun': 'Buğday', 'ekim_alani': 100, 'ekim_orani': 50, 'ur_values': [1] * 12}],
+        'results': {},
+    }
+
+    def setUp(self):
+        self.gecici_sablon_kur()
+
+    def _aktar(self):
+        response = self.client.post('/sulama/api/excel-export/', data=json.dumps(self.govde),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return load_workbook(BytesIO(b''.join(response.streaming_content))).active
+
+    def test_sablon_bir_kez_ayristirilir_ve_diske_yazilmaz(self):
+        with mock.patch.object(excel, 'load_workbook', wraps=excel.load_workbook) as ayristirici:
+            ilk = self._aktar()
+            ikinci = self._aktar()
+
+        self.assertEqual(ayristirici.call_count, 1)
+        self.assertEqual(ilk['A1'].value, '2024 DSİ Test Sulama GenelSulamaPlanlaması')
+        self.assertEqual(ikinci['A1'].value, ilk['A1'].value)
+        self.assertEqual(os.listdir(self.klasor), ['Kitap1.xlsx'])
+
+    def test_istekler_ayni_sablon_kopyasini_paylasmaz(self):
+        self._aktar()
+        self.assertIsNone(excel.sablon_kopyasi().active['A1'].value)
+
+
+class YillikPlanlamaExcelTests(GeciciSablonMixin, SulamaTestCase):
+    """Kaydedilmiş yıllık planın sunucu tarafında hesaplanarak Excel'e aktarılması"""
+
+    zincir = 'sulama'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.misir = Urun.objects.create(sulama=cls.sulama, isim='Mısır', temmuz=200)
+        cls.kayit = YillikGenelSuTuketimi.objects.create(yil=2024, sulama=cls.sulama, ciftlik_randi=50, iletim_randi=50)
+        YillikUrunDetay.objects.create(yillik_tuketim=cls.kayit, urun=cls.misir, alan=100, su_tuketimi=5000)
+
+    def setUp(self):
+        super().setUp()
+        self.gecici_sablon_kur()
+
+    def _indir(self, sorgu):
+        response = self.client.get(f'/sulama/yillik-tuketim/excel_aktar/?{sorgu}')
+        self.assertEqual(response.status_code, 200)
+        return load_workbook(BytesIO(b''.join(response.streaming_content))).active
+
+    def test_degerler_sunucuda_hesaplanir(self):
+        ws = self._indir(f'sulama={self.sulama.id}&yil=2024&kurum=DSİ')
+
+        self.assertEqual(ws['A1'].value, '2024 DSİ Test Sulama GenelSulamaPlanlaması')
+        self.assertEqual(ws['A4'].value, 'Mısır')
+        self.assertEqual(ws['J4'].value, 200)
+        # Net = 100 ha × 200 / 100000, brüt = net × 100/50 × 100/50
+        self.assertEqual(ws['A7'].value, 'NET SU İHTİYACI (hm³)')
+        self.assertAlmostEqual(ws['J7'].value, 0.2)
+        self.assertAlmostEqual(ws['J9'].value, 0.8)
+        self.assertAlmostEqual(ws['P9'].value, 0.8)
+
+    def test_degismeyen_plan_yeniden_hesaplanmaz(self):
+        with mock.patch.object(excel, 'planlama_excel_dosyasi', wraps=excel.planlama_excel_dosyasi) as uretici:
+            self._indir(f'id={self.kayit.id}')
+            self._indir(f'id={self.kayit.id}')
+            self.assertEqual(uretici.call_count, 1)
+
+            self.misir.temmuz = 100
+            self.misir.save()
+            ws = self._indir(f'id={self.kayit.id}')
+            self.assertEqual(uretici.call_count, 2)
+        self.assertAlmostEqual(ws['J7'].value, 0.1)
+
+    def test_parametre_ve_kayit_kontrolu(self):
+        self.assertEqual(self.client.get('/sulama/yillik-tuketim/excel_aktar/').status_code, 400)
+        self.assertEqual(self.client.get('/sulama/yillik-tuketim/excel_aktar/?id=x').status_code, 400)
+        self.assertEqual(
+            self.client.get(f'/sulama/yillik-tuketim/excel_aktar/?sulama={self.sulama.id}&yil=2023').status_code, 404
+        )
+
+
+class ArkaPlanIsiTests(GeciciSablonMixin, SulamaTestCase):
+    """Veritabanı tabanlı arka plan iş kuyruğu"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        urun = Urun.objects.create(sulama=cls.sulama, isim='Mısır', temmuz=200)
+        cls.kayit = YillikGenelSuTuketimi.objects.create(yil=2024, sulama=cls.sulama)
+        YillikUrunDetay.objects.create(yillik_tuketim=cls.kayit, urun=urun, alan=100, su_tuketimi=0)
+
+    def setUp(self):
+        super().setUp()
+        self.gecici_sablon_kur()
+        self.ayarlari_uygula(MEDIA_ROOT=os.path.join(self.klasor, 'media'))
+
+    def _calistir(self):
+        is_ = siradaki_isi_al('test')
+        self.assertIsNotNone(is_)
+        self.assertEqual(is_.durum, 'CALISIYOR')
+        return isi_yurut(is_.id)
+
+    def test_is_sirayla_ve_bir_kez_alinir(self):
+        ilk = ArkaPlanIsi.objects.create(tur='yillik_ozet_hesaplama')
+        ikinci = ArkaPlanIsi.objects.create(tur='yillik_ozet_hesaplama')
+
+        self.assertEqual(siradaki_isi_al('a').id, ilk.id)
+        self.assertEqual(siradaki_isi_al('b').id, ikinci.id)
+        self.assertIsNone(siradaki_isi_al('c'))
+        self.assertEqual(ArkaPlanIsi.objects.get(pk=ilk.id).calisan, 'a')
+
+    def test_excel_arka_planda_uretilir_ve_indirilir(self):
+        response = self.client.get(f'/sulama/yillik-tuketim/excel_aktar/?id={self.kayit.id}&arka_plan=true')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['durum'], 'BEKLIYOR')
+        is_id = response.data['id']
+
+        self.assertEqual(self.client.get(f'/sulama/isler/{is_id}/indir/').status_code, 404)
+        self.assertEqual(self._calistir(), 'TAMAMLANDI')
+
+        durum = self.client.get(f'/sulama/isler/{is_id}/').data
+        self.assertEqual(durum['ilerleme'], 100)
+        self.assertTrue(durum['dosya_var'])
+        response = self.client.get(f'/sulama/isler/{is_id}/indir/')
+        self.assertEqual(response.status_code, 200)
+        ws = load_workbook(BytesIO(b''.join(response.streaming_content))).active
+        self.assertEqual(ws['A4'].value, 'Mısır')
+
+    def test_toplu_yukleme_arka_planda_ilerleme_ile(self):
+        kayitlar = [
+            {
+                'kanal': self.kanal.id, 'tarih': '2024-06-01', 'yukseklik': 1,
+                'baslangic_saati': f'2024-06-01T{saat:02d}:00:00', 'bitis_saati': f'2024-06-01T{saat:02d}:30:00',
+            }
+            for saat in range(5)
+        ]
+        response = self.client.post(
+            '/sulama/gunluk-sebeke-su/toplu_yukle/', {'kayitlar': kayitlar, 'arka_plan': True}, format='json'
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(GunlukSebekeyeAlinanSuMiktari.objects.exists())
+
+        self._calistir()
+        is_ = ArkaPlanIsi.objects.get(pk=response.data['id'])
+        self.assertEqual(is_.sonuc['kaydedilen'], 5)
+        self.assertEqual(is_.ilerleme_mesaji, '5/5')
+        self.assertEqual(GunlukSebekeyeAlinanSuMiktari.objects.count(), 5)
+
+    def test_hatali_is_ve_baska_kullanicinin_isi(self):
+        is_ = ArkaPlanIsi.objects.create(tur='planlama_excel', parametreler={'kayit_id': 0}, kullanici=self.user)
+        with self.assertLogs('sulama.isler', 'ERROR'):
+            self.assertEqual(self._calistir(), 'HATALI')
+        is_.refresh_from_db()
+        self.assertIn('does not exist', is_.hata)
+
+        diger = User.objects.create_user('diger', 'diger@example.com', 'sifre1234')
+        self.client.force_authenticate(diger)
+        self.assertEqual(self.client.get(f'/sulama/isler/{is_.id}/').status_code, 404)
+
+    def test_yarim_kalan_isler_sadece_olu_calisanlarda_isaretlenir(self):
+        isler = {ad: ArkaPlanIsi.objects.create(tur='yillik_ozet_hesaplama') for ad in ('bu', 'canli', 'olu')}
+        for ad in isler:
+            siradaki_isi_al(f'makine:{ad}')
+        ArkaPlanIsi.objects.filter(calisan__in=['makine:canli', 'makine:olu']).update(
+            guncelleme_tarihi=timezone.now() - timedelta(hours=2)
+        )
+        calisan_nabzi('makine:canli')
+
+        self.assertEqual(yarim_kalan_isleri_isaretle('makine:bu'), 2)
+        self.assertEqual(
+            {ad: ArkaPlanIsi.objects.get(pk=is_.pk).durum for ad, is_ in isler.items()},
+            {'bu': 'HATALI', 'canli': 'CALISIYOR', 'olu': 'HATALI'}
+        )
+
+    def test_hatali_isaretlenen_is_tamamlandi_yapilmaz(self):
+        is_ = ArkaPlanIsi.objects.create(tur='yillik_ozet_hesaplama')
+        siradaki_isi_al('makine:eski')
+        yarim_kalan_isleri_isaretle('makine:eski')
+
+        with self.assertLogs('sulama.isler', 'WARNING'):
+            self.assertEqual(isi_yurut(is_.id), 'HATALI')
+        is_.refresh_from_db()
+        self.assertEqual((is_.durum, is_.sonuc), ('HATALI', None))
+
+    @override_settings(ARKA_PLAN_ISLERI_SENKRON=True)
+    def test_senkron_modda_istek_icinde_calisir(self):
+        response = self.client.post(
+            '/sulama/yillik-tuketim/ozetleri_hesapla/', {'yil': 2024}, format='json'
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['durum'], 'TAMAMLANDI')
+        self.assertEqual(response.data['sonuc'], {'guncellenen': 1})
+
+
+def _test_alt_sureci(is_id):
+    """isleri_calistir testlerinde alt süreç işi: işaretli iş kendi sürecini öldürür"""
+    if str(is_id) == os.environ.get('GSP_TEST_OLDURULECEK_IS'):
+        os.kill(os.getpid(), signal.SIGKILL)
+    return 'TAMAMLANDI'
+
+
+class _AnindaHavuz:
+    """submit'i aynı süreçte çalıştıran sahte havuz; ilk submit'te bozuk havuzu taklit edebilir"""
+
+    def __init__(self, bozuk=False):
+        self.bozuk = bozuk
+
+    def submit(self, fonksiyon, *args):
+        if self.bozuk:
+            raise BrokenProcessPool('test')
+        gelecek = Future()
+        gelecek.set_result(fonksiyon(*args))
+        return gelecek
+
+    def shutdown(self, wait=True):
+        pass
+
+
+@mock.patch('sulama.management.commands.isleri_calistir.alt_surecte_yurut', _test_alt_sureci)
+class IsleriCalistirKomutuTests(TransactionTestCase):
+    """Alt süreç havuzunun çökmesinden sonra çalıştırıcının devam etmesi"""
+
+    def _calistir(self, *args):
+        cikti = StringIO()
+        call_command('isleri_calistir', '--tek-sefer', '--bekleme', '0.1', *args, stdout=cikti)
+        return cikti.getvalue()
+
+    def test_oldurulen_alt_surec_isi_hatali_yapar_kuyruk_devam_eder(self):
+        oldurulen = ArkaPlanIsi.objects.create(tur='yillik_ozet_hesaplama')
+        sonraki = ArkaPlanIsi.objects.create(tur='yillik_ozet_hesaplama')
+
+        with mock.patch.dict(os.environ, {'GSP_TEST_OLDURULECEK_IS': str(oldurulen.id)}):
+            cikti = self._calistir('--eszamanli', '1')
+
+        self.assertIn('havuzu bozuldu', cikti)
+        self.assertIn(f'İş #{sonraki.id}: TAMAMLANDI', cikti)
+        oldurulen.refresh_from_db()
+        self.assertEqual(oldurulen.durum, 'HATALI')
+        self.assertIn('Alt süreç hatası', oldurulen.hata)
+
+    def test_bozuk_havuza_gonderilemeyen_is_kuyruga_doner(self):
+        is_ = ArkaPlanIsi.objects.create(tur='yillik_ozet_hesaplama')
+        durumlar = []
+
+        def izle(is_id):
+            durumlar.append(ArkaPlanIsi.objects.get(pk=is_id).durum)
+            return _test_alt_sureci(is_id)
+
+        with mock.patch.object(
+            IsleriCalistirKomutu, '_havuz_olustur', side_effect=[_AnindaHavuz(bozuk=True), _AnindaHavuz()]
+        ), mock.patch('sulama.management.commands.isleri_calistir.isi_kuyruga_geri_al', wraps=isi_kuyruga_geri_al) as geri_al, \
+                mock.patch('sulama.management.commands.isleri_calistir.alt_surecte_yurut', izle):
+            cikti = self._calistir()
+
+        geri_al.assert_called_once_with(is_.id)
+        self.assertEqual(durumlar, ['CALISIYOR'])
+        self.assertIn(f'İş #{is_.id}: TAMAMLANDI', cikti)
+
+
+class DashboardOnbellekTests(SulamaTestCase):
+    """Dashboard yanıtlarının sürümlü önbelleği"""
+
+    url = '/sulama/dashboard/aylik_su_kullanimi/'
+    zincir = 'tesis'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        GunlukDepolamaTesisiSuMiktari.objects.create(
+            depolama_tesisi=cls.tesis, tarih=date(2024, 1, 10), kot=100, su_miktari=1000
+        )
+
+    def _getir(self):
+        response = self.client.get(self.url, {'yil': 2024})
+        self.assertEqual(response.status_code, 200)
+        return response['X-Onbellek'], response.data['aylik_veriler'][0]['depolama_su']
+
+    def _olcum_ekle(self, gun, su_miktari):
+        GunlukDepolamaTesisiSuMiktari.objects.create(
+            depolama_tesisi=self.tesis, tarih=date(2024, 1, gun), kot=100, su_miktari=su_miktari
+        )
+
+    def test_tekrar_istek_tek_surum_sorgusuyla_doner(self):
+        self.assertEqual(self._getir(), ('MISS', 1000.0))
+        with CaptureQueriesContext(connection) as sorgular:
+            self.assertEqual(self._getir(), ('HIT', 1000.0))
+        self.assertEqual(len(sorgular.captured_queries), 1)
+
+        istatistikler = self.client.get('/sulama/dashboard/onbellek_istatistikleri/').data
+        self.assertEqual((istatistikler['hit'], istatistikler['miss']), (1, 1))
+
+    @override_settings(DASHBOARD_BAYAT_SURESI=0)
+    def test_kayit_ve_toplu_yukleme_surumu_artirir(self):
+        self._getir()
+        self._olcum_ekle(20, 2500)
+        self.assertEqual(self._getir(), ('MISS', 2500.0))
+
+        self.client.post('/sulama/gunluk-depolama-su/toplu_yukle/', {'kayitlar': [
+            {'depolama_tesisi': self.tesis.id, 'tarih': '2024-01-25', 'kot': 100, 'su_miktari': 3000},
+        ]}, format='json')
+        self.assertEqual(self._getir(), ('MISS', 3000.0))
+
+    def _surum(self):
+        return SulamaVeriSurumu.objects.get(sulama_id=self.tesis.sulama_id).surum
+
+    def _silme_sorgulari(self, olcum_sayisi):
+        kanal = Kanal.objects.create(depolama_tesisi=self.tesis, isim=f'Kanal {olcum_sayisi}')
+        GunlukSebekeyeAlinanSuMiktari.objects.bulk_create([
+            GunlukSebekeyeAlinanSuMiktari(
+                kanal=kanal, tarih=date(2024, 2, 1) + timedelta(days=gun), yukseklik=1, su_miktari=1,
+                baslangic_saati=timezone.make_aware(datetime(2024, 2, 1, 8) + timedelta(days=gun)),
+                bitis_saati=timezone.make_aware(datetime(2024, 2, 1, 9) + timedelta(days=gun)),
+            ) for gun in range(olcum_sayisi)
+        ])
+        surum = self._surum()
+        with CaptureQueriesContext(connection) as sorgular:
+            kanal.delete()
+        self.assertEqual(self._surum(), surum + 1)
+        return len(sorgular)
+
+    def test_kaskad_silmede_surum_ust_kayittan_bir_kez_artar(self):
+        self.assertEqual(self._silme_sorgulari(2), self._silme_sorgulari(60))
+
+        # Ölçümlerin toplu silinmesinde sürüm kanal başına bir kez artar
+        self._olcum_ekle(20, 2500)
+        self._olcum_ekle(21, 2500)
+        surum = self._surum()
+        GunlukDepolamaTesisiSuMiktari.objects.filter(tarih__gte=date(2024, 1, 20)).delete()
+        self.assertEqual(self._surum(), surum + 1)
+
+    def test_bayat_yanit_doner_ve_arka_planda_yenilenir(self):
+        self._getir()
+        self._olcum_ekle(20, 2500)
+
+        with mock.patch('sulama.dashboard._arka_planda_calistir', side_effect=lambda fonksiyon: fonksiyon()):
+            self.assertEqual(self._getir(), ('STALE', 1000.0))
+        self.assertEqual(self._getir(), ('HIT', 2500.0))
+
+    def test_arka_plan_yenilemesi_commit_sonrasinda_baslar(self):
+        self._getir()
+        self._olcum_ekle(20, 2500)
+
+        # İstek transaction içindeyken thread başlatılmaz, commit'e bırakılır
+        with mock.patch('sulama.dashboard.threading.Thread') as thread, \
+                self.captureOnCommitCallbacks() as commit_sonrasi:
+            self.assertEqual(self._getir(), ('STALE', 1000.0))
+        thread.assert_not_called()
+        self.assertEqual(len(commit_sonrasi), 1)
+
+
+class OrnekVeriVeApiOlcumuTests(GeciciSablonMixin, TestCase):
+    """Örnek veri üretimi ve uç nokta ölçüm raporu"""
+
+    olcek = ['--bolge', '1', '--sulama', '2', '--tesis', '1', '--kanal', '2', '--yil', '2', '--son-yil', '2024',
+             '--urun', '4', '--kullanici', '2']
+
+    def setUp(self):
+        self.gecici_sablon_kur()
+        kanal_abaklari.temizle()
+        depolama_abaklari.temizle()
+        self.addCleanup(kanal_abaklari.temizle)
+        self.addCleanup(depolama_abaklari.temizle)
+
+    def test_ornek_veri_olusturma(self):
+        call_command('ornek_veri_olustur', *self.olcek, stdout=StringIO())
+
+        self.assertEqual(Sulama.objects.count(), 2)
+        self.assertEqual(Kanal.objects.count(), 4)
+        self.assertEqual(GunlukSebekeyeAlinanSuMiktari.objects.count(), 4 * 731)
+        self.assertEqual(GunlukDepolamaTesisiSuMiktari.objects.count(), 2 * 731)
+        self.assertEqual(AylikKanalSuOzeti.objects.count(), 4 * 24)
+        self.assertEqual(YillikGenelSuTuketimi.objects.filter(toplam_alan__gt=0).count(), 2 * 2)
+        self.assertEqual(KullaniciSulamaYetkisi.objects.count(), 2 * 2)
+        # Toplu üretilen su miktarları kanal abağıyla tutarlı
+        olcum = GunlukSebekeyeAlinanSuMiktari.objects.order_by('id').last()
+        self.assertAlmostEqual(olcum.su_miktari, olcum.hesapla_su_miktari())
+
+        with self.assertRaises(CommandError):
+            call_command('ornek_veri_olustur', *self.olcek, stdout=StringIO())
+        call_command('ornek_veri_olustur', *self.olcek, '--temizle', stdout=StringIO())
+        self.assertEqual(GunlukSebekeyeAlinanSuMiktari.objects.count(), 4 * 731)
+        self.assertEqual(User.objects.filter(username='ornek_yonetici').count(), 1)
+
+    def test_api_olcumu_rapor_ve_karsilastirma(self):
+        call_command('ornek_veri_olustur', *self.olcek, stdout=StringIO())
+        rapor_yolu = os.path.join(self.klasor, 'rapor.json')
+        olcum_sayisi = GunlukSebekeyeAlinanSuMiktari.objects.count()
+        liste_metrigi = {'rota': '/sulama/kanallar/', 'islem': 'KanalViewSet.list', 'yontem': 'GET', 'durum': '200'}
+        metrik_once = REGISTRY.get_sample_value('gsp_http_istekler_total', liste_metrigi) or 0
+
+        call_command('api_olcumu', '--tekrar', '1', '--isinma', '0', '--cikti', rapor_yolu, stdout=StringIO())
+        with open(rapor_yolu, encoding='utf-8') as dosya:
+            rapor = json.load(dosya)
+
+        sonuclar = rapor['sonuclar']
+        for ad in ('dashboard.aylik_su_kullanimi', 'yillik_tuketim.yil_ozeti', 'gunluk_depolama_su.istatistikler',
+                   'gunluk_depolama_su.son_durum', 'sulamalar.istatistikler', 'excel_export',
+                   'yillik_tuketim.excel_aktar', 'gunluk_sebeke_su.toplu_yukle'):
+            self.assertIn(ad, sonuclar)
+        self.assertEqual({ad: sonuc['durum'] for ad, sonuc in sonuclar.items() if sonuc['durum'] >= 400}, {})
+        self.assertGreater(sonuclar['gunluk_sebeke_su.list']['sorgu_sayisi'], 0)
+        self.assertGreater(sonuclar['excel_export']['tepe_bellek_kb'], 0)
+        self.assertEqual(rapor['veri']['sebeke_olcum'], olcum_sayisi)
+        # Yazma istekleri geri alınır
+        self.assertEqual(GunlukSebekeyeAlinanSuMiktari.objects.count(), olcum_sayisi)
+        # Sentetik istekler uygulama metriklerine yazılmaz
+        self.assertEqual(REGISTRY.get_sample_value('gsp_http_istekler_total', liste_metrigi) or 0, metrik_once)
+
+        # Önceki çalıştırmada daha az sorgu yapan uç nokta gerileme sayılır
+        sonuclar['kanallar.list']['sorgu_sayisi'] -= 1
+        with open(rapor_yolu, 'w', encoding='utf-8') as dosya:
+            json.dump(rapor, dosya)
+        with self.assertRaisesMessage(CommandError, 'kanallar.list'):
+            call_command('api_olcumu', '--sadece', 'kanallar.list', 'sulamalar.list', '--tekrar', '1',
+                         '--karsilastir', rapor_yolu, stdout=StringIO())
+
+
+class MetrikTests(SulamaTestCase):
+    """Uç nokta bazında Prometheus metrikleri"""
+
+    zincir = 'sulama'
+
+    def deger(self, ad, **etiketler):
+        return REGISTRY.get_sample_value(ad, etiketler) or 0
+
+    def test_rota_ve_action_bazinda_kayit(self):
+        liste = {'rota': '/sulama/sulamalar/', 'islem': 'SulamaViewSet.list', 'yontem': 'GET'}
+        akis = {'rota': '/sulama/gunluk-sebeke-su/disari_aktar/',
+                'islem': 'GunlukSebekeyeAlinanSuMiktariViewSet.disari_aktar', 'yontem': 'GET'}
+        once = {
+            'istek': self.deger('gsp_http_istekler_total', durum='200', **liste),
+            'sorgu': self.deger('gsp_http_istek_sorgu_sayisi_sum', **liste),
+            'boyut': self.deger('gsp_http_yanit_boyutu_bayt_sum', **liste),
+            'akis': self.deger('gsp_http_istek_sorgu_sayisi_count', **akis),
+            'eslesmeyen': self.deger('gsp_http_istekler_total', rota='<eslesmeyen>', islem='', yontem='GET', durum='404'),
+        }
+
+        yanit = self.client.get('/sulama/sulamalar/')
+        self.assertEqual(yanit.status_code, 200)
+        self.assertEqual(self.deger('gsp_http_istekler_total', durum='200', **liste), once['istek'] + 1)
+        self.assertGreater(self.deger('gsp_http_istek_sorgu_sayisi_sum', **liste), once['sorgu'])
+        self.assertEqual(self.deger('gsp_http_yanit_boyutu_bayt_sum', **liste), once['boyut'] + len(yanit.content))
+
+        # Akış yanıtı gövde okunduğunda kaydedilir
+        yanit = self.client.get('/sulama/gunluk-sebeke-su/disari_aktar/')
+        self.assertEqual(self.deger('gsp_http_istek_sorgu_sayisi_count', **akis), once['akis'])
+        b''.join(yanit.streaming_content)
+        self.assertEqual(self.deger('gsp_http_istek_sorgu_sayisi_count', **akis), once['akis'] + 1)
+
+        self.client.get('/yok-boyle-bir-adres/')
+        self.assertEqual(
+            self.deger('gsp_http_istekler_total', rota='<eslesmeyen>', islem='', yontem='GET', durum='404'),
+            once['eslesmeyen'] + 1
+        )
+
+        yanit = self.client.get('/metrics')
+        self.assertEqual(yanit.status_code, 200)
+        self.assertIn(
+            'gsp_http_istek_suresi_saniye_count{islem="SulamaViewSet.list",rota="/sulama/sulamalar/",yontem="GET"}',
+            yanit.content.decode()
+        )
+
+    @override_settings(METRIK_IZINLI_IPLER=[], METRIK_ERISIM_TOKENI='gizli')
+    def test_metrik_erisimi(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer yanlis').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer gizli').status_code, 200)
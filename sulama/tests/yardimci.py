@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from openpyxl import Workbook
+from rest_framework.test import APIClient
+
+from .. import excel
+from ..abak import depolama_abaklari, kanal_abaklari
+from ..models import Bolge, DepolamaTesisi, DepolamaTesisiAbak, Kanal, KanalAbak, Sulama
+
+
+class SulamaTestCase(TestCase):
+    """Yetkili istemci ve bölge → sulama → depolama tesisi → kanal zinciri
+
+    `zincir` kurulacak en alt seviyeyi seçer ('bolge', 'sulama', 'tesis' ya da 'kanal');
+    alt sınıflar ek verilerini super().setUpTestData() çağrısından sonra ekler.
+    Her test önbellek ve abak eğrileri temizlenmiş olarak başlar.
+    """
+
+    SEVIYELER = ('bolge', 'sulama', 'tesis', 'kanal')
+
+    zincir = 'kanal'
+    tesis_isim = 'Tesis'
+    kanal_isim = 'Kanal'
+    # (kot, hacim) ve (yükseklik, hacim) satırları
+    tesis_abagi = ()
+    kanal_abagi = ((0, 0), (2, 200))
+
+    @classmethod
+    def setUpTestData(cls):
+        seviye = cls.SEVIYELER.index(cls.zincir)
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'admin1234')
+        cls.bolge = Bolge.objects.create(isim='Test Bölge')
+        if seviye >= 1:
+            cls.sulama = Sulama.objects.create(bolge=cls.bolge, isim='Test Sulama')
+        if seviye >= 2:
+            cls.tesis = DepolamaTesisi.objects.create(sulama=cls.sulama, isim=cls.tesis_isim)
+            for kot, hacim in cls.tesis_abagi:
+                DepolamaTesisiAbak.objects.create(depolama_tesisi=cls.tesis, kot=kot, hacim=hacim)
+        if seviye >= 3:
+            cls.kanal = Kanal.objects.create(depolama_tesisi=cls.tesis, isim=cls.kanal_isim)
+            for yukseklik, hacim in cls.kanal_abagi:
+                KanalAbak.objects.create(kanal=cls.kanal, yukseklik=yukseklik, hacim=hacim)
+
+    def setUp(self):
+        cache.clear()
+        kanal_abaklari.temizle()
+        depolama_abaklari.temizle()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class GeciciSablonMixin:
+    """Test başına geçici klasörde boş Excel şablonu"""
+
+    def gecici_sablon_kur(self, **ayarlar):
+        """Klasörü ve şablonu oluşturur, test sonunda siler; şablon önbelleği iki uçta da temizlenir.
+
+        EXCEL_SABLON_YOLU ve verilen `ayarlar` test boyunca etkindir.
+        """
+        self.klasor = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.klasor)
+        self.sablon = os.path.join(self.klasor, 'Kitap1.xlsx')
+        Workbook().save(self.sablon)
+        excel.sablonlari_temizle()
+        self.addCleanup(excel.sablonlari_temizle)
+        self.ayarlari_uygula(EXCEL_SABLON_YOLU=self.sablon, **ayarlar)
+
+    def ayarlari_uygula(self, **ayarlar):
+        ayar = override_settings(**ayarlar)
+        ayar.enable()
+        self.addCleanup(ayar.disable)
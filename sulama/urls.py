@@ -5,7 +5,7 @@ from .views import (
     BolgeViewSet, SulamaViewSet, DepolamaTesisiViewSet, KanalViewSet,
     GunlukSebekeyeAlinanSuMiktariViewSet, GunlukDepolamaTesisiSuMiktariViewSet,
     UrunKategorisiViewSet, UrunViewSet, YillikGenelSuTuketimiViewSet, 
-    YillikUrunDetayViewSet, DashboardViewSet
+    YillikUrunDetayViewSet, DashboardViewSet, AbakHesaplamaViewSet, ArkaPlanIsiViewSet
 )
 
 router = DefaultRouter()
@@ -20,6 +20,8 @@ router.register(r'urunler', UrunViewSet)
 router.register(r'yillik-tuketim', YillikGenelSuTuketimiViewSet)
 router.register(r'yillik-urun-detay', YillikUrunDetayViewSet)
 router.register(r'dashboard', DashboardViewSet, basename='dashboard')
+router.register(r'abak-hesaplama', AbakHesaplamaViewSet, basename='abak-hesaplama')
+router.register(r'isler', ArkaPlanIsiViewSet)
 
 urlpatterns = [
     path("api/excel-export/", export_to_excel_with_template, name="excel_export_with_template"),
@@ -1,31 +1,149 @@
 from django.shortcuts import render
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count, Sum, Avg
-from django.db.models.functions import Extract
+from django.db.models import Q, Count, Sum, Avg, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from datetime import datetime, timedelta
 from authentication.permissions import SulamaYetkisiPermission
 from authentication.mixins import SulamaBazliMixin
-import shutil
-from django.http import HttpResponse, JsonResponse
-from openpyxl import load_workbook
+from io import BytesIO
+from django.http import JsonResponse, FileResponse
 from django.views.decorators.csrf import csrf_exempt
 import json
 import os
 from .models import (
-    Bolge, Sulama, DepolamaTesisi, Kanal, 
+    Bolge, Sulama, DepolamaTesisi, Kanal, AylikKanalSuOzeti,
     GunlukSebekeyeAlinanSuMiktari, GunlukDepolamaTesisiSuMiktari,
-    UrunKategorisi, Urun, YillikGenelSuTuketimi, YillikUrunDetay
+    UrunKategorisi, Urun, YillikGenelSuTuketimi, YillikUrunDetay, ArkaPlanIsi
 )
 from .serializers import (
     BolgeSerializer, SulamaSerializer, DepolamaTesisiSerializer, KanalSerializer,
     GunlukSebekeyeAlinanSuMiktariSerializer, GunlukDepolamaTesisiSuMiktariSerializer,
     UrunKategorisiSerializer, UrunSerializer, 
     YillikGenelSuTuketimiSerializer, YillikUrunDetaySerializer, 
-    SulamaOzetSerializer, KanalOzetSerializer, UrunOzetSerializer
+    SulamaOzetSerializer, KanalOzetSerializer, UrunOzetSerializer, ArkaPlanIsiSerializer
 )
+from .hesaplama import SuIhtiyaciMotoru
+from .pagination import ZamanSerisiCursorPagination
+from .disari_aktarma import BICIMLER, akis_yaniti
+from .excel import planlama_excel_dosyasi, yillik_planlama_excel
+from .abak import kanal_abaklari, depolama_abaklari
+from .iceri_aktarma import (
+    dosya_satirlarini_oku, sebeke_su_miktarlarini_yukle, depolama_su_miktarlarini_yukle,
+    yillik_tuketim_detaylarini_kaydet
+)
+from .isler import is_olustur
+from .dashboard import aylik_su_kullanimi, onbellek_istatistikleri
+from .aylik_ozet import ay_araligi_q, ay_sonu, tam_aylar_mi
+from .kosullu_istek import KosulluListeMixin
+
+
+def interpolasyon_istendi(request):
+    """Abak hesaplarında interpolasyon yapılsın mı (varsayılan: evet, interpolasyon=false ile kapatılır)"""
+    veri = request.data if hasattr(request.data, 'get') else {}
+    deger = veri.get('interpolasyon', request.query_params.get('interpolasyon', True))
+    return str(deger).lower() not in ('0', 'false', 'hayir', 'hayır')
+
+
+MAKSIMUM_YUKLEME_SATIRI = 50000
+
+
+def arka_plan_istendi(request):
+    """İşlem arka plan işi olarak kuyruğa mı alınsın (arka_plan=true)"""
+    veri = request.data if hasattr(request.data, 'get') else {}
+    deger = veri.get('arka_plan', request.query_params.get('arka_plan', False))
+    return str(deger).lower() in ('1', 'true', 'evet')
+
+
+def is_kuyruga_alindi_yaniti(is_):
+    """Kuyruğa alınan işin durumunu 202 ile döndür; durum /sulama/isler/<id>/ adresinden izlenir"""
+    return Response(ArkaPlanIsiSerializer(is_).data, status=status.HTTP_202_ACCEPTED)
+
+
+def toplu_yukleme_yaniti(viewset, request, yukleyici, is_turu):
+    """
+    Toplu yükleme endpoint'lerinin ortak akışı
+
+    'dosya' (CSV/XLSX) veya 'kayitlar' listesini okur, satırları veri girişi
+    yetkisi kontrolüyle yukleyici fonksiyonuna verir ve sonucu döndürür.
+    arka_plan=true ile dosya/kayıtlar satır sınırı olmadan is_turu işi olarak kuyruğa alınır.
+    """
+    arka_plan = arka_plan_istendi(request)
+    dosya = request.FILES.get('dosya')
+    if dosya is not None:
+        if arka_plan:
+            if not dosya.name.lower().endswith(('.csv', '.xlsx')):
+                return Response(
+                    {'error': 'Sadece .csv ve .xlsx dosyaları desteklenir'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            return is_kuyruga_alindi_yaniti(is_olustur(
+                is_turu, request.user, girdi_dosyasi=dosya, interpolasyon=interpolasyon_istendi(request)
+            ))
+        try:
+            satirlar = dosya_satirlarini_oku(dosya)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception:
+            return Response({'error': 'Dosya okunamadı'}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        satirlar = request.data.get('kayitlar') if isinstance(request.data, dict) else request.data
+        if not isinstance(satirlar, list) or not all(isinstance(satir, dict) for satir in satirlar):
+            return Response(
+                {'error': 'kayitlar listesi veya dosya gerekli'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    if not satirlar:
+        return Response({'error': 'Yüklenecek satır yok'}, status=status.HTTP_400_BAD_REQUEST)
+    if arka_plan:
+        return is_kuyruga_alindi_yaniti(is_olustur(
+            is_turu, request.user, kayitlar=satirlar, interpolasyon=interpolasyon_istendi(request)
+        ))
+    if len(satirlar) > MAKSIMUM_YUKLEME_SATIRI:
+        return Response(
+            {'error': f'Tek seferde en fazla {MAKSIMUM_YUKLEME_SATIRI} satır yüklenebilir'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    sonuc = yukleyici(
+        satirlar,
+        lambda sulama_id: viewset.check_sulama_permission(sulama_id, 'VERI_GIRISI'),
+        interpolasyon=interpolasyon_istendi(request),
+    )
+    return Response(sonuc)
+
+
+def disari_aktarma_yaniti(viewset, request, alanlar, dosya_adi):
+    """
+    Listeleme ile aynı yetki kapsamı ve tarih filtreleriyle akış halinde dışarı aktarım
+
+    ?bicim=csv (varsayılan) veya ?bicim=ndjson
+    """
+    bicim = request.query_params.get('bicim', 'csv').lower()
+    if bicim not in BICIMLER:
+        return Response(
+            {'error': f"Geçersiz biçim, desteklenenler: {', '.join(BICIMLER)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    queryset = viewset.filter_queryset(viewset.get_queryset())
+    return akis_yaniti(queryset, alanlar, bicim, dosya_adi)
+
+
+def iliskili_kayit_sayisi(model, alan):
+    """
+    Satır başına ilişkili kayıt sayısı (ilişkili alt sorgu)
+
+    Ana sorguya JOIN + GROUP BY eklenmez; birden fazla sayım veya arama/filtre JOIN'leri
+    birbirini çoğaltmaz ve her satır için alan indeksinden sayılır.
+    """
+    return Coalesce(Subquery(
+        model.objects.filter(**{alan: OuterRef('pk')}).order_by().values(alan)
+        .annotate(sayi=Count('*')).values('sayi')
+    ), 0)
 
 
 class BolgeViewSet(viewsets.ModelViewSet):
@@ -41,8 +159,15 @@ class BolgeViewSet(viewsets.ModelViewSet):
     ordering_fields = ['isim', 'olusturma_tarihi']
     ordering = ['isim']
 
+    def get_queryset(self):
+        """Liste ve detayda serializer'daki sayılar annotation olarak gelir"""
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.annotate(sulama_sayisi=iliskili_kayit_sayisi(Sulama, 'bolge'))
+        return queryset
+
 
-class SulamaViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
+class SulamaViewSet(KosulluListeMixin, SulamaBazliMixin, viewsets.ModelViewSet):
     """
     Sulama sistemi yönetimi ViewSet
     Kullanıcı sadece yetkili olduğu sulama sistemlerini görebilir/yönetebilir
@@ -60,14 +185,21 @@ class SulamaViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
     def get_queryset(self):
         """Kullanıcının yetkili olduğu sulama sistemlerini getir"""
         base_queryset = super().get_queryset()
-        return self.filter_by_sulama_permission(base_queryset, 'id')
+        queryset = self.filter_by_sulama_permission(base_queryset, 'id')
+        if self.action in ('list', 'retrieve'):
+            # Serializer'daki sayılar satır başına COUNT yerine tek sorguda
+            queryset = queryset.annotate(
+                depolama_tesisi_sayisi=iliskili_kayit_sayisi(DepolamaTesisi, 'sulama'),
+                urun_sayisi=iliskili_kayit_sayisi(Urun, 'sulama'),
+            )
+        return queryset
 
     @action(detail=False, methods=['get'])
     def ozet(self, request):
         """Sulama sistemleri özet listesi"""
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = SulamaOzetSerializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.kosullu_yanit(request, lambda: Response(
+            SulamaOzetSerializer(self.filter_queryset(self.get_queryset()), many=True).data
+        ))
 
     @action(detail=True, methods=['get'])
     def istatistikler(self, request, pk=None):
@@ -79,9 +211,9 @@ class SulamaViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
             'kanal_sayisi': Kanal.objects.filter(depolama_tesisi__sulama=sulama).count(),
             'urun_sayisi': sulama.urunler.count(),
             'toplam_yillik_alan': YillikGenelSuTuketimi.objects.filter(sulama=sulama).aggregate(
-                toplam=Sum('alan'))['toplam'] or 0,
+                toplam=Sum('toplam_alan'))['toplam'] or 0,
             'toplam_yillik_tuketim': YillikGenelSuTuketimi.objects.filter(sulama=sulama).aggregate(
-                toplam=Sum('su_tuketimi'))['toplam'] or 0,
+                toplam=Sum('toplam_su_tuketimi'))['toplam'] or 0,
         }
         
         # Son 7 günlük veri sayısı
@@ -94,7 +226,7 @@ class SulamaViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
         return Response(istatistikler)
 
 
-class DepolamaTesisiViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
+class DepolamaTesisiViewSet(KosulluListeMixin, SulamaBazliMixin, viewsets.ModelViewSet):
     """
     Depolama tesisi ViewSet
     """
@@ -111,7 +243,10 @@ class DepolamaTesisiViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
     def get_queryset(self):
         """Kullanıcının yetkili olduğu sulama sistemlerine ait tesisleri getir"""
         base_queryset = super().get_queryset()
-        return self.filter_by_sulama_permission(base_queryset, 'sulama')
+        queryset = self.filter_by_sulama_permission(base_queryset, 'sulama')
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.annotate(kanal_sayisi=iliskili_kayit_sayisi(Kanal, 'depolama_tesisi'))
+        return queryset
 
     @action(detail=True, methods=['post'])
     def su_hacmi_hesapla(self, request, pk=None):
@@ -127,36 +262,36 @@ class DepolamaTesisiViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
         
         try:
             kot = float(kot)
-            
-            # Depolama tesisi abağından su miktarını hesapla
-            try:
-                from .models import DepolamaTesisiAbak
-                abak = depolama_tesisi.abaklar.get(kot=kot)
-                return Response({
-                    'depolama_tesisi_id': depolama_tesisi.id,
-                    'depolama_tesisi_isim': depolama_tesisi.isim,
-                    'kot': kot,
-                    'su_hacmi': abak.hacim,
-                    'success': True
-                })
-            except DepolamaTesisiAbak.DoesNotExist:
-                return Response({
-                    'error': f'Bu depolama tesisi için {kot} m kot değeri abakta bulunamadı',
-                    'depolama_tesisi_id': depolama_tesisi.id,
-                    'depolama_tesisi_isim': depolama_tesisi.isim,
-                    'kot': kot,
-                    'su_hacmi': 0,
-                    'success': False
-                }, status=status.HTTP_400_BAD_REQUEST)
-                
-        except ValueError:
+        except (TypeError, ValueError):
             return Response(
                 {'error': 'Geçersiz kot değeri'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
+        
+        # Depolama tesisi abağından su miktarını hesapla (önbellekteki eğri üzerinden)
+        egri = depolama_abaklari.egri(depolama_tesisi.id)
+        su_hacmi = egri.hacim_bul(kot, interpolasyon=interpolasyon_istendi(request))
+        if su_hacmi is None:
+            return Response({
+                'error': f'Bu depolama tesisi için {kot} m kot değeri abakta bulunamadı',
+                'depolama_tesisi_id': depolama_tesisi.id,
+                'depolama_tesisi_isim': depolama_tesisi.isim,
+                'kot': kot,
+                'su_hacmi': 0,
+                'abak_araligi': [egri.minimum, egri.maksimum],
+                'success': False
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'depolama_tesisi_id': depolama_tesisi.id,
+            'depolama_tesisi_isim': depolama_tesisi.isim,
+            'kot': kot,
+            'su_hacmi': su_hacmi,
+            'success': True
+        })
 
 
-class KanalViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
+class KanalViewSet(KosulluListeMixin, SulamaBazliMixin, viewsets.ModelViewSet):
     """
     Kanal yönetimi ViewSet
     """
@@ -174,14 +309,17 @@ class KanalViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
         """Kullanıcının yetkili olduğu sulama sistemlerine ait kanalları getir"""
         base_queryset = super().get_queryset()
         # Sulama bazlı filtreleme
-        return self.filter_by_sulama_permission(base_queryset, 'depolama_tesisi__sulama')
+        queryset = self.filter_by_sulama_permission(base_queryset, 'depolama_tesisi__sulama')
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.annotate(gunluk_veri_sayisi=iliskili_kayit_sayisi(GunlukSebekeyeAlinanSuMiktari, 'kanal'))
+        return queryset
 
     @action(detail=False, methods=['get'])
     def ozet(self, request):
         """Kanal özet listesi"""
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = KanalOzetSerializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.kosullu_yanit(request, lambda: Response(
+            KanalOzetSerializer(self.filter_queryset(self.get_queryset()), many=True).data
+        ))
 
     @action(detail=True, methods=['get'])
     def son_veriler(self, request, pk=None):
@@ -208,33 +346,33 @@ class KanalViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
         
         try:
             yukseklik = float(yukseklik)
-            
-            # Kanal abağından su miktarını hesapla
-            try:
-                from .models import KanalAbak
-                abak = kanal.abaklar.get(yukseklik=yukseklik)
-                return Response({
-                    'kanal_id': kanal.id,
-                    'kanal_isim': kanal.isim,
-                    'yukseklik': yukseklik,
-                    'su_hacmi': abak.hacim,
-                    'success': True
-                })
-            except KanalAbak.DoesNotExist:
-                return Response({
-                    'error': f'Bu kanal için {yukseklik} m yükseklik değeri abakta bulunamadı',
-                    'kanal_id': kanal.id,
-                    'kanal_isim': kanal.isim,
-                    'yukseklik': yukseklik,
-                    'su_hacmi': 0,
-                    'success': False
-                }, status=status.HTTP_400_BAD_REQUEST)
-                
-        except ValueError:
+        except (TypeError, ValueError):
             return Response(
                 {'error': 'Geçersiz yükseklik değeri'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
+        
+        # Kanal abağından su miktarını hesapla (önbellekteki eğri üzerinden)
+        egri = kanal_abaklari.egri(kanal.id)
+        su_hacmi = egri.hacim_bul(yukseklik, interpolasyon=interpolasyon_istendi(request))
+        if su_hacmi is None:
+            return Response({
+                'error': f'Bu kanal için {yukseklik} m yükseklik değeri abakta bulunamadı',
+                'kanal_id': kanal.id,
+                'kanal_isim': kanal.isim,
+                'yukseklik': yukseklik,
+                'su_hacmi': 0,
+                'abak_araligi': [egri.minimum, egri.maksimum],
+                'success': False
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'kanal_id': kanal.id,
+            'kanal_isim': kanal.isim,
+            'yukseklik': yukseklik,
+            'su_hacmi': su_hacmi,
+            'success': True
+        })
 
 
 class GunlukSebekeyeAlinanSuMiktariViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
@@ -251,40 +389,44 @@ class GunlukSebekeyeAlinanSuMiktariViewSet(SulamaBazliMixin, viewsets.ModelViewS
     search_fields = ['kanal__isim', 'kanal__depolama_tesisi__isim']
     ordering_fields = ['tarih', 'baslangic_saati', 'su_miktari']
     ordering = ['-tarih', '-baslangic_saati']
-    pagination_class = None  # Pagination'ı kaldır
+    # Sadece cursor/page_size parametresi gönderilirse sayfalanır, aksi halde tüm liste döner
+    pagination_class = ZamanSerisiCursorPagination
+    cursor_ordering = ('-tarih', '-baslangic_saati', '-id')
 
     def get_queryset(self):
         """Kullanıcının yetkili olduğu sulama sistemlerine ait verileri getir"""
         base_queryset = super().get_queryset()
         filtered_queryset = self.filter_by_sulama_permission(base_queryset, 'kanal__depolama_tesisi__sulama')
         
-        # URL parametrelerinden tarih filtreleme
+        tarih_araligi = self.tarih_filtresi()
+        if tarih_araligi is not None:
+            filtered_queryset = filtered_queryset.filter(tarih__gte=tarih_araligi[0], tarih__lte=tarih_araligi[1])
+        
+        return filtered_queryset
+
+    def tarih_filtresi(self):
+        """
+        Listeye uygulanan (baslangic, bitis) tarih aralığı - tarih sınırı yoksa None
+
+        baslangic_tarih ve bitis_tarih birlikte verilmelidir; hiçbiri yoksa mevcut ay
+        kullanılır (tarih_araligi action'ı kendi aralığını uygular).
+        """
         baslangic_tarih = self.request.query_params.get('baslangic_tarih')
         bitis_tarih = self.request.query_params.get('bitis_tarih')
         
         if baslangic_tarih and bitis_tarih:
             try:
-                baslangic = datetime.strptime(baslangic_tarih, '%Y-%m-%d').date()
-                bitis = datetime.strptime(bitis_tarih, '%Y-%m-%d').date()
-                filtered_queryset = filtered_queryset.filter(tarih__gte=baslangic, tarih__lte=bitis)
+                return (
+                    datetime.strptime(baslangic_tarih, '%Y-%m-%d').date(),
+                    datetime.strptime(bitis_tarih, '%Y-%m-%d').date(),
+                )
             except ValueError:
-                pass  # Geçersiz tarih formatı durumunda varsayılan filtreleme
-        
-        # Eğer hiç tarih filtresi yoksa, mevcut ayın verilerini getir
-        if not baslangic_tarih and not bitis_tarih:
-            from datetime import date
-            today = date.today()
-            # Ayın ilk günü
-            first_day = today.replace(day=1)
-            # Bir sonraki ayın ilk günü
-            if today.month == 12:
-                next_month = today.replace(year=today.year + 1, month=1, day=1)
-            else:
-                next_month = today.replace(month=today.month + 1, day=1)
-            
-            filtered_queryset = filtered_queryset.filter(tarih__gte=first_day, tarih__lt=next_month)
+                return None  # Geçersiz tarih formatı durumunda tarih filtresi uygulanmaz
         
-        return filtered_queryset
+        if not baslangic_tarih and not bitis_tarih and self.action != 'tarih_araligi':
+            bugun = datetime.now().date()
+            return bugun.replace(day=1), ay_sonu(bugun)
+        return None
 
     @action(detail=False, methods=['get'])
     def tarih_araligi(self, request):
@@ -312,14 +454,69 @@ class GunlukSebekeyeAlinanSuMiktariViewSet(SulamaBazliMixin, viewsets.ModelViewS
             tarih__lte=bitis_tarih
         )
         
+        sayfa = self.paginate_queryset(queryset)
+        if sayfa is not None:
+            return self.get_paginated_response(self.get_serializer(sayfa, many=True).data)
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'])
+    def toplu_yukle(self, request):
+        """
+        Ölçümleri toplu olarak ekle/güncelle
+
+        'kayitlar' listesi (JSON) veya 'dosya' (CSV/XLSX) kabul edilir. Satırlar
+        (kanal, tarih, baslangic_saati) anahtarıyla upsert edilir; su_miktari
+        verilmezse abaktan hesaplanır. Hatalı satırlar ayrıca raporlanır.
+        """
+        return toplu_yukleme_yaniti(self, request, sebeke_su_miktarlarini_yukle, 'sebeke_su_yukleme')
+
+    @action(detail=False, methods=['get'])
+    def disari_aktar(self, request):
+        """Ölçümleri CSV/NDJSON olarak akış halinde indir (liste ile aynı filtreler)"""
+        return disari_aktarma_yaniti(self, request, {
+            'id': 'id',
+            'kanal': 'kanal_id',
+            'kanal_isim': 'kanal__isim',
+            'tarih': 'tarih',
+            'baslangic_saati': 'baslangic_saati',
+            'bitis_saati': 'bitis_saati',
+            'yukseklik': 'yukseklik',
+            'su_miktari': 'su_miktari',
+        }, 'sebeke_su_miktarlari')
+
     @action(detail=False, methods=['get'])
     def ozet_istatistik(self, request):
-        """Su miktarı özet istatistikleri"""
+        """
+        Su miktarı özet istatistikleri
+
+        Tarih aralığı tam ayları kapsıyorsa ve sadece kanal/tesis filtresi varsa
+        ham ölçümler yerine aylık kanal özetleri toplanır.
+        """
         queryset = self.filter_queryset(self.get_queryset())
         
+        tarih_araligi = self.tarih_filtresi()
+        ozetten_okunabilir = (
+            not {'tarih', 'search'} & set(request.query_params)
+            and (tarih_araligi is None or tam_aylar_mi(*tarih_araligi))
+        )
+        if ozetten_okunabilir:
+            ozetler = self.filter_by_sulama_permission(
+                AylikKanalSuOzeti.objects.all(), 'kanal__depolama_tesisi__sulama'
+            )
+            if tarih_araligi is not None:
+                ozetler = ozetler.filter(ay_araligi_q(*tarih_araligi))
+            for parametre, alan in (('kanal', 'kanal_id'), ('kanal__depolama_tesisi', 'kanal__depolama_tesisi_id')):
+                if request.query_params.get(parametre):
+                    ozetler = ozetler.filter(**{alan: request.query_params[parametre]})
+            toplam = ozetler.aggregate(toplam_su=Sum('toplam_su'), kayit_sayisi=Sum('kayit_sayisi'))
+            kayit_sayisi = toplam['kayit_sayisi'] or 0
+            return Response({
+                'toplam_su': toplam['toplam_su'],
+                'ortalama_su': toplam['toplam_su'] / kayit_sayisi if kayit_sayisi else None,
+                'kayit_sayisi': kayit_sayisi,
+            })
+        
         istatistikler = queryset.aggregate(
             toplam_su=Sum('su_miktari'),
             ortalama_su=Avg('su_miktari'),
@@ -342,37 +539,37 @@ class GunlukSebekeyeAlinanSuMiktariViewSet(SulamaBazliMixin, viewsets.ModelViewS
         
         try:
             yukseklik = float(yukseklik)
-            kanal = Kanal.objects.get(id=kanal_id)
-            
-            # Yetki kontrolü
-            if not self.check_sulama_permission(kanal.depolama_tesisi.sulama.id):
-                return Response(
-                    {'error': 'Bu kanala erişim yetkiniz yok'}, 
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            
-            # Kanal abağından su miktarını hesapla
-            try:
-                from .models import KanalAbak
-                abak = kanal.abaklar.get(yukseklik=yukseklik)
-                return Response({
-                    'su_miktari': abak.hacim,
-                    'yukseklik': yukseklik,
-                    'kanal': kanal.isim,
-                    'success': True
-                })
-            except KanalAbak.DoesNotExist:
-                return Response({
-                    'error': f'Bu kanal için {yukseklik} m yükseklik değeri abakta bulunamadı',
-                    'su_miktari': 0,
-                    'success': False
-                }, status=status.HTTP_400_BAD_REQUEST)
-                
-        except (ValueError, Kanal.DoesNotExist) as e:
+            kanal = Kanal.objects.select_related('depolama_tesisi').get(id=kanal_id)
+        except (TypeError, ValueError, Kanal.DoesNotExist):
             return Response(
                 {'error': 'Geçersiz kanal veya yükseklik değeri'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
+        
+        # Yetki kontrolü
+        if not self.check_sulama_permission(kanal.depolama_tesisi.sulama_id):
+            return Response(
+                {'error': 'Bu kanala erişim yetkiniz yok'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        # Kanal abağından su miktarını hesapla (önbellekteki eğri üzerinden)
+        su_miktari = kanal_abaklari.hacim_bul(
+            kanal.id, yukseklik, interpolasyon=interpolasyon_istendi(request)
+        )
+        if su_miktari is None:
+            return Response({
+                'error': f'Bu kanal için {yukseklik} m yükseklik değeri abakta bulunamadı',
+                'su_miktari': 0,
+                'success': False
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'su_miktari': su_miktari,
+            'yukseklik': yukseklik,
+            'kanal': kanal.isim,
+            'success': True
+        })
 
 
 class GunlukDepolamaTesisiSuMiktariViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
@@ -389,7 +586,9 @@ class GunlukDepolamaTesisiSuMiktariViewSet(SulamaBazliMixin, viewsets.ModelViewS
     search_fields = ['depolama_tesisi__isim', 'depolama_tesisi__sulama__isim']
     ordering_fields = ['tarih', 'su_miktari', 'kot']
     ordering = ['-tarih', 'depolama_tesisi']
-    pagination_class = None  # Pagination'ı kaldır
+    # Sadece cursor/page_size parametresi gönderilirse sayfalanır, aksi halde tüm liste döner
+    pagination_class = ZamanSerisiCursorPagination
+    cursor_ordering = ('-tarih', 'depolama_tesisi', 'id')
 
     def get_queryset(self):
         """Kullanıcının yetkili olduğu sulama sistemlerine ait verileri getir"""
@@ -424,6 +623,29 @@ class GunlukDepolamaTesisiSuMiktariViewSet(SulamaBazliMixin, viewsets.ModelViewS
         
         return filtered_queryset
 
+    @action(detail=False, methods=['post'])
+    def toplu_yukle(self, request):
+        """
+        Günlük kot ölçümlerini toplu olarak ekle/güncelle
+
+        'kayitlar' listesi (JSON) veya 'dosya' (CSV/XLSX) kabul edilir. Satırlar
+        (depolama_tesisi, tarih) anahtarıyla upsert edilir; su_miktari verilmezse
+        tesisin abağından hesaplanır. Hatalı satırlar ayrıca raporlanır.
+        """
+        return toplu_yukleme_yaniti(self, request, depolama_su_miktarlarini_yukle, 'depolama_su_yukleme')
+
+    @action(detail=False, methods=['get'])
+    def disari_aktar(self, request):
+        """Ölçümleri CSV/NDJSON olarak akış halinde indir (liste ile aynı filtreler)"""
+        return disari_aktarma_yaniti(self, request, {
+            'id': 'id',
+            'depolama_tesisi': 'depolama_tesisi_id',
+            'depolama_tesisi_isim': 'depolama_tesisi__isim',
+            'tarih': 'tarih',
+            'kot': 'kot',
+            'su_miktari': 'su_miktari',
+        }, 'depolama_su_miktarlari')
+
     @action(detail=False, methods=['get'])
     def son_durum(self, request):
         """Depolama tesislerinin son durumu"""
@@ -519,8 +741,15 @@ class UrunKategorisiViewSet(viewsets.ModelViewSet):
     ordering = ['isim']
     pagination_class = None  # Pagination'ı kaldır
 
+    def get_queryset(self):
+        """Liste ve detayda serializer'daki sayılar annotation olarak gelir"""
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.annotate(urun_sayisi=iliskili_kayit_sayisi(Urun.kategori.through, 'urunkategorisi'))
+        return queryset
+
 
-class UrunViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
+class UrunViewSet(KosulluListeMixin, SulamaBazliMixin, viewsets.ModelViewSet):
     """
     Ürün yönetimi ViewSet
     """
@@ -537,7 +766,10 @@ class UrunViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
     def get_queryset(self):
         """Kullanıcının yetkili olduğu sulama sistemlerine ait ürünleri getir"""
         base_queryset = super().get_queryset()
-        return self.filter_by_sulama_permission(base_queryset, 'sulama')
+        queryset = self.filter_by_sulama_permission(base_queryset, 'sulama')
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.annotate(yillik_tuketim_sayisi=iliskili_kayit_sayisi(YillikUrunDetay, 'urun'))
+        return queryset
 
     def get_serializer_class(self):
         """Tüm görünümlerde UrunSerializer kullan"""
@@ -546,9 +778,9 @@ class UrunViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def ozet(self, request):
         """Ürün özet listesi"""
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = UrunOzetSerializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.kosullu_yanit(request, lambda: Response(
+            UrunOzetSerializer(self.filter_queryset(self.get_queryset()), many=True).data
+        ))
 
     @action(detail=True, methods=['get'])
     def yillik_tuketimler(self, request, pk=None):
@@ -575,6 +807,7 @@ class YillikGenelSuTuketimiViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
     ordering_fields = ['yil', 'olusturma_tarihi']
     ordering = ['-yil', 'sulama']
     pagination_class = None  # Pagination'ı kaldır
+    KARSILASTIRMA_MAKSIMUM_YIL = 51
 
     def get_queryset(self):
         """Kullanıcının yetkili olduğu sulama sistemlerine ait verileri getir"""
@@ -599,99 +832,225 @@ class YillikGenelSuTuketimiViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        queryset = self.get_queryset().filter(yil=yil)
-        
-        # Yeni model yapısı için aggregate'ler
-        toplam_alan = 0
-        toplam_tuketim = 0
-        kayit_sayisi = queryset.count()
-        
-        # Her ana kayıt için detayları topla
-        for ana_kayit in queryset:
-            toplam_alan += ana_kayit.get_toplam_alan()
-            toplam_tuketim += ana_kayit.get_toplam_su_tuketimi()
+        # Tek sorgu: her ana kaydın saklanan özet değerleri (sulama/bölge join'i ile)
+        kayitlar = list(
+            self.get_queryset().filter(yil=yil).prefetch_related(None).order_by(
+                'sulama__bolge__isim', 'sulama__isim'
+            ).values(
+                'sulama__isim', 'sulama__bolge__isim', 'toplam_alan', 'toplam_su_tuketimi',
+                'urun_sayisi', 'ciftlik_randi', 'iletim_randi'
+            )
+        )
+        kayit_sayisi = len(kayitlar)
         
         ozet = {
-            'toplam_alan': toplam_alan,
-            'toplam_tuketim': toplam_tuketim,
-            'ortalama_ciftlik_randi': queryset.aggregate(avg=Avg('ciftlik_randi'))['avg'],
-            'ortalama_iletim_randi': queryset.aggregate(avg=Avg('iletim_randi'))['avg'],
+            'toplam_alan': sum(kayit['toplam_alan'] for kayit in kayitlar),
+            'toplam_tuketim': sum(kayit['toplam_su_tuketimi'] for kayit in kayitlar),
+            'ortalama_ciftlik_randi': (
+                sum(kayit['ciftlik_randi'] for kayit in kayitlar) / kayit_sayisi if kayit_sayisi else None
+            ),
+            'ortalama_iletim_randi': (
+                sum(kayit['iletim_randi'] for kayit in kayitlar) / kayit_sayisi if kayit_sayisi else None
+            ),
             'kayit_sayisi': kayit_sayisi
         }
         
         # Sulama sistemi bazında grupla
-        sulama_ozeti = []
-        for ana_kayit in queryset.select_related('sulama__bolge').prefetch_related('urun_detaylari'):
-            sulama_ozeti.append({
-                'sulama__isim': ana_kayit.sulama.isim,
-                'sulama__bolge__isim': ana_kayit.sulama.bolge.isim,
-                'alan': ana_kayit.get_toplam_alan(),
-                'tuketim': ana_kayit.get_toplam_su_tuketimi(),
-                'urun_sayisi': ana_kayit.urun_detaylari.count()
-            })
+        sulama_ozeti = [
+            {
+                'sulama__isim': kayit['sulama__isim'],
+                'sulama__bolge__isim': kayit['sulama__bolge__isim'],
+                'alan': kayit['toplam_alan'],
+                'tuketim': kayit['toplam_su_tuketimi'],
+                'urun_sayisi': kayit['urun_sayisi']
+            }
+            for kayit in kayitlar
+        ]
         
         return Response({
             'genel_ozet': ozet,
-            'sulama_ozeti': list(sulama_ozeti)
+            'sulama_ozeti': sulama_ozeti
         })
 
     @action(detail=False, methods=['get'])
-    def karsilastirma(self, request):
-        """Yıllar arası karşılaştırma"""
-        yil1 = request.query_params.get('yil1')
-        yil2 = request.query_params.get('yil2')
-        
-        if not yil1 or not yil2:
+    def excel_aktar(self, request):
+        """
+        Kaydedilmiş planı sunucuda hesaplanan değerlerle Excel olarak indir
+
+        Kayıt ?id= ile veya ?sulama=&yil= ile seçilir. ?kurum= başlığa eklenir.
+        ?arka_plan=true ile dosya arka plan işinde üretilir.
+        """
+        params = request.query_params
+        queryset = self.get_queryset().prefetch_related(None)
+        try:
+            if params.get('id'):
+                kayit = queryset.filter(pk=int(params['id'])).first()
+            elif params.get('sulama') and params.get('yil'):
+                kayit = queryset.filter(
+                    sulama_id=int(params['sulama']), yil=int(params['yil'])
+                ).order_by('-olusturma_tarihi', '-id').first()
+            else:
+                return Response(
+                    {'error': 'id veya sulama ve yil parametreleri gerekli'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        except ValueError:
             return Response(
-                {'error': 'İki yıl parametresi gerekli (yil1, yil2)'}, 
+                {'error': 'Geçersiz parametre değeri'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
+
+        if kayit is None:
+            return Response({'error': 'Kayıt bulunamadı'}, status=status.HTTP_404_NOT_FOUND)
+        self.check_object_permissions(request, kayit)
+
+        if arka_plan_istendi(request):
+            return is_kuyruga_alindi_yaniti(is_olustur(
+                'planlama_excel', request.user, kayit_id=kayit.id, kurum=params.get('kurum', '')
+            ))
+
+        dosya_adi, icerik = yillik_planlama_excel(kayit, params.get('kurum', ''))
+        return FileResponse(
+            BytesIO(icerik),
+            as_attachment=True,
+            filename=dosya_adi,
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+
+    @action(detail=False, methods=['post'])
+    def ozetleri_hesapla(self, request):
+        """
+        Saklanan özet değerleri arka plan işinde yeniden hesapla
+
+        'sulama' verilirse o sulamada yönetici yetkisi, verilmezse superuser gerekir.
+        'yil' ile tek yıl seçilebilir.
+        """
+        veri = request.data if hasattr(request.data, 'get') else {}
         try:
-            yil1, yil2 = int(yil1), int(yil2)
-        except ValueError:
+            sulama_id = int(veri['sulama']) if veri.get('sulama') else None
+            yil = int(veri['yil']) if veri.get('yil') else None
+        except (TypeError, ValueError):
             return Response(
-                {'error': 'Geçersiz yıl değerleri'}, 
+                {'error': 'Geçersiz parametre değeri'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+        yetkili = (
+            self.check_sulama_permission(sulama_id, 'YONETICI') if sulama_id
+            else request.user.is_superuser
+        )
+        if not yetkili:
+            return Response(
+                {'error': 'Bu işlem için yetkiniz yok'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        return is_kuyruga_alindi_yaniti(is_olustur(
+            'yillik_ozet_hesaplama', request.user, yil=yil, sulama=sulama_id
+        ))
+
+    def _karsilastirma_yillari(self, request):
+        """
+        Karşılaştırılacak yılları query parametrelerinden oku ve doğrula
         
-        queryset = self.get_queryset()
-        
-        # Yıl 1 verileri
-        queryset1 = queryset.filter(yil=yil1)
-        toplam_alan1 = sum(ana_kayit.get_toplam_alan() for ana_kayit in queryset1)
-        toplam_tuketim1 = sum(ana_kayit.get_toplam_su_tuketimi() for ana_kayit in queryset1)
-        
-        veri1 = {
-            'toplam_alan': toplam_alan1,
-            'toplam_tuketim': toplam_tuketim1,
-            'kayit_sayisi': queryset1.count()
-        }
+        Desteklenen biçimler: yillar=2022,2023,2024 | baslangic_yil=2020&bitis_yil=2024 | yil1=2023&yil2=2024
+        Yıl sayısı liste oluşturulmadan önce sınırlanır; geçersizse mesajıyla ValueError fırlatır.
+        """
+        def yil_oku(deger):
+            try:
+                return int(deger)
+            except (TypeError, ValueError):
+                raise ValueError('Geçersiz yıl değerleri')
+
+        params = request.query_params
+        limit_hatasi = f'En fazla {self.KARSILASTIRMA_MAKSIMUM_YIL} yıl karşılaştırılabilir'
+        if params.get('yillar'):
+            parcalar = [yil for yil in params['yillar'].split(',') if yil.strip()]
+            if len(parcalar) > self.KARSILASTIRMA_MAKSIMUM_YIL:
+                raise ValueError(limit_hatasi)
+            yillar = [yil_oku(yil) for yil in parcalar]
+        elif params.get('baslangic_yil') and params.get('bitis_yil'):
+            baslangic_yil, bitis_yil = yil_oku(params['baslangic_yil']), yil_oku(params['bitis_yil'])
+            if bitis_yil < baslangic_yil:
+                raise ValueError('Bitiş yılı başlangıç yılından küçük olamaz')
+            if bitis_yil - baslangic_yil + 1 > self.KARSILASTIRMA_MAKSIMUM_YIL:
+                raise ValueError(limit_hatasi)
+            yillar = range(baslangic_yil, bitis_yil + 1)
+        elif params.get('yil1') and params.get('yil2'):
+            yillar = [yil_oku(params['yil1']), yil_oku(params['yil2'])]
+        else:
+            yillar = []
+        # Sırayı koruyarak tekrarları at
+        yillar = list(dict.fromkeys(yillar))
+        if len(yillar) < 2:
+            raise ValueError('En az iki yıl gerekli (yil1 ve yil2, yillar=2023,2024 veya baslangic_yil ve bitis_yil)')
+        return yillar
+
+    @action(detail=False, methods=['get'])
+    def karsilastirma(self, request):
+        """Yıllar arası karşılaştırma (iki veya daha fazla yıl)"""
+        try:
+            yillar = self._karsilastirma_yillari(request)
+        except ValueError as hata:
+            return Response({'error': str(hata)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Yıl 2 verileri
-        queryset2 = queryset.filter(yil=yil2)
-        toplam_alan2 = sum(ana_kayit.get_toplam_alan() for ana_kayit in queryset2)
-        toplam_tuketim2 = sum(ana_kayit.get_toplam_su_tuketimi() for ana_kayit in queryset2)
+        # Tek sorgu: (yıl, sulama) bazında gruplanmış toplamlar
+        gruplar = self.get_queryset().filter(yil__in=yillar).prefetch_related(None).order_by().values(
+            'yil', 'sulama', 'sulama__isim', 'sulama__bolge__isim'
+        ).annotate(
+            alan=Sum('toplam_alan'),
+            tuketim=Sum('toplam_su_tuketimi'),
+            kayit=Count('id')
+        ).order_by('sulama__bolge__isim', 'sulama__isim', 'yil')
         
-        veri2 = {
-            'toplam_alan': toplam_alan2,
-            'toplam_tuketim': toplam_tuketim2,
-            'kayit_sayisi': queryset2.count()
+        yillik_veriler = {
+            yil: {'toplam_alan': 0, 'toplam_tuketim': 0, 'kayit_sayisi': 0} for yil in yillar
         }
+        sulama_matrisi = {}
+        for grup in gruplar:
+            veri = yillik_veriler[grup['yil']]
+            veri['toplam_alan'] += grup['alan'] or 0
+            veri['toplam_tuketim'] += grup['tuketim'] or 0
+            veri['kayit_sayisi'] += grup['kayit']
+            
+            satir = sulama_matrisi.setdefault(grup['sulama'], {
+                'sulama': grup['sulama'],
+                'sulama__isim': grup['sulama__isim'],
+                'sulama__bolge__isim': grup['sulama__bolge__isim'],
+                'yillar': {yil: None for yil in yillar}
+            })
+            satir['yillar'][grup['yil']] = {
+                'toplam_alan': grup['alan'] or 0,
+                'toplam_tuketim': grup['tuketim'] or 0
+            }
         
-        # Değişim oranları
-        degisim = {}
-        for key in ['toplam_alan', 'toplam_tuketim']:
-            if veri1[key] and veri2[key]:
-                degisim[key] = round(((veri2[key] - veri1[key]) / veri1[key]) * 100, 2)
-            else:
-                degisim[key] = None
+        def degisim_orani(onceki, sonraki):
+            degisim = {}
+            for key in ['toplam_alan', 'toplam_tuketim']:
+                if onceki[key] and sonraki[key]:
+                    degisim[key] = round(((sonraki[key] - onceki[key]) / onceki[key]) * 100, 2)
+                else:
+                    degisim[key] = None
+            return degisim
         
-        return Response({
-            f'{yil1}_veriler': veri1,
-            f'{yil2}_veriler': veri2,
-            'degisim_oranlari': degisim
+        ilk_yil, son_yil = yillar[0], yillar[-1]
+        yanit = {f'{yil}_veriler': yillik_veriler[yil] for yil in yillar}
+        yanit.update({
+            'yillar': yillar,
+            # İlk yıldan son yıla değişim oranları
+            'degisim_oranlari': degisim_orani(yillik_veriler[ilk_yil], yillik_veriler[son_yil]),
+            # Ardışık yıllar arası değişim oranları
+            'yillik_degisim_oranlari': [
+                {
+                    'onceki_yil': onceki_yil,
+                    'yil': yil,
+                    **degisim_orani(yillik_veriler[onceki_yil], yillik_veriler[yil])
+                }
+                for onceki_yil, yil in zip(yillar, yillar[1:])
+            ],
+            'sulama_karsilastirmasi': list(sulama_matrisi.values())
         })
+        return Response(yanit)
 
     @action(detail=False, methods=['post'])
     def bulk_create(self, request):
@@ -725,12 +1084,8 @@ class YillikGenelSuTuketimiViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
                 from .models import Sulama
                 sulama = Sulama.objects.get(id=sulama_id)
                 
-                # Yetki kontrolü - SulamaBazliMixin'deki filter_by_sulama_permission kullan
-                allowed_sulamalar = self.filter_by_sulama_permission(
-                    Sulama.objects.all(), 'id'
-                ).values_list('id', flat=True)
-                
-                if sulama_id not in allowed_sulamalar:
+                # Yetki kontrolü - SulamaBazliMixin'deki istek başına okunan yetkiler
+                if not self.check_sulama_permission(sulama_id):
                     return Response(
                         {'error': 'Bu sulama sistemine erişim yetkiniz yok'}, 
                         status=status.HTTP_403_FORBIDDEN
@@ -742,66 +1097,42 @@ class YillikGenelSuTuketimiViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Önce mevcut yıl verilerini sil (ana tablo ve detaylar)
-            self.get_queryset().filter(sulama=sulama, yil=yil).delete()
-            
-            # Ana kaydı oluştur
-            yillik_tuketim = YillikGenelSuTuketimi.objects.create(
-                yil=yil,
-                sulama=sulama,
-                ciftlik_randi=ciftlik_randi,
-                iletim_randi=iletim_randi
-            )
-            
-            # Ürün detaylarını hazırla
-            urun_detaylari = []
+            # Ürün satırlarını yazmadan önce doğrula (aynı ürün birden çok kez gelirse son satır geçerli)
+            gelen_satirlar = {}
             for row in table_data:
                 if not row.get('urun') or not row.get('ekim_alani'):
                     continue  # Boş satırları atla
-                
+
                 try:
-                    urun_id = int(row['urun'])
-                    ekim_alani = float(row['ekim_alani'])
-                    ekim_orani = float(row.get('ekim_orani', 100))
-                    
-                    # Su tüketimini hesapla (m³ cinsinden)
-                    su_tuketimi = float(row.get('su_tuketimi', 0))
-                    
-                    urun_detay = YillikUrunDetay(
-                        yillik_tuketim=yillik_tuketim,
-                        urun_id=urun_id,
-                        alan=ekim_alani,  # Artık hektar cinsinden
-                        ekim_orani=ekim_orani,
-                        su_tuketimi=su_tuketimi
-                    )
-                    urun_detaylari.append(urun_detay)
-                    
+                    gelen_satirlar[int(row['urun'])] = {
+                        'alan': float(row['ekim_alani']),  # Hektar cinsinden
+                        'ekim_orani': float(row.get('ekim_orani', 100)),
+                        # Su tüketimi (m³ cinsinden)
+                        'su_tuketimi': float(row.get('su_tuketimi', 0)),
+                    }
                 except (ValueError, TypeError) as e:
-                    # Ana kayıt oluşturuldu ama hata var, ana kaydı da sil
-                    yillik_tuketim.delete()
                     return Response(
                         {'error': f'Geçersiz veri: {str(e)}'}, 
                         status=status.HTTP_400_BAD_REQUEST
                     )
-            
-            if not urun_detaylari:
-                # Ana kayıt oluşturuldu ama detay yok, ana kaydı da sil
-                yillik_tuketim.delete()
+
+            if not gelen_satirlar:
                 return Response(
                     {'error': 'Kaydedilecek geçerli veri bulunamadı'}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            
-            # Ürün detaylarını toplu kaydet
-            YillikUrunDetay.objects.bulk_create(urun_detaylari)
-            
-            return Response({
-                'message': f'{len(urun_detaylari)} adet ürün detayı başarıyla kaydedildi',
-                'ana_kayit_id': yillik_tuketim.id,
-                'urun_detay_sayisi': len(urun_detaylari),
-                'yil': yil,
-                'sulama': sulama.isim
-            }, status=status.HTTP_201_CREATED)
+
+            if arka_plan_istendi(request):
+                return is_kuyruga_alindi_yaniti(is_olustur(
+                    'yillik_tuketim_kaydet', request.user,
+                    sulama=sulama_id, yil=yil, ciftlik_randi=ciftlik_randi, iletim_randi=iletim_randi,
+                    satirlar=[[urun_id, degerler] for urun_id, degerler in gelen_satirlar.items()],
+                ))
+
+            return Response(
+                yillik_tuketim_detaylarini_kaydet(sulama, yil, ciftlik_randi, iletim_randi, gelen_satirlar),
+                status=status.HTTP_201_CREATED
+            )
             
         except (ValueError, TypeError) as e:
             return Response(
@@ -836,6 +1167,109 @@ class YillikUrunDetayViewSet(SulamaBazliMixin, viewsets.ModelViewSet):
         return self.filter_by_sulama_permission(base_queryset, 'yillik_tuketim__sulama')
 
 
+class AbakHesaplamaViewSet(SulamaBazliMixin, viewsets.ViewSet):
+    """
+    Abak hesaplama ViewSet
+    Çok sayıda yükseklik/kot okumasının hacmini tek istekte hesaplar
+    """
+    permission_classes = [SulamaYetkisiPermission]
+    MAKSIMUM_OLCUM_SAYISI = 1000
+
+    @action(detail=False, methods=['post'])
+    def toplu_hacim_hesapla(self, request):
+        """
+        Toplu hacim hesaplama
+        
+        Girdi: {"olcumler": [{"kanal": 1, "yukseklik": 0.45}, {"depolama_tesisi": 2, "kot": 812.3}, ...],
+                "interpolasyon": true}
+        Sonuçlar girdi sırasıyla döner; hatalı satırlar tüm isteği iptal etmez.
+        """
+        olcumler = request.data.get('olcumler')
+        if not isinstance(olcumler, list) or not olcumler:
+            return Response(
+                {'error': 'olcumler listesi gerekli'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(olcumler) > self.MAKSIMUM_OLCUM_SAYISI:
+            return Response(
+                {'error': f'Tek istekte en fazla {self.MAKSIMUM_OLCUM_SAYISI} ölçüm gönderilebilir'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        interpolasyon = interpolasyon_istendi(request)
+        
+        # 1. Girdileri ayrıştır
+        sonuclar = []
+        for sira, olcum in enumerate(olcumler):
+            sonuc = {'sira': sira, 'su_hacmi': 0, 'success': False}
+            sonuclar.append(sonuc)
+            if not isinstance(olcum, dict):
+                sonuc['error'] = 'Geçersiz ölçüm formatı'
+                continue
+            try:
+                if olcum.get('kanal') is not None:
+                    sonuc['kanal'] = int(olcum['kanal'])
+                    sonuc['yukseklik'] = float(olcum['yukseklik'])
+                elif olcum.get('depolama_tesisi') is not None:
+                    sonuc['depolama_tesisi'] = int(olcum['depolama_tesisi'])
+                    sonuc['kot'] = float(olcum['kot'])
+                else:
+                    sonuc['error'] = 'kanal veya depolama_tesisi gerekli'
+            except (KeyError, TypeError, ValueError):
+                sonuc['error'] = 'Geçersiz kanal/depolama tesisi veya yükseklik/kot değeri'
+        
+        gecerli = [sonuc for sonuc in sonuclar if 'error' not in sonuc]
+        kanal_idleri = {sonuc['kanal'] for sonuc in gecerli if 'kanal' in sonuc}
+        tesis_idleri = {sonuc['depolama_tesisi'] for sonuc in gecerli if 'depolama_tesisi' in sonuc}
+        
+        # 2. Tesislerin sulama sistemlerini tek sorguda çöz, yetkiyi sulama başına bir kez kontrol et
+        kanal_sulamalari = dict(
+            Kanal.objects.filter(id__in=kanal_idleri).values_list('id', 'depolama_tesisi__sulama_id')
+        ) if kanal_idleri else {}
+        tesis_sulamalari = dict(
+            DepolamaTesisi.objects.filter(id__in=tesis_idleri).values_list('id', 'sulama_id')
+        ) if tesis_idleri else {}
+        yetkiler = {
+            sulama_id: self.check_sulama_permission(sulama_id)
+            for sulama_id in set(kanal_sulamalari.values()) | set(tesis_sulamalari.values())
+        }
+        
+        # 3. Eğrileri tesis türü başına tek sorguda yükle
+        kanal_egrileri = kanal_abaklari.egriler(
+            [kanal_id for kanal_id, sulama_id in kanal_sulamalari.items() if yetkiler[sulama_id]]
+        )
+        tesis_egrileri = depolama_abaklari.egriler(
+            [tesis_id for tesis_id, sulama_id in tesis_sulamalari.items() if yetkiler[sulama_id]]
+        )
+        
+        # 4. Hacimleri girdi sırasıyla hesapla
+        for sonuc in gecerli:
+            if 'kanal' in sonuc:
+                sahip_id, deger, sulamalar, egriler = sonuc['kanal'], sonuc['yukseklik'], kanal_sulamalari, kanal_egrileri
+                bulunamadi = f"Bu kanal için {deger} m yükseklik değeri abakta bulunamadı"
+            else:
+                sahip_id, deger, sulamalar, egriler = sonuc['depolama_tesisi'], sonuc['kot'], tesis_sulamalari, tesis_egrileri
+                bulunamadi = f"Bu depolama tesisi için {deger} m kot değeri abakta bulunamadı"
+            
+            if sahip_id not in sulamalar:
+                sonuc['error'] = 'Kanal veya depolama tesisi bulunamadı'
+            elif not yetkiler[sulamalar[sahip_id]]:
+                sonuc['error'] = 'Bu kanal veya depolama tesisine erişim yetkiniz yok'
+            else:
+                su_hacmi = egriler[sahip_id].hacim_bul(deger, interpolasyon=interpolasyon)
+                if su_hacmi is None:
+                    sonuc['error'] = bulunamadi
+                else:
+                    sonuc['su_hacmi'] = su_hacmi
+                    sonuc['success'] = True
+        
+        basarili_sayisi = sum(1 for sonuc in sonuclar if sonuc['success'])
+        return Response({
+            'sonuclar': sonuclar,
+            'basarili_sayisi': basarili_sayisi,
+            'hatali_sayisi': len(sonuclar) - basarili_sayisi
+        })
+
+
 class DashboardViewSet(SulamaBazliMixin, viewsets.ViewSet):
     """
     Dashboard verileri ViewSet
@@ -850,6 +1284,9 @@ class DashboardViewSet(SulamaBazliMixin, viewsets.ViewSet):
         1. Şebekeye Alınan Su (GunlukSebekeyeAlinanSuMiktari)
         2. Depolama Tesisindeki Su (GunlukDepolamaTesisiSuMiktari) 
         3. Genel Su Tüketimi (YillikGenelSuTuketimi)
+
+        Yanıt sürümlü önbellekten gelir (bkz. sulama/dashboard.py); X-Onbellek başlığı
+        HIT, STALE veya MISS değerini taşır.
         """
         try:
             # Parametreler
@@ -861,185 +1298,73 @@ class DashboardViewSet(SulamaBazliMixin, viewsets.ViewSet):
             except (ValueError, TypeError):
                 yil = datetime.now().year
 
-            # Base queryset'leri hazırla
-            sebeke_qs = GunlukSebekeyeAlinanSuMiktari.objects.filter(tarih__year=yil)
-            depolama_qs = GunlukDepolamaTesisiSuMiktari.objects.filter(tarih__year=yil)
-            tuketim_qs = YillikGenelSuTuketimi.objects.filter(yil=yil)
-
-            # Sulama filtreleme
             if sulama_id:
                 try:
                     sulama_id = int(sulama_id)
-                    sebeke_qs = sebeke_qs.filter(kanal__depolama_tesisi__sulama_id=sulama_id)
-                    depolama_qs = depolama_qs.filter(depolama_tesisi__sulama_id=sulama_id)
-                    tuketim_qs = tuketim_qs.filter(sulama_id=sulama_id)
                 except (ValueError, TypeError):
-                    pass
-
-            # Yetki kontrolü
-            sebeke_qs = self.filter_by_sulama_permission(sebeke_qs, 'kanal__depolama_tesisi__sulama')
-            depolama_qs = self.filter_by_sulama_permission(depolama_qs, 'depolama_tesisi__sulama')
-            tuketim_qs = self.filter_by_sulama_permission(tuketim_qs, 'sulama')
-
-            # Aylar için boş veri yapısı
-            aylik_veri = {}
-            aylar = [
-                ('01', 'Ocak'), ('02', 'Şubat'), ('03', 'Mart'), ('04', 'Nisan'),
-                ('05', 'Mayıs'), ('06', 'Haziran'), ('07', 'Temmuz'), ('08', 'Ağustos'),
-                ('09', 'Eylül'), ('10', 'Ekim'), ('11', 'Kasım'), ('12', 'Aralık')
-            ]
-
-            for ay_no, ay_isim in aylar:
-                aylik_veri[ay_no] = {
-                    'ay': ay_isim,
-                    'ay_no': int(ay_no),
-                    'sebeke_su': 0,  # Şebekeye alınan toplam su (m³)
-                    'depolama_su': 0,  # Depolamadaki ortalama su (m³)
-                    'tuketim_su': 0,  # Genel tüketim (m³)
-                    'sebeke_kayit_sayisi': 0,
-                    'depolama_kayit_sayisi': 0,
-                    'tuketim_kayit_sayisi': 0
-                }
+                    sulama_id = None
+            else:
+                sulama_id = None
 
-            # 1. Şebekeye Alınan Su (Aylık toplam)
-            sebeke_veriler = sebeke_qs.annotate(
-                ay=Extract('tarih', 'month')
-            ).values('ay').annotate(
-                toplam_su=Sum('su_miktari'),
-                kayit_sayisi=Count('id')
+            # Yetki kapsamı (superuser için None: tüm sulamalar)
+            yetkiler = self.get_sulama_yetkileri()
+            veri, onbellek_durumu = aylik_su_kullanimi(
+                yil, sulama_id, None if yetkiler is None else list(yetkiler)
             )
+            response = Response(veri)
+            response['X-Onbellek'] = onbellek_durumu
+            return response
 
-            for veri in sebeke_veriler:
-                ay = f"{veri['ay']:02d}"  # 01, 02, 03 formatında
-                if ay in aylik_veri:
-                    aylik_veri[ay]['sebeke_su'] = float(veri['toplam_su'] or 0)
-                    aylik_veri[ay]['sebeke_kayit_sayisi'] = veri['kayit_sayisi']
-
-            # 2. Depolama Tesisindeki Su (Her ay için son tarihteki toplam)
-            from django.db.models import Max
-            
-            for ay_idx, (ay_no, _) in enumerate(aylar):
-                ay_num = int(ay_no)
-                
-                # Bu ay için her depolama tesisinin son kaydını al
-                aylik_depolama_toplam = 0
-                aylik_depolama_kayit = 0
-                
-                # Yetkili depolama tesislerini al
-                yetkili_tesisler = DepolamaTesisi.objects.filter(
-                    gunluk_depolama_tesisi_su_miktarlari__in=depolama_qs
-                ).distinct()
-                
-                for tesis in yetkili_tesisler:
-                    # Bu tesis için bu ayın son kaydını al
-                    son_kayit = depolama_qs.filter(
-                        depolama_tesisi=tesis,
-                        tarih__month=ay_num
-                    ).order_by('-tarih').first()
-                    
-                    if son_kayit:
-                        aylik_depolama_toplam += float(son_kayit.su_miktari or 0)
-                        aylik_depolama_kayit += 1
-                
-                aylik_veri[ay_no]['depolama_su'] = aylik_depolama_toplam
-                aylik_veri[ay_no]['depolama_kayit_sayisi'] = aylik_depolama_kayit
+        except Exception as e:
+            return Response(
+                {'error': f'Dashboard verileri alınırken hata oluştu: {str(e)}'}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
 
-            # 3. Genel Su Tüketimi (Yeni model yapısı ile hesaplama)
-            ana_tuketim_kayitlari = tuketim_qs.prefetch_related('urun_detaylari__urun').all()
-            tuketim_kayit_sayisi = len(ana_tuketim_kayitlari)
-            
-            # Her ay için tüketim hesapla
-            for ay_idx, (ay_no, _) in enumerate(aylar):
-                aylik_tuketim = 0
-                
-                for ana_kayit in ana_tuketim_kayitlari:
-                    # Bu ana kayıt altındaki tüm ürün detayları
-                    for urun_detay in ana_kayit.urun_detaylari.all():
-                        # Alan (hektar)
-                        alan_ha = urun_detay.alan
-                        
-                        # Ürünün aylık UR değerlerini al
-                        urun = urun_detay.urun
-                        aylik_ur_degerleri = [
-                            urun.ocak or 0, urun.subat or 0, urun.mart or 0,
-                            urun.nisan or 0, urun.mayis or 0, urun.haziran or 0,
-                            urun.temmuz or 0, urun.agustos or 0, urun.eylul or 0,
-                            urun.ekim or 0, urun.kasim or 0, urun.aralik or 0
-                        ]
-                        
-                        if len(aylik_ur_degerleri) >= 12:
-                            # Bu ayın UR değeri
-                            bu_ay_ur = aylik_ur_degerleri[ay_idx]
-                            
-                            # NET SU İHTİYACI hesaplaması (Frontend'deki gibi)
-                            # Alan × UR değeri ÷ 100000 (hm³ cinsinden)
-                            net_su_degeri = (alan_ha * bu_ay_ur) / 100000
-                            
-                            # m³ cinsine çevir (× 1000000)
-                            bu_ay_tuketim_m3 = net_su_degeri * 1000000
-                            aylik_tuketim += bu_ay_tuketim_m3
-                        else:
-                            # UR değerleri yoksa eşit dağıt (fallback)
-                            aylik_tuketim += urun_detay.su_tuketimi / 12
-                
-                aylik_veri[ay_no]['tuketim_su'] = float(aylik_tuketim)
-                aylik_veri[ay_no]['tuketim_kayit_sayisi'] = tuketim_kayit_sayisi
+    @action(detail=False, methods=['get'])
+    def onbellek_istatistikleri(self, request):
+        """Dashboard önbelleği isabet/ıska sayaçları (sadece superuser)"""
+        if not request.user.is_superuser:
+            return Response(
+                {'error': 'Bu işlem için yetkiniz yok'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response(onbellek_istatistikleri())
 
-            # Toplam yıllık tüketimi hesapla
-            toplam_yillik_tuketim = sum(aylik_veri[ay_no]['tuketim_su'] for ay_no, _ in aylar)
 
-            # Sıralı liste haline getir
-            aylik_liste = [aylik_veri[ay_no] for ay_no, _ in aylar]
+class ArkaPlanIsiViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Arka plan işlerinin durumu ve sonuç dosyası
 
-            # Güncel depo durumu vs Gelecek ihtiyaç analizi
-            guncel_ay = datetime.now().month
-            guncel_depo_miktari = 0
-            gelecek_ihtiyac = 0
-            
-            # Güncel ayın depo miktarı (tüm depoların toplamı)
-            if guncel_ay <= 12:
-                guncel_ay_str = f"{guncel_ay:02d}"
-                guncel_depo_miktari = aylik_veri[guncel_ay_str]['depolama_su']
-            
-            # Güncel aydan sonraki ayların planlanan tüketimi
-            for ay_idx in range(guncel_ay, 12):  # Güncel aydan sonraki aylar
-                ay_no = f"{ay_idx + 1:02d}"
-                if ay_no in aylik_veri:
-                    gelecek_ihtiyac += aylik_veri[ay_no]['tuketim_su']
-            
-            # Yeterlilik durumu
-            yeterlilik_durumu = "Yeterli" if guncel_depo_miktari >= gelecek_ihtiyac else "Yetersiz"
-            yeterlilik_orani = (guncel_depo_miktari / gelecek_ihtiyac * 100) if gelecek_ihtiyac > 0 else 100
-
-            # Toplam istatistikler
-            toplam_istatistikler = {
-                'toplam_sebeke_su': sum(veri['sebeke_su'] for veri in aylik_liste),
-                'toplam_depolama_su': sum(veri['depolama_su'] for veri in aylik_liste),
-                'toplam_tuketim_su': toplam_yillik_tuketim,
-                'toplam_sebeke_kayit': sum(veri['sebeke_kayit_sayisi'] for veri in aylik_liste),
-                'toplam_depolama_kayit': sum(veri['depolama_kayit_sayisi'] for veri in aylik_liste),
-                'toplam_tuketim_kayit': tuketim_kayit_sayisi,
-                'yil': yil,
-                'sulama_id': sulama_id,
-                # Yeni eklenen analizler
-                'guncel_depo_miktari': guncel_depo_miktari,
-                'gelecek_ihtiyac': gelecek_ihtiyac,
-                'yeterlilik_durumu': yeterlilik_durumu,
-                'yeterlilik_orani': round(yeterlilik_orani, 1),
-                'guncel_ay': guncel_ay
-            }
+    Kullanıcı kendi işlerini, superuser tüm işleri görür.
+    """
+    queryset = ArkaPlanIsi.objects.all()
+    serializer_class = ArkaPlanIsiSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['tur', 'durum']
+    ordering = ['-olusturma_tarihi']
 
-            return Response({
-                'aylik_veriler': aylik_liste,
-                'istatistikler': toplam_istatistikler,
-                'success': True
-            })
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.request.user.is_superuser:
+            queryset = queryset.filter(kullanici=self.request.user)
+        return queryset
 
-        except Exception as e:
+    @action(detail=True, methods=['get'])
+    def indir(self, request, pk=None):
+        """Tamamlanan işin sonuç dosyasını indir"""
+        is_ = self.get_object()
+        if is_.durum != 'TAMAMLANDI' or not is_.sonuc_dosyasi:
             return Response(
-                {'error': f'Dashboard verileri alınırken hata oluştu: {str(e)}'}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {'error': 'İşin indirilebilir bir sonucu yok', 'durum': is_.durum},
+                status=status.HTTP_404_NOT_FOUND
             )
+        return FileResponse(
+            is_.sonuc_dosyasi.open('rb'),
+            as_attachment=True,
+            filename=os.path.basename(is_.sonuc_dosyasi.name),
+        )
 
 
 @csrf_exempt
@@ -1055,55 +1380,25 @@ def export_to_excel_with_template(request):
         kurum_adi = formData.get("kurumAdi", "Kurum")
         genel_adi = "GenelSulamaPlanlaması"
 
-        # Şablon dosyanın tam yolu:
-        BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        template_path = os.path.join(BASE_DIR, "excel_templates", "Kitap1.xlsx")
-        temp_path = os.path.join(BASE_DIR, "excel_templates", f"temp_{yil}_{sulama_adi}.xlsx")
-
-        shutil.copy(template_path, temp_path)
-        wb = load_workbook(temp_path)
-        ws = wb.active
-
-        ws["A1"] = f"{yil} {kurum_adi} {sulama_adi} {genel_adi}"
-
-        start_row = 4
-        for i, row in enumerate(tableData, start=start_row):
-            ws[f"A{i}"] = row.get("urun", "")
-            ws[f"B{i}"] = row.get("ekim_alani", "")
-            ws[f"C{i}"] = row.get("ekim_orani", "")
-            ur_values = row.get("ur_values", [])
-            for j, val in enumerate(ur_values):
-                col_letter = chr(ord("D") + j)
-                ws[f"{col_letter}{i}"] = val
-            ws[f"P{i}"] = row.get("toplam_ur", "")
-            ws[f"Q{i}"] = row.get("su_tuketimi", "")
-
-        result_labels = [
-            ("NET SU İHTİYACI (hm³)", results.get("net_su_aylik", []), results.get("net_su_toplam", "")),
-            ("ÇİFTLİK SU İHTİYACI (hm³)", results.get("ciftlik_su_aylik", []), results.get("ciftlik_su_toplam", "")),
-            ("BRÜT SU İHTİYACI (hm³)", results.get("brut_su_aylik", []), results.get("brut_su_toplam", "")),
-        ]
-        for offset, (label, aylik, toplam) in enumerate(result_labels):
-            result_row = start_row + len(tableData) + 2 + offset
-            ws[f"A{result_row}"] = label
-            for j, val in enumerate(aylik):
-                col_letter = chr(ord("D") + j)
-                ws[f"{col_letter}{result_row}"] = val
-            ws[f"P{result_row}"] = toplam
-
-        from io import BytesIO
-        output = BytesIO()
-        wb.save(output)
-        wb.close()
-        os.remove(temp_path)
-        output.seek(0)
+        # Net/çiftlik/brüt ihtiyaçlar tablo verisinden sunucu tarafında hesaplanır
+        if tableData:
+            results = {**results, **SuIhtiyaciMotoru.from_tablo(
+                tableData,
+                formData.get("ciftlikRandi", 80),
+                formData.get("iletimRandi", 85),
+            ).sonuc()}
+
+        # Şablon süreç başına bir kez ayrıştırılır, her istek bellekte kendi kopyasını kullanır
+        output = BytesIO(planlama_excel_dosyasi(
+            f"{yil} {kurum_adi} {sulama_adi} {genel_adi}", tableData, results
+        ))
 
         filename = f"{yil}_{sulama_adi}_{genel_adi}.xlsx"
-        response = HttpResponse(
-            output.read(),
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename=filename,
             content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
-        response["Content-Disposition"] = f'attachment; filename="{filename}"'
-        return response
 
     return JsonResponse({"error": "Invalid request"}, status=400)
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+Uç nokta bazında Prometheus metrikleri
+
+MetrikMiddleware her isteği çözümlenen rota ve viewset action'ı ile etiketleyip süre,
+veritabanı sorgu sayısı ve süresi, yanıt boyutu ve durum kodunu kaydeder; /metrics bunları
+Prometheus metin biçiminde döner. Sorgular DEBUG'dan bağımsız olarak
+connection.execute_wrapper ile sayılır (sorgu başına tek fonksiyon çağrısı).
+
+Gunicorn'daki her worker ayrı süreç olduğundan PROMETHEUS_MULTIPROC_DIR ayarlıysa
+prometheus_client değerleri bu dizindeki mmap dosyalarına yazar ve /metrics tüm
+worker'ların dosyalarını toplar; dizin gunicorn.conf.py'de başlangıçta temizlenir.
+"""
+import hmac
+import os
+import re
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse, JsonResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+
+SURE_KOVALARI = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SORGU_KOVALARI = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+BOYUT_KOVALARI = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Eşleşmeyen adresler tek etikette toplanır; taramalar etiket sayısını şişirmez
+ESLESMEYEN_ROTA = '<eslesmeyen>'
+
+ETIKETLER = ['rota', 'islem', 'yontem']
+
+ISTEKLER = Counter(
+    'gsp_http_istekler', 'Rota ve durum koduna göre istek sayısı', ETIKETLER + ['durum']
+)
+ISTEK_SURESI = Histogram(
+    'gsp_http_istek_suresi_saniye', 'İsteğin karşılanma süresi', ETIKETLER, buckets=SURE_KOVALARI
+)
+SORGU_SAYISI = Histogram(
+    'gsp_http_istek_sorgu_sayisi', 'İstek başına veritabanı sorgu sayısı', ETIKETLER, buckets=SORGU_KOVALARI
+)
+SORGU_SURESI = Histogram(
+    'gsp_http_istek_sorgu_suresi_saniye', 'İstek başına veritabanı sorgularında geçen süre', ETIKETLER,
+    buckets=SURE_KOVALARI
+)
+YANIT_BOYUTU = Histogram(
+    'gsp_http_yanit_boyutu_bayt', 'Yanıt gövdesinin boyutu', ETIKETLER, buckets=BOYUT_KOVALARI
+)
+
+
+@lru_cache(maxsize=512)
+def _rota_adi(rota):
+    """Router'ın regex rotasını okunur hale getir: 'kanallar/(?P<pk>[^/.]+)/$' -> 'kanallar/<pk>/'"""
+    rota = re.sub(r'\(\?P<(\w+)>[^)]*\)', r'<\1>', rota)
+    return rota.replace('^', '').replace('\\.', '.').removesuffix('$').removesuffix('/?')
+
+
+def _istek_etiketleri(request):
+    eslesme = request.resolver_match
+    if eslesme is None:
+        return ESLESMEYEN_ROTA, '', request.method
+    gorunum = eslesme.func
+    sinif = getattr(gorunum, 'cls', None) or getattr(gorunum, 'view_class', None)
+    islem = sinif.__name__ if sinif else gorunum.__name__
+    # ViewSet'lerde aynı rota birden fazla action'a gider (GET list / POST create)
+    action = (getattr(gorunum, 'actions', None) or {}).get(request.method.lower())
+    if action:
+        islem = f'{islem}.{action}'
+    return '/' + _rota_adi(eslesme.route), islem, request.method
+
+
+class _SorguSayaci:
+    """connection.execute_wrapper ile sorgu sayısını ve süresini toplar"""
+
+    def __init__(self):
+        self.sayi = 0
+        self.sure = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        baslangic = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sure += time.perf_counter() - baslangic
+            self.sayi += 1
+
+
+def _kaydet(etiketler, durum, sure, sayac, boyut):
+    ISTEKLER.labels(*etiketler, str(durum)).inc()
+    ISTEK_SURESI.labels(*etiketler).observe(sure)
+    SORGU_SAYISI.labels(*etiketler).observe(sayac.sayi)
+    SORGU_SURESI.labels(*etiketler).observe(sayac.sure)
+    YANIT_BOYUTU.labels(*etiketler).observe(boyut)
+
+
+class MetrikMiddleware:
+    """
+    İstek metriklerini kaydeder. Oturum/kimlik doğrulama sorguları da ölçülsün diye
+    MIDDLEWARE listesinin başında yer almalıdır.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRIKLER_ETKIN:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sayac = _SorguSayaci()
+        baslangic = time.perf_counter()
+        with connection.execute_wrapper(sayac):
+            yanit = self.get_response(request)
+
+        eslesme = request.resolver_match
+        if eslesme is not None and eslesme.func is metrikler_gorunumu:
+            return yanit
+        etiketler = _istek_etiketleri(request)
+        if yanit.streaming and not getattr(yanit, 'is_async', False):
+            # Akış yanıtlarında (CSV/Excel dışa aktarım) asıl iş gövde okunurken yapılır
+            yanit.streaming_content = self._akisi_olc(yanit.streaming_content, etiketler, yanit.status_code, baslangic, sayac)
+        else:
+            boyut = 0 if yanit.streaming else len(yanit.content)
+            _kaydet(etiketler, yanit.status_code, time.perf_counter() - baslangic, sayac, boyut)
+        return yanit
+
+    @staticmethod
+    def _akisi_olc(icerik, etiketler, durum, baslangic, sayac):
+        boyut = 0
+        try:
+            with connection.execute_wrapper(sayac):
+                for parca in icerik:
+                    boyut += len(parca)
+                    yield parca
+        finally:
+            _kaydet(etiketler, durum, time.perf_counter() - baslangic, sayac, boyut)
+
+
+def _erisim_izni_var_mi(request):
+    token = settings.METRIK_ERISIM_TOKENI
+    if token:
+        yetki = request.META.get('HTTP_AUTHORIZATION', '')
+        if hmac.compare_digest(yetki.encode(), f'Bearer {token}'.encode()):
+            return True
+    return request.META.get('REMOTE_ADDR') in settings.METRIK_IZINLI_IPLER
+
+
+def metrikler_gorunumu(request):
+    """Prometheus metin biçiminde metrikler (tüm gunicorn worker'ları toplanmış)"""
+    if not _erisim_izni_var_mi(request):
+        return JsonResponse({'error': 'Metriklere erişim yetkiniz yok'}, status=403)
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        kayit = CollectorRegistry()
+        multiprocess.MultiProcessCollector(kayit)
+    else:
+        kayit = REGISTRY
+    return HttpResponse(generate_latest(kayit), content_type=CONTENT_TYPE_LATEST)
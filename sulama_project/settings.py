@@ -55,6 +55,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "sulama_project.metrikler.MetrikMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -122,6 +123,38 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 50,
 }
 
+# Abak eğrisi önbelleğinin üst yaşam süresi (saniye); değişiklikler abak_surumu ile her okumada görülür
+ABAK_ONBELLEK_SURESI = env.int('ABAK_ONBELLEK_SURESI', default=300)
+
+# Kullanıcı sulama yetkilerinin istekler arası önbellekte tutulma süresi (saniye, 0: kapalı)
+SULAMA_YETKI_ONBELLEK_SURESI = env.int('SULAMA_YETKI_ONBELLEK_SURESI', default=0)
+
+# Sulama planlaması Excel dışa aktarım şablonu
+EXCEL_SABLON_YOLU = env('EXCEL_SABLON_YOLU', default=str(BASE_DIR / 'excel_templates' / 'Kitap1.xlsx'))
+
+# Kayıttan üretilen planlama Excel dosyalarının önbellekte tutulma süresi (saniye)
+PLANLAMA_EXCEL_ONBELLEK_SURESI = env.int('PLANLAMA_EXCEL_ONBELLEK_SURESI', default=86400)
+
+# Dashboard yanıt önbelleği (saniye): kayıt ömrü ve sürümü eskimiş kaydın en fazla kaç
+# saniyelikken döndürülüp arka planda yenileneceği (0: bayat yanıt ve arka plan yenilemesi yok)
+DASHBOARD_ONBELLEK_SURESI = env.int('DASHBOARD_ONBELLEK_SURESI', default=86400)
+DASHBOARD_BAYAT_SURESI = env.int('DASHBOARD_BAYAT_SURESI', default=300)
+
+# Arka plan işleri (manage.py isleri_calistir)
+ARKA_PLAN_IS_SAYISI = env.int('ARKA_PLAN_IS_SAYISI', default=2)  # Aynı anda çalışan alt süreç sayısı
+ARKA_PLAN_IS_ZAMAN_ASIMI = env.int('ARKA_PLAN_IS_ZAMAN_ASIMI', default=3600)  # Çalışanından bu süre nabız gelmeyen iş hatalı sayılır (saniye)
+ARKA_PLAN_ISLERI_SENKRON = env.bool('ARKA_PLAN_ISLERI_SENKRON', default=False)  # Çalışan süreç yoksa işleri istek içinde çalıştır
+
+# Günlük ölçüm tablolarını tarih yılına göre bölümle (PostgreSQL). Migration sırasında
+# okunur; sonradan açmak için: manage.py yillik_bolumleri_olustur --donustur
+GUNLUK_VERI_BOLUMLEME = env.bool('GUNLUK_VERI_BOLUMLEME', default=False)
+
+# Uç nokta metrikleri (/metrics, Prometheus). Çok worker'lı gunicorn'da PROMETHEUS_MULTIPROC_DIR
+# ayarlanmalıdır; token boşsa /metrics'e sadece izinli IP'lerden erişilir
+METRIKLER_ETKIN = env.bool('METRIKLER_ETKIN', default=True)
+METRIK_ERISIM_TOKENI = env('METRIK_ERISIM_TOKENI', default='')  # Authorization: Bearer <token>
+METRIK_IZINLI_IPLER = env.list('METRIK_IZINLI_IPLER', default=['127.0.0.1', '::1'])
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = env.list('CORS_ALLOWED_ORIGINS', default=[
     "http://localhost:3000",
@@ -20,6 +20,8 @@ from django.urls import path, include
 from django.http import JsonResponse
 from django.conf import settings
 from django.conf.urls.static import static
+
+from .metrikler import metrikler_gorunumu
 # Static files serving in development
 
 
@@ -42,6 +44,7 @@ urlpatterns = [
     path('auth/', include('authentication.urls')),
     path('sulama/', include('sulama.urls')),
     path('api/', api_root),
+    path('metrics', metrikler_gorunumu, name='metrikler'),
 ]
 # For serving static files in development
 